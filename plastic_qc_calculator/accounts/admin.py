@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserCreationForm
+from .badges import invalidate_admin_badges
 from .models import CustomUser
 
 
@@ -60,6 +61,7 @@ class CustomUserAdmin(UserAdmin):
             approved_by=request.user,
             approved_date=timezone.now()
         )
+        invalidate_admin_badges()
         self.message_user(request, f'{updated} users approved successfully.')
 
     approve_users.short_description = "Approve selected users"
@@ -70,6 +72,7 @@ class CustomUserAdmin(UserAdmin):
             approved_by=None,
             approved_date=None
         )
+        invalidate_admin_badges()
         self.message_user(request, f'{updated} users rejected.')
 
     reject_users.short_description = "Reject selected users"
@@ -0,0 +1,81 @@
+"""
+Admin badge counts (pending approvals, profile updates, password resets).
+
+All counts come from one aggregate query over the users table (password reset
+requests are reached through their user). The result is kept for a short
+while in the 'counters' cache namespace, memoised on the request, and dropped
+whenever a user or reset request changes state.
+
+Writes that bypass model signals (queryset.update()) must call
+invalidate_admin_badges() themselves.
+"""
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_save, post_delete
+
+from .models import CustomUser, PasswordResetRequest
+
+BADGES_KEY = 'admin_badges'
+BADGES_TIMEOUT = 30  # seconds
+
+EMPTY_BADGES = {
+    'total_users': 0,
+    'approved_users': 0,
+    'pending_approvals': 0,
+    'pending_profile_updates': 0,
+    'pending_password_resets': 0,
+}
+
+
+def count_admin_badges():
+    """Every badge count in a single query"""
+    # The join to reset requests repeats user rows, hence the distinct counts
+    return CustomUser.objects.aggregate(
+        total_users=Count('pk', distinct=True),
+        approved_users=Count('pk', distinct=True, filter=Q(is_approved=True)),
+        pending_approvals=Count('pk', distinct=True, filter=Q(is_approved=False, is_active=True)),
+        pending_profile_updates=Count('pk', distinct=True, filter=Q(profile_update_pending=True, is_active=True)),
+        pending_password_resets=Count(
+            'password_reset_requests', distinct=True, filter=Q(password_reset_requests__status='PENDING')
+        ),
+    )
+
+
+def admin_badge_counts():
+    """Badge counts from the cache, counted again once they expire or are invalidated"""
+    cache = caches['counters']
+    counts = cache.get(BADGES_KEY)
+    if counts is None:
+        counts = count_admin_badges()
+        cache.set(BADGES_KEY, counts, BADGES_TIMEOUT)
+    return counts
+
+
+def get_admin_badges(request):
+    """Badge counts for the request's user, worked out once per request; zeros for non-admins"""
+    if not hasattr(request, '_admin_badges'):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and user.is_administrator():
+            request._admin_badges = admin_badge_counts()
+        else:
+            request._admin_badges = EMPTY_BADGES
+    return request._admin_badges
+
+
+def invalidate_admin_badges():
+    caches['counters'].delete(BADGES_KEY)
+
+
+def badges_changed(sender, update_fields=None, raw=False, **kwargs):
+    """post_save/post_delete on users and reset requests: recount once committed"""
+    # Logins only touch last_login, which no badge depends on
+    if raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    transaction.on_commit(invalidate_admin_badges)
+
+
+def connect_signals():
+    for model in (CustomUser, PasswordResetRequest):
+        post_save.connect(badges_changed, sender=model, dispatch_uid=f'admin_badges_save_{model.__name__}')
+        post_delete.connect(badges_changed, sender=model, dispatch_uid=f'admin_badges_delete_{model.__name__}')
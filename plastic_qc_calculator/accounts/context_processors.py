@@ -0,0 +1,6 @@
+from .badges import get_admin_badges
+
+
+def admin_badges(request):
+    """Admin badge counts for base.html; counted only when a template reads them"""
+    return {'admin_badges': lambda: get_admin_badges(request)}
@@ -135,23 +135,23 @@ class CustomUser(AbstractUser):
     def get_section_display_name(self):
         return dict(self.SECTION_CHOICES).get(self.section, self.section)
 
-    @property
-    def pending_approvals_count(self):
+    def _admin_badge_count(self, badge):
         if self.is_administrator():
-            return CustomUser.objects.filter(is_approved=False, is_active=True).count()
+            from .badges import admin_badge_counts
+            return admin_badge_counts()[badge]
         return 0
 
+    @property
+    def pending_approvals_count(self):
+        return self._admin_badge_count('pending_approvals')
+
     @property
     def pending_profile_updates_count(self):
-        if self.is_administrator():
-            return CustomUser.objects.filter(profile_update_pending=True, is_active=True).count()
-        return 0
+        return self._admin_badge_count('pending_profile_updates')
 
     @property
     def pending_password_resets_count(self):
-        if self.is_administrator():
-            return PasswordResetRequest.objects.filter(status='PENDING').count()
-        return 0
+        return self._admin_badge_count('pending_password_resets')
 
     def log_action(self, action_type, description, request=None):
         """Log user action with optional request context"""
@@ -1,3 +1,58 @@
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from .badges import BADGES_KEY, admin_badge_counts, count_admin_badges, get_admin_badges
+from .models import CustomUser, PasswordResetRequest
+
+
+class AdminBadgeTests(TestCase):
+    def setUp(self):
+        caches['counters'].delete(BADGES_KEY)
+        self.admin = CustomUser.objects.create_user('admin', password='pw', company_role='admin')
+        self.pending = CustomUser.objects.create_user('pending', password='pw')
+        self.updating = CustomUser.objects.create_user('updating', password='pw', is_approved=True,
+                                                       profile_update_pending=True)
+        CustomUser.objects.create_user('inactive', password='pw', is_active=False)
+        # Two reset requests for one user must not inflate the user counts
+        for _ in range(2):
+            PasswordResetRequest.objects.create(user=self.pending, requested_by=self.admin, reason='forgot')
+        PasswordResetRequest.objects.create(user=self.updating, requested_by=self.admin, reason='done',
+                                            status='COMPLETED')
+
+    def test_counts_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            counts = count_admin_badges()
+        self.assertEqual(counts, {
+            'total_users': 4,
+            'approved_users': 2,
+            'pending_approvals': 1,
+            'pending_profile_updates': 1,
+            'pending_password_resets': 2,
+        })
+
+    def test_counts_are_cached_until_a_change_commits(self):
+        self.assertEqual(admin_badge_counts()['pending_approvals'], 1)
+        with self.assertNumQueries(0):
+            admin_badge_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending.is_approved = True
+            self.pending.save()
+        self.assertEqual(admin_badge_counts()['pending_approvals'], 0)
+
+    def test_logins_do_not_invalidate(self):
+        admin_badge_counts()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.admin.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+    def test_only_administrators_see_badges(self):
+        request = RequestFactory().get('/')
+        request.user = self.pending
+        self.assertEqual(get_admin_badges(request)['pending_approvals'], 0)
+
+        request = RequestFactory().get('/')
+        request.user = self.admin
+        self.assertEqual(get_admin_badges(request)['pending_password_resets'], 2)
+        with self.assertNumQueries(0):
+            get_admin_badges(request)
@@ -1,3 +1,5 @@
+from collections import Counter
+
 from django.db.models import Count
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
@@ -10,6 +12,7 @@ import json
 from .forms import CustomUserCreationForm, CustomUserLoginForm, UserProfileForm, DeleteAccountForm, \
     PasswordResetRequestForm, AdminPasswordResetReviewForm, AdminPasswordSetForm
 from .models import CustomUser, PasswordResetRequest, UserActionLog
+from .badges import get_admin_badges
 
 
 def log_user_action(action_type, description_field='username'):
@@ -409,25 +412,20 @@ def dashboard_view(request):
 
 def admin_dashboard(request):
     """Admin dashboard with user management and analytics"""
-    # User statistics
-    total_users = CustomUser.objects.count()
-    pending_approvals = CustomUser.objects.filter(is_approved=False, is_active=True).count()
-    approved_users = CustomUser.objects.filter(is_approved=True).count()
-    pending_password_resets = PasswordResetRequest.objects.filter(status='PENDING').count()
-
-    # User role distribution
-    role_distribution = CustomUser.objects.filter(is_approved=True).values(
-        'company_role'
-    ).annotate(
-        count=Count('id')
-    ).order_by('-count')
+    # User statistics (shared with the admin menu badges)
+    badges = get_admin_badges(request)
 
-    # Section distribution
-    section_distribution = CustomUser.objects.filter(is_approved=True).values(
-        'section'
-    ).annotate(
+    # Role and section distributions from one GROUP BY over both columns
+    role_counts = Counter()
+    section_counts = Counter()
+    for row in CustomUser.objects.filter(is_approved=True).values('company_role', 'section').annotate(
         count=Count('id')
-    ).order_by('-count')
+    ).order_by():
+        role_counts[row['company_role']] += row['count']
+        section_counts[row['section']] += row['count']
+
+    role_distribution = [{'company_role': role, 'count': count} for role, count in role_counts.most_common()]
+    section_distribution = [{'section': section, 'count': count} for section, count in section_counts.most_common()]
 
     # Recent registrations (last 7 days)
     one_week_ago = timezone.now() - timezone.timedelta(days=7)
@@ -438,11 +436,11 @@ def admin_dashboard(request):
     # Recent activity (you can expand this with actual activity data)
     context = {
         'dashboard_type': 'admin',
-        'total_users': total_users,
-        'pending_approvals': pending_approvals,
-        'approved_users': approved_users,
+        'total_users': badges['total_users'],
+        'pending_approvals': badges['pending_approvals'],
+        'approved_users': badges['approved_users'],
         'role_distribution': role_distribution,
-        'pending_password_resets': pending_password_resets,
+        'pending_password_resets': badges['pending_password_resets'],
         'section_distribution': section_distribution,
         'recent_registrations': recent_registrations,
     }
@@ -454,36 +452,16 @@ def user_dashboard(request):
     """Regular user dashboard with personal stats and quick actions"""
     user = request.user
 
-    # Get user's calculation statistics (you'll need to implement these)
-    total_calculations = 0
-    recent_calculations = []
-
-    # Try to get calculation stats from different apps
-    try:
-        from extrusion.models import ExtrusionCalculation
-        user_extrusion_calcs = ExtrusionCalculation.objects.filter(user=user)
-        total_calculations += user_extrusion_calcs.count()
-        recent_calculations.extend(list(user_extrusion_calcs.order_by('-timestamp')[:5]))
-    except:
-        pass
-
-    try:
-        from calculator.models import DensityCalculation
-        user_density_calcs = DensityCalculation.objects.filter(user=user)
-        total_calculations += user_density_calcs.count()
-        recent_calculations.extend(list(user_density_calcs.order_by('-timestamp')[:5]))
-    except:
-        pass
-
-    # Sort recent calculations by timestamp
-    recent_calculations.sort(key=lambda x: x.timestamp, reverse=True)
-    recent_calculations = recent_calculations[:5]
+    # Totals from the per-section counters, recent items from every calculation table
+    from calculator.dashboard import get_dashboard_stats
+    stats = get_dashboard_stats(user)
 
     context = {
         'dashboard_type': 'user',
         'user': user,
-        'total_calculations': total_calculations,
-        'recent_calculations': recent_calculations,
+        'total_calculations': stats['total_calculations'],
+        'section_counts': stats['section_counts'],
+        'recent_calculations': stats['recent_calculations'],
         'is_approved': user.is_approved,
     }
 
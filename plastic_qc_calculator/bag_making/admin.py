@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import BagSku
 
-# Register your models here.
+
+@admin.register(BagSku)
+class BagSkuAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'bag_type', 'material', 'structure', 'thickness_microns',
+                    'piece_weight_g', 'packet_weight_kg', 'bundle_weight_kg', 'computed_at']
+    list_filter = ['bag_type']
+    search_fields = ['code', 'name']
+    readonly_fields = BagSku.COMPUTED_FIELDS
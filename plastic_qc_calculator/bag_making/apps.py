@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BagMakingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bag_making'
+
+    def ready(self):
+        from . import sku_catalogue
+
+        sku_catalogue.connect_signals()
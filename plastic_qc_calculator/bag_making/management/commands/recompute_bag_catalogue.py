@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from bag_making.sku_catalogue import recompute_catalogue
+
+
+class Command(BaseCommand):
+    help = 'Recompute weights for bag SKUs whose material, thickness or dimensions changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every SKU, not only changed ones')
+
+    def handle(self, *args, **options):
+        recomputed, total = recompute_catalogue(force=options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {recomputed} of {total} bag SKUs'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag_making', '0001_initial'),
+        ('calculator', '0008_history_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bagmakingcalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='bag_making__calcula_4124f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bagmakingcalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='bag_making__user_id_e6d069_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bagmakingcalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='bag_making_input_material_idx'),
+        ),
+    ]
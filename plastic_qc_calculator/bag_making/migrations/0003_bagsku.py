@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag_making', '0002_history_filter_indexes'),
+        ('calculator', '0008_history_filter_indexes'),
+        ('sales', '0005_laminatedstructure_properties'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BagSku',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('bag_type', models.CharField(choices=[('FLAT_SHEET', 'Flat Sheet Bag'), ('TUBULAR', 'Tubular Bag'), ('GUSSETED', 'Gusseted Bag'), ('LAMINATED_FLAT', 'Laminated Flat Bag'), ('LAMINATED_TUBULAR', 'Laminated Tubular Bag'), ('LAMINATED_GUSSETED', 'Laminated Gusseted Bag')], max_length=20)),
+                ('thickness_microns', models.FloatField(default=0)),
+                ('width_mm', models.FloatField()),
+                ('height_mm', models.FloatField()),
+                ('gusset_width_mm', models.FloatField(default=0)),
+                ('pieces_per_packet', models.PositiveIntegerField(default=0)),
+                ('packets_per_bundle', models.PositiveIntegerField(default=0)),
+                ('packet_packaging_g', models.FloatField(default=0)),
+                ('bundle_packaging_kg', models.FloatField(default=0)),
+                ('area_m2', models.FloatField(blank=True, null=True)),
+                ('gsm', models.FloatField(blank=True, help_text='GSM in g/m²', null=True)),
+                ('piece_weight_g', models.FloatField(blank=True, null=True)),
+                ('packet_weight_kg', models.FloatField(blank=True, null=True)),
+                ('bundle_weight_kg', models.FloatField(blank=True, null=True)),
+                ('input_fingerprint', models.CharField(blank=True, max_length=40)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='calculator.plasticmaterial')),
+                ('structure', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='sales.laminatedstructure')),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+    ]
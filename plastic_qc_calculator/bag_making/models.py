@@ -1,4 +1,6 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.fields.json import KT
 from calculator.models import PlasticMaterial
 from qc_project import settings
 
@@ -34,6 +36,13 @@ class BagMakingCalculation(models.Model):
         blank=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['calculation_type', 'timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(KT('input_data__material_id'), name='bag_making_input_material_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_calculation_type_display()} - {self.get_bag_type_display()}"
 
@@ -47,3 +56,59 @@ class BagLayer(models.Model):
 
     class Meta:
         ordering = ['layer_order']
+
+
+class BagSku(models.Model):
+    """Catalogue bag spec with its weights precomputed by bag_making.sku_catalogue"""
+    COMPUTED_FIELDS = ['area_m2', 'gsm', 'piece_weight_g', 'packet_weight_kg', 'bundle_weight_kg',
+                       'input_fingerprint', 'computed_at']
+
+    code = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=200, blank=True)
+    bag_type = models.CharField(max_length=20, choices=BagMakingCalculation.BAG_TYPES)
+
+    # Single-layer bags: material and film thickness; laminated bags: a saved structure
+    material = models.ForeignKey(PlasticMaterial, on_delete=models.PROTECT, null=True, blank=True)
+    thickness_microns = models.FloatField(default=0)
+    structure = models.ForeignKey('sales.LaminatedStructure', on_delete=models.PROTECT, null=True, blank=True)
+
+    width_mm = models.FloatField()
+    height_mm = models.FloatField()
+    gusset_width_mm = models.FloatField(default=0)
+    pieces_per_packet = models.PositiveIntegerField(default=0)
+    packets_per_bundle = models.PositiveIntegerField(default=0)
+    packet_packaging_g = models.FloatField(default=0)
+    bundle_packaging_kg = models.FloatField(default=0)
+
+    # Computed
+    area_m2 = models.FloatField(null=True, blank=True)
+    gsm = models.FloatField(null=True, blank=True, help_text="GSM in g/m²")
+    piece_weight_g = models.FloatField(null=True, blank=True)
+    packet_weight_kg = models.FloatField(null=True, blank=True)
+    bundle_weight_kg = models.FloatField(null=True, blank=True)
+    input_fingerprint = models.CharField(max_length=40, blank=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['code']
+
+    def __str__(self):
+        return f"{self.code} - {self.get_bag_type_display()}"
+
+    def clean(self):
+        from .sku_catalogue import sku_source_errors
+
+        super().clean()
+        errors = sku_source_errors(self)
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        from .sku_catalogue import compute_skus
+
+        compute_skus([self])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.COMPUTED_FIELDS)
+        super().save(*args, **kwargs)
@@ -0,0 +1,205 @@
+"""
+Batch weights for the bag SKU catalogue.
+
+Every SKU's inputs (bag type, dimensions, packing, and the film GSM that its
+material and thickness or its laminated structure give) are hashed into a
+fingerprint. A recompute only evaluates SKUs whose fingerprint moved, so a
+density edit or a changed dimension touches just the affected SKUs. Stale SKUs
+are evaluated in one columnar pass: bag types become masks, and the area and
+GSM formulas pick per SKU with where() instead of branching per bag. A SKU
+without the film source its bag type needs (a material and thickness, or a
+complete laminated structure) is not evaluated and keeps no weights.
+
+Stored weights are kept current by signals: BagSku.save() computes its own
+row, a material save recomputes the SKUs made from it, and a structure save
+(or a material change that rewrites structures) recomputes the SKUs laminated
+from it. recompute_bag_catalogue covers writes that bypass signals.
+
+Formulas match BagMakingCalculator.calculate_single_piece_area,
+calculate_single_piece_weight, calculate_packet_weight and
+calculate_bundle_weight.
+"""
+import hashlib
+
+from django.db import transaction
+from django.utils import timezone
+
+from calculator.columnar import run_formula
+from calculator.material_registry import registry as material_registry
+from sales.structures import INCOMPLETE_STRUCTURE_ERROR, structure_is_complete
+from .models import BagSku
+
+TUBULAR_TYPES = {'TUBULAR', 'LAMINATED_TUBULAR'}
+GUSSETED_TYPES = {'GUSSETED', 'LAMINATED_GUSSETED'}
+LAMINATED_TYPES = {'LAMINATED_FLAT', 'LAMINATED_TUBULAR', 'LAMINATED_GUSSETED'}
+BATCH_SIZE = 1000
+
+
+# --- COLUMN FORMULAS (ops, *columns) ---
+
+def _area_m2(ops, tubular, gusseted, width_mm, height_mm, gusset_width_mm):
+    width_m, height_m, gusset_width_m = width_mm / 1000, height_mm / 1000, gusset_width_mm / 1000
+    return ops.where(tubular, width_m * 2 * height_m,
+                     ops.where(gusseted, (width_m + gusset_width_m) * height_m, width_m * height_m))
+
+
+def _gsm(ops, laminated, structure_gsm, thickness_um, density_g_cm3):
+    return ops.where(laminated, structure_gsm, thickness_um * density_g_cm3)
+
+
+def _piece_weight_g(ops, area_m2, gsm):
+    return area_m2 * gsm
+
+
+def _packet_weight_kg(ops, pieces_per_packet, piece_weight_g, packet_packaging_g):
+    return (pieces_per_packet * piece_weight_g + packet_packaging_g) / 1000
+
+
+def _bundle_weight_kg(ops, packets_per_bundle, packet_weight_kg, bundle_packaging_kg):
+    return packets_per_bundle * packet_weight_kg + bundle_packaging_kg
+
+
+def sku_source_errors(sku):
+    """Field -> error for a SKU missing the film source its bag type needs"""
+    if sku.bag_type in LAMINATED_TYPES:
+        if sku.structure_id is None:
+            return {'structure': 'A laminated bag needs a structure'}
+        if not structure_is_complete(sku.structure):
+            return {'structure': INCOMPLETE_STRUCTURE_ERROR}
+        return {}
+    errors = {}
+    if sku.material_id is None:
+        errors['material'] = 'A single-layer bag needs a material'
+    if not sku.thickness_microns or sku.thickness_microns <= 0:
+        errors['thickness_microns'] = 'Thickness must be greater than zero'
+    return errors
+
+
+def clear_sku(sku):
+    """Drop a SKU's computed fields, without saving"""
+    for field in BagSku.COMPUTED_FIELDS:
+        setattr(sku, field, '' if field == 'input_fingerprint' else None)
+
+
+def sku_film(sku, materials=None):
+    """
+    (is laminated, structure GSM, thickness, density) for a SKU. `materials`
+    maps id -> material for rows newer than the registry's copy.
+    """
+    if sku.bag_type in LAMINATED_TYPES:
+        return True, sku.structure.total_gsm if sku.structure_id else 0.0, 0.0, 0.0
+    material = (materials or {}).get(sku.material_id) or material_registry.get_or_none(sku.material_id)
+    return False, 0.0, sku.thickness_microns, material.density if material is not None else 0.0
+
+
+def sku_fingerprint(sku, film):
+    """Hash of everything a SKU's weights depend on"""
+    parts = [
+        sku.bag_type, sku.width_mm, sku.height_mm, sku.gusset_width_mm, sku.pieces_per_packet,
+        sku.packets_per_bundle, sku.packet_packaging_g, sku.bundle_packaging_kg, *film,
+    ]
+    # Numbers as floats, so 300 from a form and 300.0 from the database hash alike
+    parts = [float(part) if isinstance(part, (int, float)) else part for part in parts]
+    return hashlib.sha1('|'.join(repr(part) for part in parts).encode()).hexdigest()
+
+
+def evaluate_skus(skus, films):
+    """Area, GSM and piece/packet/bundle weights for SKUs, as columns"""
+    tubular = [float(sku.bag_type in TUBULAR_TYPES) for sku in skus]
+    gusseted = [float(sku.bag_type in GUSSETED_TYPES) for sku in skus]
+    laminated, structure_gsm, thickness, density = (list(column) for column in zip(*films))
+
+    area = run_formula(_area_m2, tubular, gusseted, [sku.width_mm for sku in skus],
+                       [sku.height_mm for sku in skus], [sku.gusset_width_mm for sku in skus])
+    gsm = run_formula(_gsm, [float(value) for value in laminated], structure_gsm, thickness, density)
+    piece = run_formula(_piece_weight_g, area, gsm)
+    packet = run_formula(_packet_weight_kg, [sku.pieces_per_packet for sku in skus], piece,
+                         [sku.packet_packaging_g for sku in skus])
+    bundle = run_formula(_bundle_weight_kg, [sku.packets_per_bundle for sku in skus], packet,
+                         [sku.bundle_packaging_kg for sku in skus])
+    return {'area_m2': area, 'gsm': gsm, 'piece_weight_g': piece, 'packet_weight_kg': packet,
+            'bundle_weight_kg': bundle}
+
+
+def compute_skus(skus, force=False, materials=None):
+    """
+    Set the computed fields of the SKUs whose inputs changed since they were
+    last computed (every SKU with force=True), without saving. Incomplete SKUs
+    are not evaluated; any weights they still hold are cleared. Returns the
+    SKUs changed.
+    """
+    stale = []
+    films = []
+    cleared = []
+    for sku in skus:
+        if sku_source_errors(sku):
+            if sku.computed_at is not None or sku.input_fingerprint:
+                clear_sku(sku)
+                cleared.append(sku)
+            continue
+        film = sku_film(sku, materials)
+        fingerprint = sku_fingerprint(sku, film)
+        if force or sku.computed_at is None or fingerprint != sku.input_fingerprint:
+            sku.input_fingerprint = fingerprint
+            stale.append(sku)
+            films.append(film)
+
+    if stale:
+        results = evaluate_skus(stale, films)
+        now = timezone.now()
+        for index, sku in enumerate(stale):
+            for field, values in results.items():
+                setattr(sku, field, values[index])
+            sku.computed_at = now
+    return stale + cleared
+
+
+def recompute_catalogue(queryset=None, force=False, materials=None):
+    """
+    Recompute and store the SKUs whose inputs changed since they were last
+    computed (every SKU with force=True). Returns (recomputed, total).
+    """
+    written = 0
+    with transaction.atomic():
+        skus = list((queryset if queryset is not None else BagSku.objects.all()).select_related('structure'))
+        stale = compute_skus(skus, force, materials)
+        for start in range(0, len(stale), BATCH_SIZE):
+            batch = stale[start:start + BATCH_SIZE]
+            # An upsert on the primary key, as bulk_update's CASE per row and field is far slower. It would insert a
+            # SKU deleted since the read again, so write only the rows that still exist, locked until commit.
+            live = set(BagSku.objects.select_for_update().filter(pk__in=[sku.pk for sku in batch])
+                       .values_list('pk', flat=True))
+            batch = [sku for sku in batch if sku.pk in live]
+            if batch:
+                BagSku.objects.bulk_create(batch, update_conflicts=True, unique_fields=['id'],
+                                           update_fields=BagSku.COMPUTED_FIELDS)
+            written += len(batch)
+    return written, len(skus)
+
+
+def material_saved(sender, instance, raw=False, **kwargs):
+    """post_save on PlasticMaterial: recompute the single-layer SKUs made from it"""
+    if not raw:
+        recompute_catalogue(BagSku.objects.filter(material=instance), materials={instance.pk: instance})
+
+
+def structure_saved(sender, instance, raw=False, **kwargs):
+    """post_save on LaminatedStructure: recompute the SKUs laminated from it"""
+    if not raw:
+        recompute_catalogue(BagSku.objects.filter(structure=instance))
+
+
+def structures_refreshed(sender, structure_ids, **kwargs):
+    """sales.structures.structures_refreshed: structures rewritten after a material change"""
+    recompute_catalogue(BagSku.objects.filter(structure_id__in=structure_ids))
+
+
+def connect_signals():
+    from django.db.models.signals import post_save
+    from calculator.models import PlasticMaterial
+    from sales.models import LaminatedStructure
+    from sales.structures import structures_refreshed as structures_refreshed_signal
+
+    post_save.connect(material_saved, sender=PlasticMaterial, dispatch_uid='bag_catalogue_material_save')
+    post_save.connect(structure_saved, sender=LaminatedStructure, dispatch_uid='bag_catalogue_structure_save')
+    structures_refreshed_signal.connect(structures_refreshed, dispatch_uid='bag_catalogue_structures_refreshed')
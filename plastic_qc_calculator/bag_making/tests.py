@@ -1,3 +1,124 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from calculator.material_registry import registry as material_registry
+from calculator.models import PlasticMaterial
+from sales.models import LaminatedStructure
+from .bag_calculator import BagMakingCalculator
+from .models import BagSku
+from . import sku_catalogue
+from .sku_catalogue import recompute_catalogue
+
+
+class BagSkuCatalogueTests(TestCase):
+    def setUp(self):
+        self.ldpe = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.pet = PlasticMaterial.objects.create(name='PET', code='PET', material_type='FILM', density=1.4)
+        material_registry.invalidate()
+        self.structure = LaminatedStructure.objects.create(
+            name='PET/PE', layers=[{'material_id': self.pet.pk, 'thickness_microns': 12},
+                                   {'material_id': self.ldpe.pk, 'thickness_microns': 50}])
+
+    def create(self, code, bag_type, **fields):
+        defaults = {'width_mm': 300, 'height_mm': 450, 'gusset_width_mm': 80, 'pieces_per_packet': 100,
+                    'packets_per_bundle': 10, 'packet_packaging_g': 5, 'bundle_packaging_kg': 0.2}
+        if bag_type.startswith('LAMINATED'):
+            defaults['structure'] = self.structure
+        else:
+            defaults.update(material=self.ldpe, thickness_microns=40)
+        return BagSku.objects.create(code=code, bag_type=bag_type, **{**defaults, **fields})
+
+    def expected_bundle(self, sku, gsm):
+        calculator = BagMakingCalculator()
+        area = calculator.calculate_single_piece_area(sku.width_mm, sku.height_mm, sku.bag_type, sku.gusset_width_mm,
+                                                      'mm', 'mm', 'mm')
+        piece = calculator.calculate_single_piece_weight(area, gsm)
+        packet = calculator.calculate_packet_weight(sku.pieces_per_packet, piece, sku.packet_packaging_g)
+        return calculator.calculate_bundle_weight(sku.packets_per_bundle, packet, sku.bundle_packaging_kg)
+
+    def test_weights_match_calculator_for_every_bag_type(self):
+        for bag_type, _ in BagSku._meta.get_field('bag_type').choices:
+            sku = self.create(bag_type, bag_type)
+            gsm = self.structure.total_gsm if bag_type.startswith('LAMINATED') else 40 * 0.92
+            self.assertAlmostEqual(sku.gsm, gsm)
+            self.assertAlmostEqual(sku.bundle_weight_kg, self.expected_bundle(sku, gsm))
+
+    def test_save_recomputes_changed_sku(self):
+        sku = self.create('S1', 'FLAT_SHEET')
+        sku.width_mm = 600
+        sku.save()
+        sku.refresh_from_db()
+        self.assertAlmostEqual(sku.area_m2, 0.6 * 0.45)
+
+    def test_material_change_recomputes_its_skus(self):
+        flat = self.create('S1', 'FLAT_SHEET')
+        laminated = self.create('S2', 'LAMINATED_FLAT')
+        # Each save commits on its own in production; the registry reloads on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pet.density = 1.0
+            self.pet.save()
+        self.ldpe.density = 0.95
+        self.ldpe.save()
+        flat.refresh_from_db()
+        laminated.refresh_from_db()
+        self.assertAlmostEqual(flat.gsm, 40 * 0.95)
+        self.assertAlmostEqual(laminated.gsm, 12 * 1.0 + 50 * 0.95)
+
+    def test_recompute_only_touches_stale_skus(self):
+        self.create('S1', 'FLAT_SHEET')
+        self.create('S2', 'GUSSETED')
+        self.assertEqual(recompute_catalogue(), (0, 2))
+        BagSku.objects.filter(code='S1').update(height_mm=500)  # bypasses save()
+        self.assertEqual(recompute_catalogue(), (1, 2))
+        self.assertEqual(recompute_catalogue(force=True), (2, 2))
+
+        out = StringIO()
+        call_command('recompute_bag_catalogue', stdout=out)
+        self.assertIn('Recomputed 0 of 2 bag SKUs', out.getvalue())
+
+    def test_clean_requires_the_film_source_for_the_bag_type(self):
+        incomplete = LaminatedStructure.objects.create(name='PET', layers=[{'material': 'PET', 'thickness': 12}])
+        cases = [
+            (BagSku(code='S1', bag_type='FLAT_SHEET', width_mm=300, height_mm=450), {'material', 'thickness_microns'}),
+            (BagSku(code='S2', bag_type='LAMINATED_FLAT', width_mm=300, height_mm=450), {'structure'}),
+            (BagSku(code='S3', bag_type='LAMINATED_FLAT', structure=incomplete, width_mm=300, height_mm=450),
+             {'structure'}),
+        ]
+        for sku, fields in cases:
+            with self.assertRaises(ValidationError) as context:
+                sku.full_clean()
+            self.assertEqual(set(context.exception.message_dict), fields)
+
+        BagSku(code='S4', bag_type='LAMINATED_FLAT', structure=self.structure, width_mm=300, height_mm=450).full_clean()
+
+    def test_incomplete_skus_keep_no_weights(self):
+        incomplete = LaminatedStructure.objects.create(name='PET', layers=[{'material': 'PET', 'thickness': 12}])
+        laminated = self.create('S1', 'LAMINATED_FLAT', structure=incomplete)
+        self.assertIsNone(laminated.gsm)
+
+        flat = self.create('S2', 'FLAT_SHEET')
+        self.assertIsNotNone(flat.bundle_weight_kg)
+        BagSku.objects.filter(pk=flat.pk).update(thickness_microns=0)  # bypasses save()
+        self.assertEqual(recompute_catalogue(), (1, 2))
+        flat.refresh_from_db()
+        self.assertIsNone(flat.bundle_weight_kg)
+        self.assertIsNone(flat.computed_at)
+        self.assertEqual(recompute_catalogue(), (0, 2))
+
+    def test_recompute_does_not_restore_a_deleted_sku(self):
+        self.create('S1', 'FLAT_SHEET')
+        self.create('S2', 'FLAT_SHEET')
+        compute_skus = sku_catalogue.compute_skus
+
+        def compute_then_delete(skus, *args):
+            stale = compute_skus(skus, *args)
+            BagSku.objects.filter(code='S1').delete()  # a delete between the read and the write
+            return stale
+
+        with mock.patch.object(sku_catalogue, 'compute_skus', compute_then_delete):
+            self.assertEqual(recompute_catalogue(force=True), (1, 2))
+        self.assertEqual(list(BagSku.objects.values_list('code', flat=True)), ['S2'])
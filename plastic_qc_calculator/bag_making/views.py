@@ -3,12 +3,19 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
+from calculator.layer_stack import fill_layer_densities
+from sales.structures import get_complete_structure
 from .models import BagMakingCalculation
 from .bag_calculator import BagMakingCalculator
 import json
 
 
 @login_required
+@conditional_page('bag_making/home.html', *SECTION_TEMPLATES, materials=True)
 def bag_making_home(request):
     calculators = [
         {'id': 'pieces_weight', 'name': 'Pieces ↔ Weight Converter', 'icon': 'fas fa-exchange-alt'},
@@ -29,6 +36,7 @@ def bag_making_home(request):
     materials = PlasticMaterial.objects.filter(material_type='FILM')
 
     return render(request, 'bag_making/home.html', {
+        **section_page_context(),
         'section_name': 'Bag Making',
         'calculators': calculators,
         'bag_types': bag_types,
@@ -38,6 +46,7 @@ def bag_making_home(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_pieces_weight(request):
     if request.method == 'POST':
         try:
@@ -65,17 +74,19 @@ def calculate_pieces_weight(request):
             if bag_type.startswith('LAMINATED'):
                 # For laminated bags, use composite GSM
                 layers_data = data.get('layers', [])
-                if not layers_data:
+                if data.get('structure_id'):
+                    composite_gsm = get_complete_structure(data['structure_id']).total_gsm
+                elif not layers_data:
                     return JsonResponse({'success': False, 'error': 'No layers provided for laminated bag'})
-
-                composite_gsm = calculator.calculate_composite_gsm(layers_data)
+                else:
+                    composite_gsm = calculator.calculate_composite_gsm(fill_layer_densities(layers_data))
             else:
                 # For single layer bags
                 material_id = data.get('material_id')
                 if not material_id:
                     return JsonResponse({'success': False, 'error': 'Material required for single layer bag'})
 
-                material = PlasticMaterial.objects.get(id=material_id)
+                material = material_registry.get(material_id)
                 thickness = float(data.get('thickness', 0))
                 thickness_unit = data.get('thickness_unit', 'micron')
 
@@ -127,7 +138,7 @@ def calculate_pieces_weight(request):
                 BagMakingCalculation.objects.create(
                     calculation_type='PIECES_WEIGHT',
                     bag_type=bag_type,
-                    material=material if not bag_type.startswith('LAMINATED') else PlasticMaterial.objects.first(),
+                    material=material if not bag_type.startswith('LAMINATED') else material_registry.first(),
                     input_data=data,
                     result_data=result,
                     user=request.user
@@ -143,6 +154,7 @@ def calculate_pieces_weight(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_packet_weight(request):
     if request.method == 'POST':
         try:
@@ -172,16 +184,18 @@ def calculate_packet_weight(request):
                 # Calculate GSM based on material type
                 if bag_type.startswith('LAMINATED'):
                     layers_data = data.get('layers', [])
-                    if not layers_data:
+                    if data.get('structure_id'):
+                        composite_gsm = get_complete_structure(data['structure_id']).total_gsm
+                    elif not layers_data:
                         return JsonResponse({'success': False, 'error': 'No layers provided for laminated bag'})
-
-                    composite_gsm = calculator.calculate_composite_gsm(layers_data)
+                    else:
+                        composite_gsm = calculator.calculate_composite_gsm(fill_layer_densities(layers_data))
                 else:
                     material_id = data.get('material_id', data.get('dimensions_material_id'))
                     if not material_id:
                         return JsonResponse({'success': False, 'error': 'Material required for single layer bag'})
 
-                    material = PlasticMaterial.objects.get(id=material_id)
+                    material = material_registry.get(material_id)
                     thickness = float(data.get('thickness', data.get('dimensions_thickness', 0)))
                     thickness_unit = data.get('thickness_unit', data.get('dimensions_thickness_unit', 'micron'))
 
@@ -263,7 +277,7 @@ def calculate_packet_weight(request):
                     }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 BagMakingCalculation.objects.create(
                     calculation_type='PACKET_WEIGHT',
                     bag_type=data.get('bag_type', 'FLAT_SHEET'),
@@ -283,6 +297,7 @@ def calculate_packet_weight(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_bundle_weight(request):
     if request.method == 'POST':
         try:
@@ -336,7 +351,7 @@ def calculate_bundle_weight(request):
                 BagMakingCalculation.objects.create(
                     calculation_type='BUNDLE_WEIGHT',
                     bag_type=data.get('bag_type', 'FLAT_SHEET'),
-                    material=PlasticMaterial.objects.first(),
+                    material=material_registry.first(),
                     input_data=data,
                     result_data=result,
                     user=request.user
@@ -352,6 +367,7 @@ def calculate_bundle_weight(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_packet_weight_from_dimensions(request):
     """Calculate packet weight from bag dimensions"""
     if request.method == 'POST':
@@ -412,6 +428,7 @@ def calculate_packet_weight_from_dimensions(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_bundle_weight_from_dimensions(request):
     """Calculate bundle weight from bag dimensions"""
     if request.method == 'POST':
@@ -476,6 +493,7 @@ def calculate_bundle_weight_from_dimensions(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_metrics(request):
     if request.method == 'POST':
         try:
@@ -533,7 +551,7 @@ def calculate_production_metrics(request):
                 BagMakingCalculation.objects.create(
                     calculation_type='PRODUCTION_TIME',
                     bag_type=data.get('bag_type', 'FLAT_SHEET'),
-                    material=PlasticMaterial.objects.first(),
+                    material=material_registry.first(),
                     input_data=data,
                     result_data=result,
                     user=request.user
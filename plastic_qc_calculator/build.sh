@@ -16,5 +16,11 @@ python manage.py collectstatic --noinput
 # Apply database migrations
 python manage.py migrate
 
+# Create the database-backed cache tables (see CACHES in settings.py)
+python manage.py createcachetable
+
 # Load initial data
-python manage.py load_initial_data
\ No newline at end of file
+python manage.py load_initial_data
+
+# Fill display-material snapshots for calculations saved before they existed
+python manage.py backfill_material_snapshots
\ No newline at end of file
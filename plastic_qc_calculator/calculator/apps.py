@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CalculatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'calculator'
+
+    def ready(self):
+        from . import counters, dashboard, ledger, material_registry, result_cache
+        ledger.connect_signals()
+        counters.connect_signals()
+        dashboard.connect_signals()
+        material_registry.connect_signals()
+        result_cache.connect_signals()
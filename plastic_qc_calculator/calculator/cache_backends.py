@@ -0,0 +1,102 @@
+"""
+Cache backends that keep per-namespace statistics.
+
+Each alias in settings.CACHES names its namespace in KEY_PREFIX and uses one of
+the backends below, which count hits, misses, sets and evictions. Counters are
+per worker process; size is read from the backend itself, so it covers every
+worker sharing it.
+"""
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends import db, filebased, locmem
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import connections, router
+
+_MISSING = object()
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+
+
+class StatsMixin:
+    """Count lookups and evictions for the namespace named by KEY_PREFIX"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        self.record('hits' if value is not _MISSING else 'misses')
+        return default if value is _MISSING else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.record('sets')
+        return super().set(key, value, timeout, version)
+
+    def record(self, counter, amount=1):
+        with _stats_lock:
+            _stats[self.key_prefix][counter] += amount
+
+
+class LocMemCache(StatsMixin, locmem.LocMemCache):
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        self.record('evictions', before - len(self._cache))
+
+    def size(self):
+        with self._lock:
+            return len(self._cache)
+
+
+class FileBasedCache(StatsMixin, filebased.FileBasedCache):
+    def _cull(self):
+        before = len(self._list_cache_files())
+        if before < self._max_entries:
+            return
+        super()._cull()
+        self.record('evictions', before - len(self._list_cache_files()))
+
+    def size(self):
+        return len(self._list_cache_files())
+
+
+class DatabaseCache(StatsMixin, db.DatabaseCache):
+    def _cull(self, db_alias, cursor, now, num):
+        connection = connections[db_alias]
+        table = connection.ops.quote_name(self._table)
+        # The cull first drops expired rows; only live rows removed after that are evictions
+        cursor.execute('SELECT COUNT(*) FROM %s WHERE %s < %%s' % (table, connection.ops.quote_name('expires')),
+                       [connection.ops.adapt_datetimefield_value(now)])
+        expired = cursor.fetchone()[0]
+        super()._cull(db_alias, cursor, now, num)
+        cursor.execute('SELECT COUNT(*) FROM %s' % table)
+        self.record('evictions', num - expired - cursor.fetchone()[0])
+
+    def size(self):
+        connection = connections[router.db_for_read(self.cache_model_class)]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM %s' % connection.ops.quote_name(self._table))
+            return cursor.fetchone()[0]
+
+
+def cache_stats():
+    """{alias: stats} for every configured cache namespace"""
+    stats = {}
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        with _stats_lock:
+            counts = dict(_stats[cache.key_prefix])
+        hits = counts.get('hits', 0)
+        misses = counts.get('misses', 0)
+        stats[alias] = {
+            'backend': f"{type(cache).__module__}.{type(cache).__name__}",
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'sets': counts.get('sets', 0),
+            'evictions': counts.get('evictions', 0),
+            'size': cache.size() if hasattr(cache, 'size') else None,
+            'max_entries': getattr(cache, '_max_entries', None),
+            'timeout': cache.default_timeout,
+        }
+    return stats
@@ -0,0 +1,131 @@
+"""
+Column helpers for batch calculators.
+
+A column is a sequence with one value per job, or a single number shared by
+every job. Formulas take an ops namespace first and are written once: with
+NumPy installed run_formula() calls them once over whole arrays (ArrayOps),
+otherwise once per job with plain floats (ScalarOps). NumPy is optional.
+"""
+import math
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ScalarOps:
+    """Formula primitives for one job at a time"""
+
+    sqrt = staticmethod(math.sqrt)
+    floor = staticmethod(math.floor)
+    maximum = staticmethod(max)
+
+    @staticmethod
+    def div(a, b, default=0.0):
+        return a / b if b else default
+
+    @staticmethod
+    def where(condition, a, b):
+        return a if condition else b
+
+
+class ArrayOps:
+    """The same primitives over NumPy arrays"""
+
+    @staticmethod
+    def sqrt(a):
+        return np.sqrt(a)
+
+    @staticmethod
+    def floor(a):
+        return np.floor(a)
+
+    @staticmethod
+    def maximum(a, b):
+        return np.maximum(a, b)
+
+    @staticmethod
+    def div(a, b, default=0.0):
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+        return np.divide(a, b, out=np.full(a.shape, default), where=b != 0)
+
+    @staticmethod
+    def where(condition, a, b):
+        return np.where(condition, a, b)
+
+
+def is_single(column):
+    return isinstance(column, (int, float))
+
+
+def batch_length(*columns):
+    """Number of jobs in a set of columns; single numbers stretch to fit"""
+    lengths = {len(column) for column in columns if not is_single(column)}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same number of jobs")
+    return lengths.pop() if lengths else 1
+
+
+def scale_column(column, factor):
+    """Multiply a column (or single number) by a unit-conversion factor"""
+    if is_single(column):
+        return column * factor
+    if np is not None:
+        return np.asarray(column, dtype=float) * factor
+    return [value * factor for value in column]
+
+
+def to_column(values):
+    """Payload values as a float column (blanks count as 0), or a single number as-is"""
+    if is_single(values):
+        return float(values)
+    if isinstance(values, str):
+        return float(values or 0)
+    if np is not None:
+        try:
+            return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+        except (TypeError, ValueError):
+            pass  # blank strings; convert value by value below
+    return [float(value or 0) for value in values]
+
+
+def column_values(column, jobs):
+    """A column as a plain list of `jobs` floats"""
+    if is_single(column):
+        return [float(column)] * jobs
+    return column.tolist() if np is not None and isinstance(column, np.ndarray) else list(column)
+
+
+def run_formula(formula, *columns, use_numpy=True):
+    """Apply formula(ops, *values) to every job; returns a list of floats"""
+    jobs = batch_length(*columns)
+    if use_numpy and np is not None:
+        arrays = [np.asarray(column, dtype=float) for column in columns]
+        result = formula(ArrayOps, *arrays)
+        return np.broadcast_to(np.asarray(result, dtype=float), (jobs,)).tolist()
+    rows = zip(*(repeat(column, jobs) if is_single(column) else column for column in columns))
+    return [float(formula(ScalarOps, *row)) for row in rows]
+
+
+def group_totals(keys, columns):
+    """
+    Sum columns per key. Returns (keys in first-seen order, {name: list of sums}),
+    with one bincount per column when NumPy is installed.
+    """
+    index = {}
+    codes = [index.setdefault(key, len(index)) for key in keys]
+    groups = list(index)
+    if np is not None:
+        codes = np.asarray(codes, dtype=np.intp)
+        return groups, {
+            name: np.bincount(codes, weights=np.asarray(values, dtype=float), minlength=len(groups)).tolist()
+            for name, values in columns.items()
+        }
+    totals = {name: [0.0] * len(groups) for name in columns}
+    for name, values in columns.items():
+        sums = totals[name]
+        for code, value in zip(codes, values):
+            sums[code] += value
+    return groups, totals
@@ -0,0 +1,97 @@
+"""
+HTTP conditional responses (ETag / Last-Modified) for mostly-static pages.
+
+A page's ETag covers the template files it renders, the material registry
+version when it lists materials, and everything base.html shows about the
+visitor (identity, role, admin badge counts, pending flash messages), so a
+304 is only sent when the page would render byte-for-byte the same.
+
+Last-Modified is only sent to anonymous visitors: for signed-in users the page
+also changes with state that has no modification time, and the ETag covers it.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.template.loader import get_template
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from accounts.badges import get_admin_badges
+from calculator.material_registry import registry as material_registry
+
+BASE_TEMPLATES = ('calculator/base.html',)
+SECTION_TEMPLATES = ('calculator/section_base.html', 'calculator/base.html')
+
+
+def template_files(template_names):
+    return [get_template(name).origin.name for name in template_names]
+
+
+@lru_cache(maxsize=None)
+def _cached_template_state(template_names):
+    return _template_state(template_names)
+
+
+def _template_state(template_names):
+    """(version hash, newest mtime) of the template files"""
+    stats = [os.stat(path) for path in template_files(template_names)]
+    version = hashlib.sha1(
+        '|'.join(f'{stat.st_mtime_ns}:{stat.st_size}' for stat in stats).encode()
+    ).hexdigest()[:12]
+    return version, max(stat.st_mtime for stat in stats)
+
+
+def template_state(template_names):
+    # Templates only change with a deploy (and a restart) outside development
+    if settings.DEBUG:
+        return _template_state(template_names)
+    return _cached_template_state(template_names)
+
+
+def visitor_state(request):
+    """What base.html renders about the visitor"""
+    user = request.user
+    if not user.is_authenticated:
+        state = ['anonymous']
+    else:
+        state = [user.pk, user.username, user.is_approved, user.is_administrator()]
+        if user.is_administrator():
+            badges = get_admin_badges(request)
+            state += [badges['pending_profile_updates'], badges['pending_password_resets']]
+    state.append(len(get_messages(request)))
+    return state
+
+
+def conditional_page(*template_names, materials=False):
+    """
+    Decorate a view that renders `template_names` (the page template and the
+    templates it extends) with ETag / Last-Modified handling. Pass
+    materials=True when the page lists materials.
+    """
+    def etag(request, *args, **kwargs):
+        parts = [template_state(template_names)[0]]
+        if materials:
+            parts.append(material_registry.version)
+        parts += visitor_state(request)
+        return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        modified = template_state(template_names)[1]
+        if materials:
+            modified = max([modified] + [
+                material.updated_at.timestamp() for material in material_registry.all()
+            ])
+        return datetime.fromtimestamp(modified, tz=timezone.utc)
+
+    def decorator(view):
+        return cache_control(private=True, no_cache=True)(
+            condition(etag_func=etag, last_modified_func=last_modified)(view)
+        )
+
+    return decorator
@@ -0,0 +1,71 @@
+"""
+Per-user, per-section calculation counts.
+
+CalculationCounter rows are adjusted on every calculation save and delete so
+history pages and dashboards read their totals instead of counting rows.
+"""
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+
+from .ledger import SECTION_MODELS, sync_suspended
+
+COUNTED_MODELS = dict(SECTION_MODELS, density='calculator.DensityCalculation')
+
+
+def adjust_counter(user_id, section, delta):
+    """Add `delta` (may be negative) to a user's count for a section"""
+    from .models import CalculationCounter
+
+    if not user_id or not delta:
+        return
+
+    counters = CalculationCounter.objects.filter(user_id=user_id, section=section)
+    if counters.update(count=Greatest(F('count') + delta, 0)):
+        return
+
+    if delta > 0:
+        try:
+            with transaction.atomic():
+                CalculationCounter.objects.create(user_id=user_id, section=section, count=delta)
+        except IntegrityError:
+            # Created concurrently by another request
+            counters.update(count=F('count') + delta)
+
+
+def get_section_counts(user):
+    """{section: count} for every counted section, zero where the user has none"""
+    from .models import CalculationCounter
+
+    counts = {section: 0 for section in COUNTED_MODELS}
+    counts.update(CalculationCounter.objects.filter(user=user).values_list('section', 'count'))
+    return counts
+
+
+def get_model_section(model):
+    label = model._meta.label
+    for section, model_label in COUNTED_MODELS.items():
+        if model_label == label:
+            return section
+    return None
+
+
+def count_calculation(sender, instance, created, raw=False, **kwargs):
+    """post_save: count newly created calculations"""
+    if created and not raw and not sync_suspended():
+        adjust_counter(instance.user_id, get_model_section(sender), 1)
+
+
+def uncount_calculation(sender, instance, **kwargs):
+    """post_delete: stop counting deleted calculations"""
+    if not sync_suspended():
+        adjust_counter(instance.user_id, get_model_section(sender), -1)
+
+
+def connect_signals():
+    for section, model_label in COUNTED_MODELS.items():
+        model = apps.get_model(model_label)
+        post_save.connect(count_calculation, sender=model, dispatch_uid=f'counter_save_{section}')
+        post_delete.connect(uncount_calculation, sender=model, dispatch_uid=f'counter_delete_{section}')
@@ -0,0 +1,109 @@
+"""
+Per-user dashboard statistics across every calculation table.
+
+Totals come from CalculationCounter (one query). Recent items come from one
+UNION ALL of the ledger, which mirrors the six section tables, and
+DensityCalculation, which has no ledger rows. The pair is cached per user in
+the 'counters' namespace and dropped whenever one of the user's calculations
+is saved or deleted.
+"""
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import CharField, F, FloatField, Value
+from django.db.models.signals import post_save, post_delete
+
+from .counters import COUNTED_MODELS, get_section_counts
+
+RECENT_LIMIT = 5
+DASHBOARD_TIMEOUT = 60  # seconds
+
+RECENT_FIELDS = ['recent_section', 'recent_type', 'recent_at', 'recent_material', 'recent_density']
+
+
+def dashboard_key(user_id):
+    return f'dashboard:{user_id}'
+
+
+def recent_calculations_query(user, limit=RECENT_LIMIT):
+    """Latest calculations of a user across all sections, as one UNION ALL"""
+    from .models import CalculationLedger, DensityCalculation
+
+    ledger = CalculationLedger.objects.filter(user=user).annotate(
+        recent_section=F('section'),
+        recent_type=F('calculation_type'),
+        recent_at=F('timestamp'),
+        recent_material=F('material_label'),
+        recent_density=Value(None, output_field=FloatField()),
+    ).values(*RECENT_FIELDS).order_by()
+
+    density = DensityCalculation.objects.filter(user=user).annotate(
+        recent_section=Value('density', output_field=CharField()),
+        recent_type=Value('DENSITY', output_field=CharField()),
+        recent_at=F('timestamp'),
+        recent_material=F('material__name'),
+        recent_density=F('calculated_density'),
+    ).values(*RECENT_FIELDS).order_by()
+
+    # Trim each side first where the backend allows LIMIT inside a compound query (not SQLite)
+    if connection.features.supports_slicing_ordering_in_compound:
+        ledger = ledger.order_by('-recent_at')[:limit]
+        density = density.order_by('-recent_at')[:limit]
+
+    return ledger.union(density, all=True).order_by('-recent_at')[:limit]
+
+
+def describe_recent(row):
+    """Template-friendly dict for one row of recent_calculations_query()"""
+    from .models import CalculationCounter
+    from .ledger import SECTION_MODELS, get_section_model
+
+    section = row['recent_section']
+    if section in SECTION_MODELS:
+        choices = dict(getattr(get_section_model(section), 'CALCULATION_TYPES', []))
+        label = choices.get(row['recent_type'], row['recent_type'].replace('_', ' ').title())
+    else:
+        label = 'Density Calculation'
+    return {
+        'section': section,
+        'section_label': dict(CalculationCounter.SECTION_CHOICES).get(section, section),
+        'label': label,
+        'timestamp': row['recent_at'],
+        'material_label': row['recent_material'] or '',
+        'calculated_density': row['recent_density'],
+    }
+
+
+def get_dashboard_stats(user):
+    """{'section_counts', 'total_calculations', 'recent_calculations'} for a user, cached briefly"""
+    cache = caches['counters']
+    key = dashboard_key(user.pk)
+    stats = cache.get(key)
+    if stats is None:
+        section_counts = get_section_counts(user)
+        stats = {
+            'section_counts': section_counts,
+            'total_calculations': sum(section_counts.values()),
+            'recent_calculations': [describe_recent(row) for row in recent_calculations_query(user)],
+        }
+        cache.set(key, stats, DASHBOARD_TIMEOUT)
+    return stats
+
+
+def invalidate_dashboard(user_id):
+    if user_id:
+        caches['counters'].delete(dashboard_key(user_id))
+
+
+def calculation_changed(sender, instance, raw=False, **kwargs):
+    """post_save/post_delete on counted models: drop the owner's dashboard once committed"""
+    if not raw and instance.user_id:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: invalidate_dashboard(user_id))
+
+
+def connect_signals():
+    for section, model_label in COUNTED_MODELS.items():
+        model = apps.get_model(model_label)
+        post_save.connect(calculation_changed, sender=model, dispatch_uid=f'dashboard_save_{section}')
+        post_delete.connect(calculation_changed, sender=model, dispatch_uid=f'dashboard_delete_{section}')
@@ -0,0 +1,260 @@
+"""
+Display-material resolution for saved calculations.
+
+Sections record their material in different ways (a material FK, ids inside
+input_data, laminated layer lists), so these helpers turn any calculation
+into a single object with a name and density for history pages and exports.
+"""
+from calculator.material_registry import registry as material_registry
+
+STRUCTURE_MATERIAL_KEYS = [
+    ('primary_material_id', 'primary'),
+    ('secondary_material_id', 'secondary'),
+    ('third_material_id', 'third'),
+    ('fourth_material_id', 'fourth'),
+]
+
+
+def resolve_display_materials(calculations):
+    """
+    Set display_material on every calculation. Ledger rows with a stored snapshot
+    are used as-is; the rest resolve every material id referenced across the batch
+    from the in-process material registry.
+    """
+    pending = []
+    for calc in calculations:
+        if getattr(calc, 'material_label', None) is not None:
+            calc.display_material = MaterialSnapshot.from_ledger(calc)
+        else:
+            pending.append(calc)
+
+    materials = load_referenced_materials(pending)
+    for calc in pending:
+        calc.display_material = get_display_material(calc, materials)
+    return calculations
+
+
+def load_referenced_materials(calculations):
+    """id -> PlasticMaterial map for every material the calculations refer to"""
+    material_ids = set()
+    for calc in calculations:
+        material_ids.update(get_referenced_material_ids(calc))
+    return material_registry.in_bulk(material_ids)
+
+
+class MaterialSnapshot:
+    """Display material rebuilt from the snapshot columns of a ledger row"""
+
+    def __init__(self, name, density, layers):
+        self.name = name
+        self.density = density
+        self.layers = layers
+        self.is_laminated = len(layers) > 1
+
+    @classmethod
+    def from_ledger(cls, entry):
+        if not entry.material_label:
+            return None
+        return cls(entry.material_label, entry.material_density, entry.material_layers or [])
+
+
+def material_snapshot(calculation, materials=None, section=None):
+    """
+    Ledger columns describing the display material of a calculation. Single-material
+    calculations also get material_id, so material filters work for sections that
+    only keep the id in input_data.
+    """
+    material = get_display_material(calculation, materials, section)
+    if material is None:
+        return {'material_label': '', 'material_density': None, 'material_layers': []}
+
+    if getattr(material, 'is_laminated', False):
+        snapshot = {'material_layers': list(material.layers)}
+    else:
+        snapshot = {
+            'material_id': material.id,
+            'material_layers': [{'id': material.id, 'name': material.name, 'density': material.density}],
+        }
+
+    snapshot['material_label'] = material.name[:255]
+    snapshot['material_density'] = material.density
+    return snapshot
+
+
+def get_referenced_material_ids(calculation):
+    """Material ids that get_display_material may need to look up for a calculation"""
+    ids = set()
+    if getattr(calculation, 'material_id', None):
+        return ids
+
+    input_data = getattr(calculation, 'input_data', None)
+    if not isinstance(input_data, dict):
+        return ids
+
+    candidates = [input_data.get('material_id')]
+    material_detail = input_data.get('material_detail')
+    if isinstance(material_detail, dict):
+        candidates.append(material_detail.get('id'))
+    candidates.extend(input_data.get(key) for key, _ in STRUCTURE_MATERIAL_KEYS)
+
+    for candidate in candidates:
+        material_id = to_material_id(candidate)
+        if material_id is not None:
+            ids.add(material_id)
+    return ids
+
+
+def to_material_id(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_display_material(calculation, materials=None, section=None):
+    """
+    Get material information for display in history.
+    `materials` is an id -> PlasticMaterial map from resolve_display_materials;
+    without it the referenced materials are fetched in a single query.
+    """
+    # If calculation has a direct material foreign key and it's set; a relation
+    # that was not loaded with the row comes from the registry, not a query
+    if getattr(calculation, 'material_id', None):
+        if calculation._meta.get_field('material').is_cached(calculation):
+            return calculation.material
+        material = material_registry.get_or_none(calculation.material_id)
+        if material:
+            return material
+
+    if materials is None:
+        materials = load_referenced_materials([calculation])
+
+    # For calculations with material stored in input_data
+    if hasattr(calculation, 'input_data') and calculation.input_data:
+        input_data = calculation.input_data
+
+        # Check for material_id in input_data (single material)
+        if 'material_id' in input_data and input_data['material_id']:
+            material = materials.get(to_material_id(input_data['material_id']))
+            if material:
+                return material
+
+        # Check for material_details in input_data (for laminated calculations)
+        if 'material_details' in input_data and input_data['material_details']:
+            materials_list = input_data['material_details']
+            if materials_list and len(materials_list) > 0:
+                # Create a special "Laminated" material object
+                return create_laminated_material_object(materials_list)
+
+        # Check for material_detail in input_data (for roll calculations)
+        if 'material_detail' in input_data and input_data['material_detail']:
+            material_detail = input_data['material_detail']
+            if material_detail and 'id' in material_detail:
+                material = materials.get(to_material_id(material_detail['id']))
+                if material:
+                    return material
+
+        # Check for primary_material_id and secondary_material_id (laminated structure)
+        if 'primary_material_id' in input_data and input_data['primary_material_id']:
+            return create_laminated_material_from_structure(input_data, materials)
+
+    # For Sales laminated calculations, check the layers structure
+    if (section or getattr(calculation, 'section', None)) == 'sales':
+        if hasattr(calculation, 'result_data') and calculation.result_data:
+            result_data = calculation.result_data
+            if 'layer_details' in result_data and result_data['layer_details']:
+                layers = []
+                for layer in result_data['layer_details']:
+                    if 'name' in layer:
+                        layers.append({'name': layer['name']})
+                if layers:
+                    return create_laminated_material_object(layers)
+
+    return None
+
+
+def create_laminated_material_object(materials):
+    """Create a special material object for laminated structures"""
+
+    class LaminatedMaterial:
+        def __init__(self, materials):
+            self.name = self._generate_laminated_name(materials)
+            self.density = self._calculate_average_density(materials)
+            self.is_laminated = True
+            self.layers = materials
+
+        def _generate_laminated_name(self, materials):
+            """Generate a descriptive name for laminated material"""
+            if len(materials) == 1:
+                material = materials[0]
+                name = material.get('name', 'Unknown')
+                return f"{name} (Single Layer)"
+
+            layer_names = []
+            for material in materials:
+                name = material.get('name', 'Unknown')
+                # Extract base material name (remove density info if present)
+                base_name = name.split('(')[0].strip()
+                layer_names.append(base_name)
+
+            # Remove duplicates while preserving order
+            unique_layers = []
+            for layer in layer_names:
+                if layer not in unique_layers:
+                    unique_layers.append(layer)
+
+            if len(unique_layers) == 1:
+                return f"{unique_layers[0]} ({len(materials)}-Layer)"
+            else:
+                return f"{' / '.join(unique_layers)} (Laminated)"
+
+        def _calculate_average_density(self, materials):
+            """Calculate average density for laminated material"""
+            densities = []
+            for material in materials:
+                if 'density' in material:
+                    try:
+                        densities.append(float(material['density']))
+                    except (ValueError, TypeError):
+                        pass
+                # Try to extract density from material name if available
+                elif 'name' in material:
+                    name = material['name']
+                    # Look for density in parentheses in name
+                    import re
+                    match = re.search(r'\(([\d.]+)\s*g/cm³\)', name)
+                    if match:
+                        try:
+                            densities.append(float(match.group(1)))
+                        except (ValueError, TypeError):
+                            pass
+
+            if densities:
+                return round(sum(densities) / len(densities), 3)
+            else:
+                return 0.0  # Default density if none found
+
+    return LaminatedMaterial(materials)
+
+
+def create_laminated_material_from_structure(input_data, materials=None):
+    """Create laminated material from structured input data"""
+    if materials is None:
+        material_ids = {to_material_id(input_data.get(key)) for key, _ in STRUCTURE_MATERIAL_KEYS} - {None}
+        materials = material_registry.in_bulk(material_ids)
+
+    layers = []
+    for key, layer_type in STRUCTURE_MATERIAL_KEYS:
+        if key in input_data and input_data[key]:
+            material = materials.get(to_material_id(input_data[key]))
+            if material:
+                layers.append({
+                    'name': material.name,
+                    'density': material.density,
+                    'type': layer_type
+                })
+
+    if layers:
+        return create_laminated_material_object(layers)
+
+    return None
@@ -0,0 +1,109 @@
+"""
+Precomputed GSM / yield / basis-weight tables per material.
+
+Every material gets a table over the standard film gauges. Columns are stored
+as array('d') so a table is a few compact float buffers. Off-grid thicknesses
+are interpolated between the neighbouring gauges: GSM and basis weight are
+linear in thickness, so the interpolation is exact, and yield is taken as
+1000 / GSM rather than interpolated. Tables are rebuilt whenever the material
+registry version changes, i.e. after any density edit.
+
+Units match ExtrusionCalculator: GSM and basis weight in g/m², yield in m²/kg.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+
+from calculator.material_registry import registry as material_registry
+
+# Standard film gauges in microns
+STANDARD_THICKNESS_UM = (
+    8, 10, 12, 15, 18, 20, 23, 25, 30, 35, 40, 45, 50, 60, 70, 80, 90, 100,
+    120, 150, 180, 200, 250, 300,
+)
+
+
+class GaugeTable:
+    """GSM and yield of one material across the standard thickness grid"""
+
+    def __init__(self, material, thicknesses_um=STANDARD_THICKNESS_UM):
+        self.material_id = material.id
+        self.density = material.density
+        self.thickness_um = array('d', thicknesses_um)
+        self.gsm = array('d', (thickness * material.density for thickness in thicknesses_um))
+        self.yield_m2_kg = array('d', (1000 / gsm if gsm else 0 for gsm in self.gsm))
+
+    def gsm_at(self, thickness_um):
+        """GSM at any thickness: exact on the grid, interpolated between gauges"""
+        if thickness_um <= 0:
+            return 0.0
+        grid = self.thickness_um
+        index = bisect_left(grid, thickness_um)
+        if index < len(grid) and grid[index] == thickness_um:
+            return self.gsm[index]
+        low = min(max(index - 1, 0), len(grid) - 2)
+        fraction = (thickness_um - grid[low]) / (grid[low + 1] - grid[low])
+        return self.gsm[low] + fraction * (self.gsm[low + 1] - self.gsm[low])
+
+    def lookup(self, thickness_um):
+        gsm = self.gsm_at(thickness_um)
+        return {
+            'thickness_um': thickness_um,
+            'gsm': gsm,
+            'basis_weight_g_m2': gsm,
+            'yield_m2_kg': 1000 / gsm if gsm else 0,
+        }
+
+    def lookup_many(self, thicknesses_um):
+        """Columnar results for many thicknesses"""
+        gsm = [self.gsm_at(thickness) for thickness in thicknesses_um]
+        return {
+            'thickness_um': list(thicknesses_um),
+            'gsm': gsm,
+            'basis_weight_g_m2': gsm,
+            'yield_m2_kg': [1000 / value if value else 0 for value in gsm],
+        }
+
+    def as_columns(self):
+        """The precomputed grid itself, in columnar form"""
+        return {
+            'thickness_um': self.thickness_um.tolist(),
+            'gsm': self.gsm.tolist(),
+            'basis_weight_g_m2': self.gsm.tolist(),
+            'yield_m2_kg': self.yield_m2_kg.tolist(),
+        }
+
+
+_tables = (None, {})
+_tables_lock = threading.Lock()
+
+
+def get_gauge_tables():
+    """{material id: GaugeTable}, rebuilt when the material registry version moves"""
+    global _tables
+    version = material_registry.version
+    built_for, tables = _tables
+    if built_for != version:
+        with _tables_lock:
+            built_for, tables = _tables
+            if built_for != version:
+                tables = {material.id: GaugeTable(material) for material in material_registry.all()}
+                _tables = (version, tables)
+    return tables
+
+
+def get_gauge_table(material_id):
+    """GaugeTable for a material; raises PlasticMaterial.DoesNotExist if unknown"""
+    material = material_registry.get(material_id)
+    return get_gauge_tables().get(material.id) or GaugeTable(material)
+
+
+def lookup_gauges(material_ids, thicknesses_um=None):
+    """
+    Bulk lookup: {material id: columnar results} for every material and thickness.
+    Without thicknesses the precomputed standard grid is returned.
+    """
+    return {
+        table.material_id: table.lookup_many(thicknesses_um) if thicknesses_um else table.as_columns()
+        for table in (get_gauge_table(material_id) for material_id in material_ids)
+    }
@@ -0,0 +1,82 @@
+"""
+Layer-stack loading for multi-layer calculations.
+
+Lamination, slitting and bag making all accept a list of layers that each name
+a material. These helpers resolve every layer material in one registry lookup,
+report all unknown materials together, and save layer rows in one insert.
+"""
+from calculator.display_material import to_material_id
+from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import capture_layers
+
+
+class StackLayer:
+    """One layer of a multi-layer structure with its material resolved"""
+
+    def __init__(self, material, thickness, thickness_unit, order, data):
+        self.material = material
+        self.thickness = thickness
+        self.thickness_unit = thickness_unit
+        self.order = order
+        self.data = data
+
+    @property
+    def density(self):
+        return self.material.density
+
+
+def load_layer_stack(layers_data):
+    """
+    Resolve the materials of all layers at once.
+    Raises PlasticMaterial.DoesNotExist naming every layer whose material is unknown.
+    """
+    materials = material_registry.in_bulk(layer.get('material_id') for layer in layers_data)
+
+    layers = []
+    missing = []
+    for order, layer in enumerate(layers_data):
+        material = materials.get(to_material_id(layer.get('material_id')))
+        if material is None:
+            missing.append(f"layer {order + 1} ({layer.get('material_id') or 'no material'})")
+            continue
+        layers.append(StackLayer(
+            material=material,
+            thickness=float(layer.get('thickness', 0)),
+            thickness_unit=layer.get('thickness_unit') or 'micron',
+            order=order,
+            data=layer,
+        ))
+
+    if missing:
+        raise PlasticMaterial.DoesNotExist(f"Material not found for {', '.join(missing)}")
+    return layers
+
+
+def fill_layer_densities(layers_data):
+    """
+    Replace client-supplied density_g_cm3 values with the density of each layer's
+    material, where the layer names one. Layers without a known material keep theirs.
+    """
+    materials = material_registry.in_bulk(layer.get('material_id') for layer in layers_data)
+    for layer in layers_data:
+        material = materials.get(to_material_id(layer.get('material_id')))
+        if material is not None:
+            layer['density_g_cm3'] = material.density
+    return layers_data
+
+
+def save_layers(layer_model, calculation, layers):
+    """Store the layers of a saved calculation with a single bulk insert"""
+    rows = layer_model.objects.bulk_create([
+        layer_model(
+            calculation=calculation,
+            material=layer.material,
+            thickness=layer.thickness,
+            thickness_unit=layer.thickness_unit,
+            layer_order=layer.order,
+        )
+        for layer in layers
+    ])
+    capture_layers(layer_model, rows)
+    return rows
@@ -0,0 +1,216 @@
+"""
+Write-through sync between the per-section calculation tables and CalculationLedger.
+
+Each section keeps saving into its own model; the signal handlers below mirror
+those rows into the ledger so history pages and exports can read one table.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+
+SECTION_MODELS = {
+    'extrusion': 'extrusion.ExtrusionCalculation',
+    'printing': 'printing.PrintingCalculation',
+    'lamination': 'lamination.LaminationCalculation',
+    'slitting': 'slitting.SlittingCalculation',
+    'bag_making': 'bag_making.BagMakingCalculation',
+    'sales': 'sales.SalesCalculation',
+}
+
+
+_sync_state = threading.local()
+
+
+def get_section_model(section):
+    """Return the calculation model that owns a section"""
+    return apps.get_model(SECTION_MODELS[section])
+
+
+def get_model_section(model):
+    """Return the section name for a calculation model, or None"""
+    label = model._meta.label
+    for section, model_label in SECTION_MODELS.items():
+        if model_label == label:
+            return section
+    return None
+
+
+def ledger_fields(calculation, section):
+    """Fields copied from a section row into its ledger row, plus its display-material snapshot"""
+    from .display_material import material_snapshot
+
+    fields = {
+        'calculation_type': calculation.calculation_type,
+        'material_id': getattr(calculation, 'material_id', None),
+        'input_data': calculation.input_data,
+        'result_data': calculation.result_data,
+        'timestamp': calculation.timestamp,
+        'user_id': calculation.user_id,
+    }
+    snapshot = material_snapshot(calculation, section=section)
+    if fields['material_id'] is None:
+        fields['material_id'] = snapshot.get('material_id')
+    snapshot.pop('material_id', None)
+    fields.update(snapshot)
+    return fields
+
+
+def parse_qualified_id(value):
+    """Split a section-qualified id such as 'extrusion:123' into ('extrusion', 123)"""
+    section, _, source_id = str(value).partition(':')
+    if section not in SECTION_MODELS or not source_id.isdigit():
+        raise ValueError(f"Invalid calculation id: {value}")
+    return section, int(source_id)
+
+
+def route_calculation_ids(values, user):
+    """
+    Map section-qualified ids ('extrusion:123') and ledger ids ('456' or 'ledger:456')
+    to their owning section tables without probing every model.
+    Returns ({section: {source ids}}, [values that could not be routed]).
+    Ledger ids cost one query in total, qualified ids none.
+    """
+    from .models import CalculationLedger
+
+    grouped = {}
+    invalid = []
+    ledger_ids = {}
+    for value in values:
+        value = str(value).strip()
+        ledger_id = value.partition('ledger:')[2] if value.startswith('ledger:') else value
+        if ledger_id.isdigit():
+            ledger_ids[int(ledger_id)] = value
+            continue
+        try:
+            section, source_id = parse_qualified_id(value)
+        except ValueError:
+            invalid.append(value)
+            continue
+        grouped.setdefault(section, set()).add(source_id)
+
+    if ledger_ids:
+        entries = CalculationLedger.objects.filter(pk__in=ledger_ids, user=user).values_list('pk', 'section', 'source_id')
+        for pk, section, source_id in entries:
+            grouped.setdefault(section, set()).add(source_id)
+            ledger_ids.pop(pk)
+        invalid.extend(ledger_ids.values())
+
+    return grouped, invalid
+
+
+def delete_calculations(user, grouped):
+    """
+    Delete routed calculations owned by `user` with one filtered delete per section.
+    Returns (deleted count, ids that were not found).
+    """
+    from .counters import adjust_counter
+    from .dashboard import invalidate_dashboard
+    from .models import CalculationLedger
+
+    if not grouped:
+        return 0, []
+
+    owned_filter = Q()
+    for section, ids in grouped.items():
+        owned_filter |= Q(section=section, source_id__in=ids)
+    owned = set(CalculationLedger.objects.filter(owned_filter, user=user).values_list('section', 'source_id'))
+
+    deleted_count = 0
+    missing = []
+    with transaction.atomic(), suspend_ledger_sync():
+        for section, ids in grouped.items():
+            owned_ids = [source_id for source_id in ids if (section, source_id) in owned]
+            missing.extend(f"{section}:{source_id}" for source_id in sorted(ids) if (section, source_id) not in owned)
+            if not owned_ids:
+                continue
+
+            model = get_section_model(section)
+            _, deleted = model.objects.filter(id__in=owned_ids, user=user).delete()
+            section_deleted = deleted.get(model._meta.label, 0)
+            deleted_count += section_deleted
+            CalculationLedger.objects.filter(section=section, source_id__in=owned_ids).delete()
+            adjust_counter(user.pk, section, -section_deleted)
+        transaction.on_commit(partial(invalidate_dashboard, user.pk))
+
+    return deleted_count, missing
+
+
+def bulk_create_calculations(model, calculations):
+    """
+    Insert many calculations of one section with a single bulk_create.
+    bulk_create sends no post_save signals, so the ledger rows, counters and
+    dashboards those handlers keep are written here instead: one more insert
+    for the ledger and one counter update per user.
+    """
+    from .counters import adjust_counter
+    from .dashboard import invalidate_dashboard
+    from .models import CalculationLedger
+
+    section = get_model_section(model)
+    with transaction.atomic():
+        created = model.objects.bulk_create(calculations)
+        CalculationLedger.objects.bulk_create([
+            CalculationLedger(section=section, source_id=calculation.pk, **ledger_fields(calculation, section))
+            for calculation in created
+        ])
+        per_user = Counter(calculation.user_id for calculation in created if calculation.user_id)
+        for user_id, count in per_user.items():
+            adjust_counter(user_id, section, count)
+            transaction.on_commit(partial(invalidate_dashboard, user_id))
+    return created
+
+
+@contextmanager
+def suspend_ledger_sync():
+    """
+    Skip the per-row ledger and counter signal handlers, for set-based writes
+    that update both themselves (e.g. one filtered delete per section).
+    """
+    previous = getattr(_sync_state, 'suspended', False)
+    _sync_state.suspended = True
+    try:
+        yield
+    finally:
+        _sync_state.suspended = previous
+
+
+def sync_suspended():
+    return getattr(_sync_state, 'suspended', False)
+
+
+def record_calculation(sender, instance, created, raw=False, **kwargs):
+    """post_save: create or refresh the ledger row for a section calculation"""
+    from .models import CalculationLedger
+
+    if raw or sync_suspended():
+        return
+
+    section = get_model_section(sender)
+    fields = ledger_fields(instance, section)
+    if created:
+        CalculationLedger.objects.create(section=section, source_id=instance.pk, **fields)
+    elif not CalculationLedger.objects.filter(section=section, source_id=instance.pk).update(**fields):
+        CalculationLedger.objects.create(section=section, source_id=instance.pk, **fields)
+
+
+def forget_calculation(sender, instance, **kwargs):
+    """post_delete: drop the ledger row of a deleted section calculation"""
+    from .models import CalculationLedger
+
+    if sync_suspended():
+        return
+
+    CalculationLedger.objects.filter(section=get_model_section(sender), source_id=instance.pk).delete()
+
+
+def connect_signals():
+    for section, model_label in SECTION_MODELS.items():
+        model = apps.get_model(model_label)
+        post_save.connect(record_calculation, sender=model, dispatch_uid=f'ledger_save_{section}')
+        post_delete.connect(forget_calculation, sender=model, dispatch_uid=f'ledger_delete_{section}')
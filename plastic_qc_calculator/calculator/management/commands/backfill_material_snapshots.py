@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from calculator.models import CalculationLedger
+from calculator.display_material import load_referenced_materials, material_snapshot
+
+SNAPSHOT_FIELDS = ['material', 'material_label', 'material_density', 'material_layers']
+
+
+class Command(BaseCommand):
+    help = 'Write display-material snapshots for calculation ledger rows saved without one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute snapshots for every row, not only missing ones')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = CalculationLedger.objects.select_related('material').order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(material_label__isnull=True)
+
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            materials = load_referenced_materials(batch)
+            for entry in batch:
+                snapshot = material_snapshot(entry, materials)
+                if entry.material_id is None:
+                    entry.material_id = snapshot.get('material_id')
+                snapshot.pop('material_id', None)
+                for field, value in snapshot.items():
+                    setattr(entry, field, value)
+
+            CalculationLedger.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            updated += len(batch)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f'Updated material snapshots for {updated} calculations'))
@@ -0,0 +1,136 @@
+"""
+In-process registry of PlasticMaterial rows.
+
+The materials table is small and rarely changes, so each worker loads it once
+and serves lookups by id or code from memory. Saves and deletes bump a version
+stamp in the 'materials' cache namespace; other workers compare against it at
+most every CHECK_INTERVAL seconds and reload when it has moved.
+
+Writes that bypass model signals (queryset.update(), raw SQL) must call
+invalidate() themselves.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from .models import PlasticMaterial
+
+VERSION_KEY = 'plastic_materials:version'
+CHECK_INTERVAL = 5  # seconds between checks of the shared version stamp
+
+
+class MaterialRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = None
+        self._by_code = {}
+        self._ordered = []
+        self._version = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self):
+        """Version stamp of the materials currently loaded"""
+        self._ensure_loaded()
+        return self._version
+
+    def get(self, material_id):
+        """Material by primary key; raises PlasticMaterial.DoesNotExist like objects.get(id=...)"""
+        try:
+            material_id = int(material_id)
+        except (TypeError, ValueError):
+            material_id = None
+        material = self._materials().get(material_id)
+        if material is None:
+            raise PlasticMaterial.DoesNotExist('PlasticMaterial matching query does not exist.')
+        return material
+
+    def get_or_none(self, material_id):
+        try:
+            return self.get(material_id)
+        except PlasticMaterial.DoesNotExist:
+            return None
+
+    def get_by_code(self, code):
+        self._ensure_loaded()
+        material = self._by_code.get(code)
+        if material is None:
+            raise PlasticMaterial.DoesNotExist('PlasticMaterial matching query does not exist.')
+        return material
+
+    def in_bulk(self, material_ids):
+        """{id: material} for the ids that exist, like objects.in_bulk()"""
+        materials = self._materials()
+        found = {}
+        for material_id in material_ids:
+            try:
+                material = materials.get(int(material_id))
+            except (TypeError, ValueError):
+                continue
+            if material is not None:
+                found[material.pk] = material
+        return found
+
+    def first(self):
+        """Lowest-pk material, like objects.first() on the unordered table"""
+        self._ensure_loaded()
+        return self._ordered[0] if self._ordered else None
+
+    def all(self):
+        self._ensure_loaded()
+        return list(self._ordered)
+
+    def invalidate(self):
+        """Drop this worker's copy and move the shared version so other workers reload"""
+        caches['materials'].set(VERSION_KEY, uuid.uuid4().hex, None)
+        with self._lock:
+            self._by_id = None
+
+    def _materials(self):
+        return self._ensure_loaded()
+
+    def _ensure_loaded(self):
+        """Reload if invalidated or the shared version moved; returns the id map"""
+        by_id = self._by_id
+        now = time.monotonic()
+        if by_id is not None and now - self._checked_at < CHECK_INTERVAL:
+            return by_id
+        with self._lock:
+            version = self._shared_version()
+            if self._by_id is None or version != self._version:
+                self._load(version)
+            self._checked_at = now
+            return self._by_id
+
+    def _shared_version(self):
+        cache = caches['materials']
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY, version)
+        return version
+
+    def _load(self, version):
+        ordered = list(PlasticMaterial.objects.order_by('pk'))
+        self._by_code = {material.code: material for material in ordered}
+        self._ordered = ordered
+        self._by_id = {material.pk: material for material in ordered}
+        self._version = version
+
+
+registry = MaterialRegistry()
+
+
+def material_changed(sender, **kwargs):
+    """post_save/post_delete: reload materials once the change is committed"""
+    transaction.on_commit(registry.invalidate)
+
+
+def connect_signals():
+    post_save.connect(material_changed, sender=PlasticMaterial, dispatch_uid='material_registry_save')
+    post_delete.connect(material_changed, sender=PlasticMaterial, dispatch_uid='material_registry_delete')
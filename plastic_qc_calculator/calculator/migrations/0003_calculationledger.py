@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0002_densitycalculation_user_delete_calculationhistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalculationLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(choices=[('extrusion', 'Extrusion'), ('printing', 'Printing'), ('lamination', 'Lamination'), ('slitting', 'Slitting'), ('bag_making', 'Bag Making'), ('sales', 'Sales')], max_length=20)),
+                ('source_id', models.BigIntegerField(help_text='Primary key of the row in the section table')),
+                ('calculation_type', models.CharField(max_length=50)),
+                ('input_data', models.JSONField()),
+                ('result_data', models.JSONField()),
+                ('timestamp', models.DateTimeField()),
+                ('material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='calculator.plasticmaterial')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp', '-id'],
+                'indexes': [models.Index(fields=['user', 'timestamp'], name='calculator__user_id_b70c1e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('section', 'source_id'), name='unique_ledger_source')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+SECTION_MODELS = {
+    'extrusion': ('extrusion', 'ExtrusionCalculation'),
+    'printing': ('printing', 'PrintingCalculation'),
+    'lamination': ('lamination', 'LaminationCalculation'),
+    'slitting': ('slitting', 'SlittingCalculation'),
+    'bag_making': ('bag_making', 'BagMakingCalculation'),
+    'sales': ('sales', 'SalesCalculation'),
+}
+
+BATCH_SIZE = 2000
+
+
+def backfill_ledger(apps, schema_editor):
+    CalculationLedger = apps.get_model('calculator', 'CalculationLedger')
+
+    for section, (app_label, model_name) in SECTION_MODELS.items():
+        model = apps.get_model(app_label, model_name)
+        has_material = any(field.name == 'material' for field in model._meta.fields)
+
+        batch = []
+        for calc in model.objects.all().iterator(chunk_size=BATCH_SIZE):
+            batch.append(CalculationLedger(
+                section=section,
+                source_id=calc.pk,
+                calculation_type=calc.calculation_type,
+                material_id=calc.material_id if has_material else None,
+                input_data=calc.input_data,
+                result_data=calc.result_data,
+                timestamp=calc.timestamp,
+                user_id=calc.user_id,
+            ))
+            if len(batch) >= BATCH_SIZE:
+                CalculationLedger.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            CalculationLedger.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0003_calculationledger'),
+        ('extrusion', '0001_initial'),
+        ('printing', '0001_initial'),
+        ('lamination', '0001_initial'),
+        ('slitting', '0001_initial'),
+        ('bag_making', '0001_initial'),
+        ('sales', '0003_laminatedstructure_delete_laminatedfilm_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0004_backfill_calculation_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calculationledger',
+            name='material_density',
+            field=models.FloatField(blank=True, db_index=True, help_text='Density in g/cm³', null=True),
+        ),
+        migrations.AddField(
+            model_name='calculationledger',
+            name='material_label',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='calculationledger',
+            name='material_layers',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
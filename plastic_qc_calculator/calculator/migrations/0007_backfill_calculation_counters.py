@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count
+
+COUNTED_MODELS = {
+    'extrusion': ('extrusion', 'ExtrusionCalculation'),
+    'printing': ('printing', 'PrintingCalculation'),
+    'lamination': ('lamination', 'LaminationCalculation'),
+    'slitting': ('slitting', 'SlittingCalculation'),
+    'bag_making': ('bag_making', 'BagMakingCalculation'),
+    'sales': ('sales', 'SalesCalculation'),
+    'density': ('calculator', 'DensityCalculation'),
+}
+
+
+def backfill_counters(apps, schema_editor):
+    CalculationCounter = apps.get_model('calculator', 'CalculationCounter')
+    CalculationCounter.objects.all().delete()
+
+    counters = []
+    for section, (app_label, model_name) in COUNTED_MODELS.items():
+        model = apps.get_model(app_label, model_name)
+        totals = model.objects.filter(user__isnull=False).values('user').annotate(total=Count('id'))
+        for row in totals:
+            counters.append(CalculationCounter(user_id=row['user'], section=section, count=row['total']))
+
+    CalculationCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0006_calculationcounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
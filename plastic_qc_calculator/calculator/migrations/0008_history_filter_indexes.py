@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0007_backfill_calculation_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calculationledger',
+            index=models.Index(fields=['user', 'section', 'timestamp'], name='calculator__user_id_ebb2ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calculationledger',
+            index=models.Index(fields=['user', 'calculation_type', 'timestamp'], name='calculator__user_id_db5602_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calculationledger',
+            index=models.Index(fields=['user', 'material', 'timestamp'], name='calculator__user_id_fe5a2c_idx'),
+        ),
+    ]
@@ -38,3 +38,78 @@ class PlasticMaterial(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.code}) - Density: {self.density} g/cm³"
+
+
+class CalculationLedger(models.Model):
+    """One row per saved calculation across every section, kept in sync by calculator.ledger"""
+    SECTION_CHOICES = [
+        ('extrusion', 'Extrusion'),
+        ('printing', 'Printing'),
+        ('lamination', 'Lamination'),
+        ('slitting', 'Slitting'),
+        ('bag_making', 'Bag Making'),
+        ('sales', 'Sales'),
+    ]
+
+    section = models.CharField(max_length=20, choices=SECTION_CHOICES)
+    source_id = models.BigIntegerField(help_text="Primary key of the row in the section table")
+    calculation_type = models.CharField(max_length=50)
+    # The section row's material, or the single material its input_data refers to
+    material = models.ForeignKey(PlasticMaterial, on_delete=models.SET_NULL, null=True, blank=True)
+    input_data = models.JSONField()
+    result_data = models.JSONField()
+    timestamp = models.DateTimeField()
+
+    # Display-material snapshot taken when the calculation is saved (null = not yet written)
+    material_label = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    material_density = models.FloatField(null=True, blank=True, db_index=True, help_text="Density in g/cm³")
+    material_layers = models.JSONField(default=list, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(fields=['user', 'section', 'timestamp']),
+            models.Index(fields=['user', 'calculation_type', 'timestamp']),
+            models.Index(fields=['user', 'material', 'timestamp']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['section', 'source_id'], name='unique_ledger_source'),
+        ]
+
+    @property
+    def qualified_id(self):
+        """Section-qualified id, e.g. 'extrusion:123', unique across all section tables"""
+        return f"{self.section}:{self.source_id}"
+
+    def get_calculation_type_display(self):
+        """Use the choices of the owning section model where it has them"""
+        from .ledger import get_section_model
+        choices = getattr(get_section_model(self.section), 'CALCULATION_TYPES', [])
+        return dict(choices).get(self.calculation_type, self.calculation_type.replace('_', ' ').title())
+
+    def __str__(self):
+        return f"{self.get_section_display()} #{self.source_id} - {self.calculation_type}"
+
+
+class CalculationCounter(models.Model):
+    """Running number of saved calculations per user and section, kept in sync by calculator.counters"""
+    SECTION_CHOICES = CalculationLedger.SECTION_CHOICES + [('density', 'Density')]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='calculation_counters')
+    section = models.CharField(max_length=20, choices=SECTION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'section'], name='unique_counter_user_section'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.get_section_display()}: {self.count}"
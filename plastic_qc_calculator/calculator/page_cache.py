@@ -0,0 +1,20 @@
+"""
+Fragment caching for the section home pages.
+
+The calculator forms on each section home page only change with the material
+list, so the templates wrap them in {% cache %} blocks keyed on the material
+registry version and the visitor's auth state and stored in the 'pages'
+cache namespace. base.html carries the user's name and admin badges, so whole
+responses are not cached.
+"""
+from django.core.cache import caches
+
+from calculator.material_registry import registry as material_registry
+
+
+def section_page_context():
+    """Context the section home templates use to key their cached fragments"""
+    return {
+        'materials_version': material_registry.version,
+        'page_cache_timeout': caches['pages'].default_timeout,
+    }
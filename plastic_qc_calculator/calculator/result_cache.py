@@ -0,0 +1,172 @@
+"""
+Memoization of section calculator responses.
+
+Every calculate_* endpoint is a pure function of its JSON body and the
+material densities, so identical submissions reuse the first response. Entries
+are keyed on the endpoint path, a canonical form of the body and the material
+registry version, and held in the 'results' cache namespace, whose backend
+provides LRU/cull eviction, the TTL and hit/miss statistics.
+
+A cache hit must still record history. While a miss runs, the section rows
+it creates (and any layer rows saved through calculator.layer_stack) are
+captured; a hit replays them for the requesting user. Views only save rows for
+signed-in users, so anonymous and signed-in requests never share an entry.
+"""
+import copy
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.apps import apps
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.db.models.signals import post_save
+
+from .ledger import SECTION_MODELS
+from .material_registry import registry as material_registry
+
+# Captured fields that are set again when a calculation is replayed
+REPLAY_EXCLUDED_FIELDS = {'id', 'timestamp', 'user'}
+
+_capture_state = threading.local()
+_key_version_providers = []
+
+
+def normalise_inputs(value):
+    """
+    Canonical form of a request body: numeric strings and ints become floats so
+    '25', 25 and 25.0 share an entry; dict keys are sorted when serialised.
+    """
+    if isinstance(value, dict):
+        return {key: normalise_inputs(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalise_inputs(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def register_key_version(provider):
+    """
+    Add reference data to every result key. `provider(data)` returns a version
+    stamp for whatever the request body refers to, or '' when it refers to none.
+    """
+    if provider not in _key_version_providers:
+        _key_version_providers.append(provider)
+
+
+def result_key(path, data, authenticated=True):
+    canonical = json.dumps(normalise_inputs(data), sort_keys=True, separators=(',', ':'))
+    versions = '|'.join(str(provider(data)) for provider in _key_version_providers)
+    audience = 'user' if authenticated else 'anonymous'
+    raw = f"{path}|{audience}|{material_registry.version}|{versions}|{canonical}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def memoize_result(view):
+    """
+    Serve repeated identical JSON submissions to a calculate_* view from the
+    result cache. Only successful responses are stored.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return view(request, *args, **kwargs)
+        try:
+            data = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return view(request, *args, **kwargs)
+
+        # An anonymous miss saves no rows, so its entry must not serve signed-in users
+        authenticated = request.user.is_authenticated
+        key = result_key(request.path, data, authenticated)
+        cache = caches['results']
+        cached = cache.get(key)
+        if cached is not None:
+            if authenticated:
+                replay_calculations(cached['rows'], request.user)
+            return HttpResponse(cached['content'], content_type=cached['content_type'])
+
+        with capture_calculations() as rows:
+            response = view(request, *args, **kwargs)
+
+        if response.status_code == 200 and is_successful(response):
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'rows': rows,
+            })
+        return response
+
+    return wrapper
+
+
+def is_successful(response):
+    try:
+        return json.loads(response.content).get('success') is True
+    except (ValueError, AttributeError):
+        return False
+
+
+@contextmanager
+def capture_calculations():
+    """Collect the calculation and layer rows written while the block runs"""
+    previous = getattr(_capture_state, 'rows', None)
+    _capture_state.rows = []
+    try:
+        yield _capture_state.rows
+    finally:
+        _capture_state.rows = previous
+
+
+def capturing():
+    return getattr(_capture_state, 'rows', None) is not None
+
+
+def capture_layers(layer_model, layers):
+    """Called by layer_stack.save_layers for rows inserted without signals"""
+    if not capturing():
+        return
+    _capture_state.rows.append(('layers', layer_model._meta.label, [
+        row_fields(layer, exclude={'id', 'calculation'}) for layer in layers
+    ]))
+
+
+def capture_calculation(sender, instance, created, raw=False, **kwargs):
+    """post_save: remember section rows created by a memoized view"""
+    if created and not raw and capturing():
+        _capture_state.rows.append(('calculation', sender._meta.label, row_fields(instance)))
+
+
+def row_fields(instance, exclude=REPLAY_EXCLUDED_FIELDS):
+    return {
+        field.attname: copy.deepcopy(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+        if field.name not in exclude
+    }
+
+
+def replay_calculations(rows, user):
+    """Create the captured rows again for `user`, so a cache hit still records history"""
+    calculation = None
+    for kind, model_label, fields in rows:
+        model = apps.get_model(model_label)
+        if kind == 'calculation':
+            calculation = model.objects.create(user=user, **copy.deepcopy(fields))
+        elif calculation is not None:
+            model.objects.bulk_create([model(calculation=calculation, **layer) for layer in fields])
+
+
+def connect_signals():
+    for section, model_label in SECTION_MODELS.items():
+        post_save.connect(capture_calculation, sender=apps.get_model(model_label),
+                          dispatch_uid=f'result_cache_capture_{section}')
@@ -0,0 +1,37 @@
+"""
+Helpers for streamed file downloads (history exports, roll-inventory results).
+"""
+import zlib
+
+from django.http import StreamingHttpResponse
+
+
+class Echo:
+    """File-like object whose write() hands the row back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def stream_download(chunks, content_type, filename, compress=False):
+    """Wrap text chunks in a streamed attachment, optionally gzip-compressed on the fly"""
+    encoded = (chunk.encode('utf-8') for chunk in chunks)
+
+    if compress:
+        encoded = gzip_stream(encoded)
+        content_type = 'application/gzip'
+        filename = f'{filename}.gz'
+
+    response = StreamingHttpResponse(encoded, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def gzip_stream(chunks):
+    """Compress a byte stream incrementally into the gzip format"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -2,12 +2,19 @@ import json
 import re
 from django import template
 from datetime import datetime, timedelta
+from calculator.models import CalculationLedger
 
 register = template.Library()
 
+SECTION_NAMES = dict(CalculationLedger.SECTION_CHOICES)
+
 @register.filter
 def get_section_name(calculation):
     """Get section name from calculation object"""
+    section = getattr(calculation, 'section', None)
+    if section in SECTION_NAMES:
+        return SECTION_NAMES[section]
+
     model_name = calculation.__class__.__name__
     if 'Extrusion' in model_name:
         return 'Extrusion'
@@ -69,29 +76,39 @@ def is_recent(calculation):
     return calculation.timestamp.replace(tzinfo=None) >= one_week_ago
 
 
+def section_count(calculations, section):
+    """
+    Count for a section. Takes the {section: count} mapping from
+    calculator.counters.get_section_counts; plain calculation lists are still
+    counted row by row.
+    """
+    if isinstance(calculations, dict):
+        return calculations.get(section, 0)
+    return len([c for c in calculations if get_section_name(c) == SECTION_NAMES[section]])
+
 @register.filter
 def extrusion_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'extrusion'])
+    return section_count(calculations, 'extrusion')
 
 @register.filter
 def printing_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'printing'])
+    return section_count(calculations, 'printing')
 
 @register.filter
 def lamination_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'lamination'])
+    return section_count(calculations, 'lamination')
 
 @register.filter
 def slitting_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'slitting'])
+    return section_count(calculations, 'slitting')
 
 @register.filter
 def bag_making_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'bag making'])
+    return section_count(calculations, 'bag_making')
 
 @register.filter
 def sales_count(calculations):
-    return len([c for c in calculations if hasattr(c, 'get_section_name') and c.get_section_name().lower() == 'sales'])
+    return section_count(calculations, 'sales')
 
 
 @register.filter
@@ -1,3 +1,621 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from calculator.cache_backends import cache_stats
+from calculator.columnar import column_values, group_totals, run_formula, scale_column, to_column
+from calculator.counters import adjust_counter, get_section_counts
+from calculator.dashboard import get_dashboard_stats
+from calculator.display_material import resolve_display_materials
+from calculator.gauge_tables import STANDARD_THICKNESS_UM, get_gauge_table
+from calculator.layer_stack import fill_layer_densities, load_layer_stack, save_layers
+from calculator.ledger import bulk_create_calculations, delete_calculations
+from calculator.material_registry import MaterialRegistry, registry as material_registry
+from calculator.models import CalculationCounter, CalculationLedger, DensityCalculation, PlasticMaterial
+from calculator.views_history import get_history_page
+from extrusion.models import ExtrusionCalculation
+from lamination.models import LaminationCalculation, LaminationLayer
+from printing.models import PrintingCalculation
+from sales.models import SalesCalculation
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    material_registry.invalidate()
+
+
+class ResultCacheTests(TestCase):
+    url = '/sales/calculate-material-cost-kg/'
+
+    def setUp(self):
+        clear_caches()
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        self.body = json.dumps({'material_id': self.material.pk, 'total_material_cost': 500, 'output_mass_kg': 100})
+
+    def post(self):
+        return self.client.post(self.url, self.body, content_type='application/json').json()
+
+    def test_hit_replays_history_for_user(self):
+        self.client.force_login(self.user)
+        first = self.post()
+        second = self.post()
+        self.assertEqual(first, second)
+        self.assertEqual(SalesCalculation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(CalculationLedger.objects.filter(user=self.user, section='sales').count(), 2)
+
+    def test_anonymous_entry_is_not_served_to_users(self):
+        self.assertTrue(self.post()['success'])
+        self.assertEqual(SalesCalculation.objects.count(), 0)
+
+        self.client.force_login(self.user)
+        self.assertTrue(self.post()['success'])
+        self.assertEqual(SalesCalculation.objects.filter(user=self.user).count(), 1)
+
+    def test_equivalent_bodies_share_an_entry(self):
+        self.client.force_login(self.user)
+        self.post()
+        hits = cache_stats()['results']['hits']
+        body = json.dumps({'material_id': str(self.material.pk), 'total_material_cost': '500.0', 'output_mass_kg': 100.0})
+        self.client.post(self.url, body, content_type='application/json')
+        self.assertEqual(SalesCalculation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(cache_stats()['results']['hits'], hits + 1)
+
+
+DB_CACHE = {
+    'BACKEND': 'calculator.cache_backends.DatabaseCache',
+    'LOCATION': 'qc_cache_stats_test',
+    'KEY_PREFIX': 'stats_test',
+    'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 2},
+}
+
+
+@override_settings(CACHES={**settings.CACHES, 'stats_test': DB_CACHE})
+class CacheStatsTests(TestCase):
+    def setUp(self):
+        call_command('createcachetable', verbosity=0)
+        self.cache = caches['stats_test']
+        self.cache.clear()
+
+    def stats(self):
+        return cache_stats()['stats_test']
+
+    def test_hits_misses_and_size(self):
+        before = self.stats()
+        self.cache.set('a', 1)
+        self.cache.get('a')
+        self.cache.get('b')
+        after = self.stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['size'], 1)
+
+    def test_expired_rows_are_not_evictions(self):
+        evictions = self.stats()['evictions']
+        for key in 'abc':
+            self.cache.set(key, 1, 0)  # already expired
+        for key in 'defg':
+            self.cache.set(key, 1)
+        self.assertEqual(self.stats()['evictions'], evictions)
+
+        self.cache.set('h', 1)  # four live rows over a limit of three: half are culled
+        self.assertEqual(self.stats()['evictions'], evictions + 2)
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+
+    def calculate(self, **fields):
+        return ExtrusionCalculation.objects.create(
+            calculation_type='THICKNESS', material=self.material, user=self.user,
+            input_data={'material_id': self.material.pk}, result_data={'thickness_um': 40}, **fields,
+        )
+
+    def test_section_rows_are_mirrored(self):
+        calculation = self.calculate()
+        entry = CalculationLedger.objects.get(section='extrusion', source_id=calculation.pk)
+        self.assertEqual(entry.user, self.user)
+        self.assertEqual(entry.material, self.material)
+        self.assertEqual(entry.timestamp, calculation.timestamp)
+        self.assertEqual(entry.qualified_id, f'extrusion:{calculation.pk}')
+
+        calculation.result_data = {'thickness_um': 50}
+        calculation.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.result_data, {'thickness_um': 50})
+
+        calculation.delete()
+        self.assertFalse(CalculationLedger.objects.filter(section='extrusion').exists())
+
+    def test_history_page_reads_the_ledger(self):
+        self.calculate()
+        SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                        input_data={}, result_data={})
+        self.client.force_login(self.user)
+
+        response = self.client.get('/calculation-history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([calc.section for calc in response.context['calculations']], ['sales', 'extrusion'])
+        self.assertEqual(response.context['total_calculations'], 2)
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        for _ in range(5):
+            SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                            input_data={}, result_data={})
+        # Rows sharing a timestamp must still page in a stable order
+        timestamp = CalculationLedger.objects.first().timestamp
+        CalculationLedger.objects.exclude(pk=CalculationLedger.objects.earliest('id').pk).update(timestamp=timestamp)
+        self.client.force_login(self.user)
+
+    def test_cursor_walks_every_row_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_history_page(CalculationLedger.objects.filter(user=self.user), cursor, page_size=2)
+            seen.extend(calc.pk for calc in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(CalculationLedger.objects.order_by('-timestamp', '-id').values_list('pk', flat=True)))
+
+    def test_api_returns_next_page(self):
+        page, cursor = get_history_page(CalculationLedger.objects.filter(user=self.user), page_size=4)
+        response = self.client.get('/calculation-history/api/', {'cursor': cursor}).json()
+        self.assertTrue(response['success'])
+        self.assertIsNone(response['next_cursor'])
+        self.assertEqual(len(response['calculations']), 1)
+        self.assertNotIn(response['calculations'][0]['id'], [calc.qualified_id for calc in page])
+
+    def test_api_rejects_bad_cursor(self):
+        response = self.client.get('/calculation-history/api/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class HistoryExportTests(TestCase):
+    def setUp(self):
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        for thickness in (40, 50, 60):
+            ExtrusionCalculation.objects.create(
+                calculation_type='THICKNESS', material=self.material, user=self.user,
+                input_data={'material_id': self.material.pk}, result_data={'thickness_um': thickness},
+            )
+        self.client.force_login(self.user)
+
+    def download(self, format_type, **params):
+        response = self.client.get(f'/download-history/{format_type}/', params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_streams_every_row(self):
+        response, content = self.download('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0][:3], ['Section', 'Calculation Type', 'Material'])
+        self.assertEqual([json.loads(row[5]) for row in rows[1:]],
+                         [{'thickness_um': 60}, {'thickness_um': 50}, {'thickness_um': 40}])
+        self.assertEqual({row[2] for row in rows[1:]}, {'LDPE'})
+
+    def test_json_streams_a_valid_document(self):
+        response, content = self.download('json')
+        document = json.loads(content)
+        self.assertEqual(document['total_calculations'], 3)
+        self.assertEqual([calc['result_data'] for calc in document['calculations']],
+                         [{'thickness_um': 60}, {'thickness_um': 50}, {'thickness_um': 40}])
+
+    def test_ndjson_writes_one_record_per_line(self):
+        response, content = self.download('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([record['material'] for record in records], ['LDPE'] * 3)
+
+    def test_gzip_wraps_the_export(self):
+        response, content = self.download('ndjson', gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.ndjson.gz"'))
+        self.assertEqual(len(gzip.decompress(content).decode().splitlines()), 3)
+
+
+class DisplayMaterialTests(TestCase):
+    def setUp(self):
+        self.ldpe = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.pet = PlasticMaterial.objects.create(name='PET', code='PET', material_type='FILM', density=1.38)
+        material_registry.invalidate()
+
+    def test_batch_resolves_from_the_registry(self):
+        rows = [
+            CalculationLedger(section='printing', input_data={'material_id': str(self.ldpe.pk)}, result_data={}),
+            CalculationLedger(section='slitting', input_data={'material_detail': {'id': self.pet.pk}}, result_data={}),
+            CalculationLedger(section='lamination', result_data={}, input_data={
+                'primary_material_id': self.pet.pk, 'secondary_material_id': self.ldpe.pk,
+            }),
+            CalculationLedger(section='printing', input_data={'material_id': 999999}, result_data={}),
+        ]
+        material_registry.all()
+        with self.assertNumQueries(0):
+            resolve_display_materials(rows)
+
+        self.assertEqual([getattr(row.display_material, 'name', None) for row in rows],
+                         ['LDPE', 'PET', 'PET / LDPE (Laminated)', None])
+        self.assertEqual(rows[2].display_material.density, round((1.38 + 0.92) / 2, 3))
+
+    def test_snapshot_is_written_on_save(self):
+        calculation = PrintingCalculation.objects.create(
+            calculation_type='GSM_CALCULATION', input_data={'material_id': self.pet.pk}, result_data={},
+        )
+        entry = CalculationLedger.objects.get(section='printing', source_id=calculation.pk)
+        self.assertEqual((entry.material_id, entry.material_label, entry.material_density), (self.pet.pk, 'PET', 1.38))
+
+        with self.assertNumQueries(0):
+            resolve_display_materials([entry])
+        self.assertEqual(entry.display_material.name, 'PET')
+
+    def test_backfill_command_fills_missing_snapshots(self):
+        PrintingCalculation.objects.create(
+            calculation_type='GSM_CALCULATION', input_data={'material_id': self.ldpe.pk}, result_data={},
+        )
+        CalculationLedger.objects.update(material=None, material_label=None, material_density=None, material_layers=[])
+
+        call_command('backfill_material_snapshots', stdout=io.StringIO())
+
+        entry = CalculationLedger.objects.get()
+        self.assertEqual((entry.material_id, entry.material_label, entry.material_density), (self.ldpe.pk, 'LDPE', 0.92))
+        self.assertEqual(entry.material_layers, [{'id': self.ldpe.pk, 'name': 'LDPE', 'density': 0.92}])
+
+
+class DeleteCalculationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        self.other = get_user_model().objects.create_user('other', password='pw', is_approved=True)
+        self.sales = [self.calculate(SalesCalculation, self.user) for _ in range(2)]
+        self.printing = self.calculate(PrintingCalculation, self.user)
+        self.foreign = self.calculate(SalesCalculation, self.other)
+        self.client.force_login(self.user)
+
+    def calculate(self, model, user):
+        return model.objects.create(calculation_type='GSM_CALCULATION', user=user, input_data={}, result_data={})
+
+    def test_bulk_delete_by_qualified_ids(self):
+        ids = [f'sales:{calc.pk}' for calc in self.sales] + [
+            f'printing:{self.printing.pk}', f'sales:{self.foreign.pk}', 'nope:1',
+        ]
+        response = self.client.post('/delete-calculations-bulk/', json.dumps({'calculation_ids': ids}),
+                                    content_type='application/json').json()
+
+        self.assertEqual(response['deleted_count'], 3)
+        self.assertEqual(response['errors'], ['Invalid calculation id nope:1',
+                                              f'Calculation sales:{self.foreign.pk} not found'])
+        self.assertEqual(list(SalesCalculation.objects.all()), [self.foreign])
+        self.assertFalse(PrintingCalculation.objects.exists())
+        self.assertEqual(CalculationLedger.objects.get().user, self.other)
+
+    def test_single_delete_by_qualified_or_ledger_id(self):
+        response = self.client.post(f'/delete-calculation/printing:{self.printing.pk}/')
+        self.assertEqual(response.json()['section'], 'printing')
+        self.assertFalse(PrintingCalculation.objects.exists())
+
+        entry = CalculationLedger.objects.get(section='sales', source_id=self.sales[0].pk)
+        self.assertTrue(self.client.post(f'/delete-calculation/{entry.pk}/').json()['success'])
+        self.assertFalse(SalesCalculation.objects.filter(pk=self.sales[0].pk).exists())
+
+    def test_single_delete_of_another_users_calculation(self):
+        response = self.client.post(f'/delete-calculation/sales:{self.foreign.pk}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(SalesCalculation.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_export_selected_only_includes_owned_rows(self):
+        ids = f'sales:{self.sales[1].pk},printing:{self.printing.pk},sales:{self.foreign.pk}'
+        response = self.client.get('/export-calculations/', {'ids': ids})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(sorted(row[0] for row in rows[1:]), ['Printing', 'Sales'])
+
+
+class CalculationCounterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+
+    def counts(self):
+        return get_section_counts(self.user)
+
+    def calculate(self):
+        return SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                               input_data={}, result_data={})
+
+    def test_creates_and_deletes_are_counted(self):
+        first = self.calculate()
+        self.calculate()
+        first.save()  # updates are not new calculations
+        self.assertEqual(self.counts()['sales'], 2)
+
+        first.delete()
+        self.assertEqual(self.counts()['sales'], 1)
+        self.assertEqual(self.counts()['printing'], 0)
+
+    def test_set_based_writes_adjust_counts(self):
+        created = bulk_create_calculations(SalesCalculation, [
+            SalesCalculation(calculation_type='MATERIAL_COST_KG', user=self.user, input_data={}, result_data={})
+            for _ in range(3)
+        ])
+        self.assertEqual(self.counts()['sales'], 3)
+        self.assertEqual(CalculationLedger.objects.count(), 3)
+
+        delete_calculations(self.user, {'sales': {created[0].pk, created[1].pk}})
+        self.assertEqual(self.counts()['sales'], 1)
+
+    def test_counts_never_go_negative(self):
+        adjust_counter(self.user.pk, 'sales', -1)
+        self.assertFalse(CalculationCounter.objects.exists())
+
+        self.calculate()
+        adjust_counter(self.user.pk, 'sales', -5)
+        self.assertEqual(self.counts()['sales'], 0)
+
+
+class HistoryFilterTests(TestCase):
+    def setUp(self):
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        self.printed = PrintingCalculation.objects.create(
+            calculation_type='GSM_CALCULATION', user=self.user, input_data={'material_id': self.material.pk},
+            result_data={},
+        )
+        self.sold = SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                                    input_data={}, result_data={})
+        # 22:30 UTC on 1 March is already 2 March in the history's timezone
+        CalculationLedger.objects.filter(section='printing').update(
+            timestamp=datetime(2026, 3, 1, 22, 30, tzinfo=dt_timezone.utc))
+        CalculationLedger.objects.filter(section='sales').update(
+            timestamp=datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc))
+        self.client.force_login(self.user)
+
+    def sections(self, **params):
+        response = self.client.get('/calculation-history/api/', params).json()
+        return [row['section'] for row in response['calculations']]
+
+    def test_filters(self):
+        self.assertEqual(self.sections(section='sales'), ['sales'])
+        self.assertEqual(self.sections(material=self.material.pk), ['printing'])
+        self.assertEqual(self.sections(material_label='LDPE'), ['printing'])
+        self.assertEqual(self.sections(calculation_type='MATERIAL_COST_KG'), ['sales'])
+        self.assertEqual(self.sections(date='2026-03-02'), ['printing'])
+        self.assertEqual(self.sections(date_from='2026-03-01', date_to='2026-03-01'), ['sales'])
+
+    def test_malformed_filters_are_rejected(self):
+        for params in ({'section': 'nope'}, {'material': 'x'}, {'date': '01/03/2026'}):
+            response = self.client.get('/calculation-history/api/', params)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/download-history/csv/', {'date': 'x'}).status_code, 400)
+
+
+class MaterialRegistryTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+
+    def test_lookups_are_served_from_memory(self):
+        material_registry.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(material_registry.get(str(self.material.pk)).name, 'LDPE')
+            self.assertEqual(material_registry.get_by_code('LDPE'), self.material)
+            self.assertEqual(material_registry.in_bulk([self.material.pk, 'x', 999999]), {self.material.pk: self.material})
+            self.assertIsNone(material_registry.get_or_none(999999))
+            with self.assertRaises(PlasticMaterial.DoesNotExist):
+                material_registry.get('x')
+
+    def test_saves_invalidate_once_committed(self):
+        material_registry.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.material.density = 0.93
+            self.material.save()
+            self.assertEqual(material_registry.get(self.material.pk).density, 0.92)
+        self.assertEqual(material_registry.get(self.material.pk).density, 0.93)
+
+    def test_other_workers_reload_when_the_version_moves(self):
+        worker = MaterialRegistry()
+        self.assertEqual(worker.get(self.material.pk).density, 0.92)
+        PlasticMaterial.objects.filter(pk=self.material.pk).update(density=0.95)
+        material_registry.invalidate()
+
+        self.assertEqual(worker.get(self.material.pk).density, 0.92)  # until the next version check
+        with mock.patch('calculator.material_registry.CHECK_INTERVAL', 0):
+            self.assertEqual(worker.get(self.material.pk).density, 0.95)
+
+
+class LayerStackTests(TestCase):
+    def setUp(self):
+        self.pet = PlasticMaterial.objects.create(name='PET', code='PET', material_type='FILM', density=1.38)
+        self.ldpe = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        material_registry.all()
+
+    def test_layers_resolve_in_one_lookup(self):
+        with self.assertNumQueries(0):
+            layers = load_layer_stack([
+                {'material_id': self.pet.pk, 'thickness': '12'},
+                {'material_id': str(self.ldpe.pk), 'thickness': 50, 'thickness_unit': 'mil'},
+            ])
+        self.assertEqual([(layer.material, layer.density, layer.thickness, layer.thickness_unit, layer.order)
+                          for layer in layers],
+                         [(self.pet, 1.38, 12.0, 'micron', 0), (self.ldpe, 0.92, 50.0, 'mil', 1)])
+
+    def test_every_unknown_material_is_reported(self):
+        with self.assertRaisesMessage(PlasticMaterial.DoesNotExist,
+                                      'Material not found for layer 1 (999999), layer 3 (no material)'):
+            load_layer_stack([{'material_id': 999999}, {'material_id': self.pet.pk}, {}])
+
+    def test_layer_densities_come_from_materials(self):
+        layers = fill_layer_densities([
+            {'material_id': self.pet.pk, 'density_g_cm3': 5},
+            {'material_id': 999999, 'density_g_cm3': 1.1},
+        ])
+        self.assertEqual([layer['density_g_cm3'] for layer in layers], [1.38, 1.1])
+
+    def test_layers_are_saved_in_one_insert(self):
+        calculation = LaminationCalculation.objects.create(calculation_type='GSM', input_data={}, result_data={})
+        layers = load_layer_stack([{'material_id': self.pet.pk, 'thickness': 12},
+                                   {'material_id': self.ldpe.pk, 'thickness': 50}])
+        with self.assertNumQueries(1):
+            save_layers(LaminationLayer, calculation, layers)
+        self.assertEqual([layer.material for layer in calculation.layers.all()], [self.pet, self.ldpe])
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        PlasticMaterial.objects.create(name='Film LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        self.client.force_login(get_user_model().objects.create_user('tester', password='pw', is_approved=True))
+
+    def test_fragments_follow_the_materials_version(self):
+        self.assertContains(self.client.get('/extrusion/'), 'Film LDPE')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get('/extrusion/'), 'Film LDPE')
+        self.assertFalse(any('calculator_plasticmaterial' in query['sql'] for query in queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlasticMaterial.objects.create(name='Film HDPE', code='HDPE', material_type='FILM', density=0.95)
+        self.assertContains(self.client.get('/extrusion/'), 'Film HDPE')
+
+
+class GaugeTableTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+
+    def test_lookups_match_density_times_thickness(self):
+        table = get_gauge_table(self.material.pk)
+        for thickness in (25, 27.5, 5, 400):  # on the grid, between gauges, and beyond either end
+            result = table.lookup(thickness)
+            self.assertAlmostEqual(result['gsm'], thickness * 0.92)
+            self.assertAlmostEqual(result['yield_m2_kg'], 1000 / (thickness * 0.92))
+        self.assertEqual(table.lookup(0)['yield_m2_kg'], 0)
+
+    def test_tables_are_rebuilt_after_a_density_edit(self):
+        self.assertAlmostEqual(get_gauge_table(self.material.pk).gsm_at(50), 46)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.material.density = 0.95
+            self.material.save()
+        self.assertAlmostEqual(get_gauge_table(self.material.pk).gsm_at(50), 47.5)
+
+    def test_endpoint(self):
+        response = self.client.get('/gauge-tables/', {'material_id': self.material.pk, 'thickness': [20, 30]}).json()
+        self.assertEqual(response['tables'][str(self.material.pk)]['thickness_um'], [20.0, 30.0])
+
+        response = self.client.get('/gauge-tables/').json()
+        self.assertEqual(response['tables'][str(self.material.pk)]['thickness_um'], list(STANDARD_THICKNESS_UM))
+
+        self.assertEqual(self.client.get('/gauge-tables/', {'material_id': 999999}).status_code, 404)
+        self.assertEqual(self.client.get('/gauge-tables/', {'thickness': -1}).status_code, 400)
+
+
+class ConditionalPageTests(TestCase):
+    url = '/reference/'
+
+    def setUp(self):
+        clear_caches()
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+
+    def test_unchanged_page_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_material_edit_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.material.density = 0.93
+            self.material.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_per_signed_in_user(self):
+        anonymous = self.client.get(self.url)['ETag']
+        self.client.force_login(get_user_model().objects.create_user('first', password='pw', is_approved=True))
+        first = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', first)
+        self.client.force_login(get_user_model().objects.create_user('second', password='pw', is_approved=True))
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len({anonymous, first['ETag'], second['ETag']}), 3)
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+
+    def test_totals_and_recent_items_span_every_section(self):
+        for _ in range(4):
+            SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                            input_data={}, result_data={})
+        PrintingCalculation.objects.create(calculation_type='GSM_CALCULATION', user=self.user,
+                                           input_data={'material_id': self.material.pk}, result_data={})
+        DensityCalculation.objects.create(material=self.material, mass=9.2, volume=10, calculated_density=0.92,
+                                          user=self.user)
+
+        stats = get_dashboard_stats(self.user)
+
+        self.assertEqual(stats['total_calculations'], 6)
+        self.assertEqual((stats['section_counts']['sales'], stats['section_counts']['density']), (4, 1))
+        recent = stats['recent_calculations']
+        self.assertEqual([item['section'] for item in recent], ['density', 'printing', 'sales', 'sales', 'sales'])
+        self.assertEqual((recent[0]['label'], recent[0]['material_label'], recent[0]['calculated_density']),
+                         ('Density Calculation', 'LDPE', 0.92))
+        self.assertEqual((recent[1]['label'], recent[1]['material_label']), ('GSM Calculation', 'LDPE'))
+
+    def test_stats_are_dropped_when_a_calculation_is_saved(self):
+        self.assertEqual(get_dashboard_stats(self.user)['total_calculations'], 0)
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SalesCalculation.objects.create(calculation_type='MATERIAL_COST_KG', user=self.user,
+                                            input_data={}, result_data={})
+        self.assertEqual(get_dashboard_stats(self.user)['total_calculations'], 1)
+
+
+def _ratio(ops, a, b):
+    return ops.where(a > 0, ops.div(a, b), -1.0)
+
+
+class ColumnarTests(TestCase):
+    def test_both_paths_agree(self):
+        for use_numpy in (True, False):
+            self.assertEqual(run_formula(_ratio, [6, 0, 4], [3, 2, 0], use_numpy=use_numpy), [2.0, -1.0, 0.0])
+            self.assertEqual(run_formula(_ratio, 6, [3, 2], use_numpy=use_numpy), [2.0, 3.0])
+
+    def test_columns_must_line_up(self):
+        with self.assertRaisesMessage(ValueError, 'All columns must have the same number of jobs'):
+            run_formula(_ratio, [1, 2], [1, 2, 3])
+
+    def test_payload_values(self):
+        self.assertEqual(column_values(to_column(['1.5', '', 2]), 3), [1.5, 0.0, 2.0])
+        self.assertEqual(column_values(scale_column(to_column('4'), 0.001), 2), [0.004, 0.004])
+
+    def test_group_totals_keep_first_seen_order(self):
+        groups, totals = group_totals(['b', 'a', 'b', ('c', 1)], {'kg': [1, 2, 3, 4], 'm2': [0.5, 0, 0.5, 1]})
+        self.assertEqual(groups, ['b', 'a', ('c', 1)])
+        self.assertEqual(totals, {'kg': [4.0, 2.0, 4.0], 'm2': [1.0, 0.0, 1.0]})
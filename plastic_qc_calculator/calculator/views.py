@@ -1,14 +1,20 @@
 import csv
 from datetime import datetime
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
 from django.http import JsonResponse, HttpResponse
 from slitting.models import SlittingCalculation
-from .models import PlasticMaterial, DensityCalculation
+from .models import PlasticMaterial, DensityCalculation, CalculationLedger
+from .material_registry import registry as material_registry
+from .ledger import get_section_model, route_calculation_ids, delete_calculations
 from django.views.decorators.csrf import csrf_exempt
 import json
-from .templatetags.history_filters import get_calculation_type_display, get_section_name
-from .views_history import get_display_material, download_csv_history
+from .display_material import resolve_display_materials
+from .views_history import download_csv_history
+from .cache_backends import cache_stats as get_cache_stats
+from .gauge_tables import lookup_gauges
+from .conditional import conditional_page, BASE_TEMPLATES
 
 
 def home(request):
@@ -41,7 +47,7 @@ def calculate_density(request):
             percentage_diff = None
 
             if material_id:
-                material = PlasticMaterial.objects.get(id=material_id)
+                material = material_registry.get(material_id)
                 expected_density = material.density
                 density_difference = density - expected_density
                 percentage_diff = (density_difference / expected_density) * 100
@@ -75,6 +81,7 @@ def calculate_density(request):
     return JsonResponse({'error': 'Invalid request method'})
 
 
+@conditional_page('calculator/reference.html', *BASE_TEMPLATES, materials=True)
 def material_reference(request):
     """Display material density reference table"""
     materials = PlasticMaterial.objects.all().order_by('material_type', 'name')
@@ -84,6 +91,30 @@ def material_reference(request):
     })
 
 
+def gauge_tables(request):
+    """
+    Bulk GSM / yield / basis-weight lookup from the precomputed gauge tables.
+    ?material_id= may repeat (default: every film); ?thickness= (microns) may
+    repeat, otherwise the standard gauge grid is returned.
+    """
+    try:
+        material_ids = [int(value) for value in request.GET.getlist('material_id')]
+        thicknesses = [float(value) for value in request.GET.getlist('thickness')]
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'material_id and thickness must be numbers'}, status=400)
+    if any(thickness <= 0 for thickness in thicknesses):
+        return JsonResponse({'success': False, 'error': 'Thickness must be greater than 0'}, status=400)
+
+    if not material_ids:
+        material_ids = [material.id for material in material_registry.all() if material.material_type == 'FILM']
+    try:
+        tables = lookup_gauges(material_ids, thicknesses)
+    except PlasticMaterial.DoesNotExist as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
+
+    return JsonResponse({'success': True, 'tables': tables})
+
+
 @login_required
 def calculation_history(request):
     """Display comprehensive calculation history across all sections"""
@@ -193,60 +224,30 @@ def download_calculation_history(request):
 @login_required
 @csrf_exempt
 def delete_calculation(request, calculation_id):
-    """Delete a specific calculation from any section"""
+    """Delete a specific calculation, given its section-qualified or ledger id"""
     if request.method != 'POST' and request.method != 'DELETE':
         return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
     try:
-        # Import all section models
-        from extrusion.models import ExtrusionCalculation
-        from printing.models import PrintingCalculation
-        from lamination.models import LaminationCalculation
-        from slitting.models import SlittingCalculation
-        from bag_making.models import BagMakingCalculation
-        from sales.models import SalesCalculation
-
-        calculation = None
-        section_name = None
+        grouped, _ = route_calculation_ids([calculation_id], request.user)
+        if not grouped:
+            return JsonResponse({'success': False, 'error': 'Calculation not found or access denied'}, status=404)
 
-        # Check all sections for the calculation
-        try:
-            calculation = ExtrusionCalculation.objects.get(id=calculation_id, user=request.user)
-            section_name = 'extrusion'
-        except ExtrusionCalculation.DoesNotExist:
-            try:
-                calculation = PrintingCalculation.objects.get(id=calculation_id, user=request.user)
-                section_name = 'printing'
-            except PrintingCalculation.DoesNotExist:
-                try:
-                    calculation = LaminationCalculation.objects.get(id=calculation_id, user=request.user)
-                    section_name = 'lamination'
-                except LaminationCalculation.DoesNotExist:
-                    try:
-                        calculation = SlittingCalculation.objects.get(id=calculation_id, user=request.user)
-                        section_name = 'slitting'
-                    except SlittingCalculation.DoesNotExist:
-                        try:
-                            calculation = BagMakingCalculation.objects.get(id=calculation_id, user=request.user)
-                            section_name = 'bag_making'
-                        except BagMakingCalculation.DoesNotExist:
-                            try:
-                                calculation = SalesCalculation.objects.get(id=calculation_id, user=request.user)
-                                section_name = 'sales'
-                            except SalesCalculation.DoesNotExist:
-                                pass
-
-        if calculation:
-            calculation_name = get_calculation_type_display(calculation)
-            calculation.delete()
-            return JsonResponse({
-                'success': True,
-                'message': f'{calculation_name} calculation deleted successfully',
-                'section': section_name
-            })
-        else:
+        section_name, source_ids = next(iter(grouped.items()))
+        entry = CalculationLedger.objects.filter(
+            section=section_name, source_id__in=source_ids, user=request.user
+        ).first()
+        if entry is None:
             return JsonResponse({'success': False, 'error': 'Calculation not found or access denied'}, status=404)
 
+        calculation_name = entry.get_calculation_type_display()
+        delete_calculations(request.user, grouped)
+        return JsonResponse({
+            'success': True,
+            'message': f'{calculation_name} calculation deleted successfully',
+            'section': section_name
+        })
+
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -254,7 +255,7 @@ def delete_calculation(request, calculation_id):
 @login_required
 @csrf_exempt
 def delete_calculations_bulk(request):
-    """Delete multiple calculations in bulk"""
+    """Delete multiple calculations in bulk, one filtered delete per section"""
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
@@ -265,41 +266,10 @@ def delete_calculations_bulk(request):
         if not calculation_ids:
             return JsonResponse({'success': False, 'error': 'No calculations selected'})
 
-        deleted_count = 0
-        errors = []
-
-        # Import all section models
-        from extrusion.models import ExtrusionCalculation
-        from printing.models import PrintingCalculation
-        from lamination.models import LaminationCalculation
-        from slitting.models import SlittingCalculation
-        from bag_making.models import BagMakingCalculation
-        from sales.models import SalesCalculation
-
-        # List of all models to check
-        models = [
-            (ExtrusionCalculation, 'extrusion'),
-            (PrintingCalculation, 'printing'),
-            (LaminationCalculation, 'lamination'),
-            (SlittingCalculation, 'slitting'),
-            (BagMakingCalculation, 'bag_making'),
-            (SalesCalculation, 'sales')
-        ]
-
-        for calculation_id in calculation_ids:
-            calculation_found = False
-            for model, section_name in models:
-                try:
-                    calculation = model.objects.get(id=calculation_id, user=request.user)
-                    calculation.delete()
-                    deleted_count += 1
-                    calculation_found = True
-                    break
-                except model.DoesNotExist:
-                    continue
-
-            if not calculation_found:
-                errors.append(f"Calculation {calculation_id} not found")
+        grouped, invalid = route_calculation_ids(calculation_ids, request.user)
+        deleted_count, missing = delete_calculations(request.user, grouped)
+        errors = [f"Invalid calculation id {calculation_id}" for calculation_id in invalid]
+        errors.extend(f"Calculation {calculation_id} not found" for calculation_id in missing)
 
         if errors:
             return JsonResponse({
@@ -321,56 +291,43 @@ def delete_calculations_bulk(request):
 
 @login_required
 def export_selected_calculations(request):
-    """Export selected calculations"""
+    """Export selected calculations given as section-qualified or ledger ids"""
     calculation_ids = request.GET.get('ids', '').split(',')
     if not calculation_ids or calculation_ids == ['']:
         return JsonResponse({'error': 'No calculations selected'})
 
-    # Filter valid IDs
-    valid_ids = [id for id in calculation_ids if id.isdigit()]
-
-    # Import all section models
-    from extrusion.models import ExtrusionCalculation
-    from printing.models import PrintingCalculation
-    from lamination.models import LaminationCalculation
-    from slitting.models import SlittingCalculation
-    from bag_making.models import BagMakingCalculation
-    from sales.models import SalesCalculation
+    grouped, _ = route_calculation_ids(calculation_ids, request.user)
 
     all_calculations = []
 
-    # Get calculations from each section
-    models = [
-        ExtrusionCalculation,
-        PrintingCalculation,
-        LaminationCalculation,
-        SlittingCalculation,
-        BagMakingCalculation,
-        SalesCalculation
-    ]
-
-    for model in models:
-        try:
-            calculations = model.objects.filter(
-                id__in=valid_ids,
-                user=request.user
-            )
-            for calc in calculations:
-                calc.section = get_section_name(calc)
-                calc.display_material = get_display_material(calc)
-                all_calculations.append(calc)
-        except Exception as e:
-            print(f"Error loading calculations for {model}: {e}")
-            continue
-
+    # One query per section that has selected calculations
+    for section, ids in grouped.items():
+        model = get_section_model(section)
+        calculations = model.objects.filter(id__in=ids, user=request.user)
+        if hasattr(model, 'material'):
+            calculations = calculations.select_related('material')
+        for calc in calculations:
+            calc.section = section
+            all_calculations.append(calc)
+
+    all_calculations.sort(key=lambda calc: calc.timestamp, reverse=True)
+    resolve_display_materials(all_calculations)
     return download_csv_history(all_calculations, f"{request.user.username}_selected")
 
 
+@conditional_page('calculator/reasons.html', *BASE_TEMPLATES)
 def calculation_reasons(request):
     """Display the purposes and benefits of all calculations"""
     return render(request, 'calculator/reasons.html')
 
+
+@conditional_page('calculator/material_properties.html', *BASE_TEMPLATES)
 def material_properties(request):
     """Display material properties and applications guide"""
     return render(request, 'calculator/material_properties.html')
 
+
+@staff_member_required
+def cache_stats(request):
+    """Per-namespace cache statistics for this worker (staff only)"""
+    return JsonResponse({'success': True, 'caches': get_cache_stats()})
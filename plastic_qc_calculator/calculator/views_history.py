@@ -2,440 +2,313 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Q
+from django.contrib import messages
+from django.template.loader import render_to_string
+from django.utils import timezone
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+import binascii
+from itertools import islice
 import json
 import csv
-from datetime import datetime
-from calculator.models import PlasticMaterial
+from datetime import date, datetime, time, timedelta
+from calculator.models import PlasticMaterial, CalculationLedger
+from calculator.counters import get_section_counts
+from calculator.display_material import resolve_display_materials
+from calculator.ledger import SECTION_MODELS, get_section_model
+from calculator.streaming import Echo, stream_download
+
+HISTORY_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 2000
+HISTORY_TIMEZONE = 'Africa/Nairobi'  # timezone the history page displays dates in
 
 
 @login_required
 def calculation_history(request):
     """Main history page showing all calculations from all sections"""
+    calculations = CalculationLedger.objects.filter(user=request.user)
 
-    # Import all section models
-    from extrusion.models import ExtrusionCalculation
-    from printing.models import PrintingCalculation
-    from lamination.models import LaminationCalculation
-    from slitting.models import SlittingCalculation
-    from bag_making.models import BagMakingCalculation
-    from sales.models import SalesCalculation
-
-    # Get calculations from all sections - handle models without material field
-    all_calculations = []
-
-    # Extrusion calculations (has material field)
-    try:
-        extrusion_calculations = ExtrusionCalculation.objects.filter(user=request.user).select_related(
-            'material').order_by('-timestamp')
-        for calc in extrusion_calculations:
-            calc.section = 'extrusion'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading extrusion calculations: {e}")
-
-    # Printing calculations (check if has material field)
-    try:
-        printing_calculations = PrintingCalculation.objects.filter(user=request.user).order_by('-timestamp')
-        # Check if Printing model has material field
-        if hasattr(PrintingCalculation, 'material'):
-            printing_calculations = printing_calculations.select_related('material')
-        for calc in printing_calculations:
-            calc.section = 'printing'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading printing calculations: {e}")
-
-    # Lamination calculations (check if has material field)
-    try:
-        lamination_calculations = LaminationCalculation.objects.filter(user=request.user).order_by('-timestamp')
-        # Check if Lamination model has material field
-        if hasattr(LaminationCalculation, 'material'):
-            lamination_calculations = lamination_calculations.select_related('material')
-        for calc in lamination_calculations:
-            calc.section = 'lamination'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading lamination calculations: {e}")
-
-    # Slitting calculations (check if has material field)
-    try:
-        slitting_calculations = SlittingCalculation.objects.filter(user=request.user).order_by('-timestamp')
-        # Check if Slitting model has material field
-        if hasattr(SlittingCalculation, 'material'):
-            slitting_calculations = slitting_calculations.select_related('material')
-        for calc in slitting_calculations:
-            calc.section = 'slitting'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading slitting calculations: {e}")
-
-    # Bag Making calculations (check if has material field)
     try:
-        bag_making_calculations = BagMakingCalculation.objects.filter(user=request.user).order_by('-timestamp')
-        # Check if BagMaking model has material field
-        if hasattr(BagMakingCalculation, 'material'):
-            bag_making_calculations = bag_making_calculations.select_related('material')
-        for calc in bag_making_calculations:
-            calc.section = 'bag_making'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading bag making calculations: {e}")
-
-    # Sales calculations (no material field - uses input_data)
+        filters = get_history_filters(request.GET)
+    except ValueError as e:
+        messages.warning(request, str(e))
+        filters = {}
+    calculations = filter_history(calculations, filters)
+
     try:
-        sales_calculations = SalesCalculation.objects.filter(user=request.user).order_by('-timestamp')
-        for calc in sales_calculations:
-            calc.section = 'sales'
-            calc.is_recent = is_recent(calc.timestamp)
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading sales calculations: {e}")
-
-    # Sort by timestamp
+        page, next_cursor = get_history_page(calculations, request.GET.get('cursor'))
+    except ValueError:
+        page, next_cursor = get_history_page(calculations, None)
+
     materials = PlasticMaterial.objects.all()
-    all_calculations.sort(key=lambda x: x.timestamp, reverse=True)
+    section_counts = get_section_counts(request.user)
 
     context = {
-        'calculations': all_calculations,
-        'total_calculations': len(all_calculations),
+        'calculations': page,
+        'next_cursor': next_cursor,
+        'filters': filters,
+        'filter_query': urlencode(filters),
+        'calculation_types': get_calculation_type_choices(),
+        'section_counts': section_counts,
+        'total_calculations': sum(section_counts[section] for section in SECTION_MODELS),
         'materials': materials,
     }
 
     return render(request, 'calculator/history.html', context)
 
 
-def get_display_material(calculation):
-    """Get material information for display in history"""
-    # If calculation has a direct material foreign key and it's set
-    if hasattr(calculation, 'material') and calculation.material:
-        return calculation.material
-
-    # For calculations with material stored in input_data
-    if hasattr(calculation, 'input_data') and calculation.input_data:
-        input_data = calculation.input_data
-
-        # Check for material_id in input_data (single material)
-        if 'material_id' in input_data and input_data['material_id']:
-            try:
-                material = PlasticMaterial.objects.get(id=input_data['material_id'])
-                return material
-            except (PlasticMaterial.DoesNotExist, ValueError):
-                pass
-
-        # Check for material_details in input_data (for laminated calculations)
-        if 'material_details' in input_data and input_data['material_details']:
-            materials = input_data['material_details']
-            if materials and len(materials) > 0:
-                # Create a special "Laminated" material object
-                return create_laminated_material_object(materials)
-
-        # Check for material_detail in input_data (for roll calculations)
-        if 'material_detail' in input_data and input_data['material_detail']:
-            material_detail = input_data['material_detail']
-            if material_detail and 'id' in material_detail:
-                try:
-                    material = PlasticMaterial.objects.get(id=material_detail['id'])
-                    return material
-                except (PlasticMaterial.DoesNotExist, ValueError):
-                    pass
-
-        # Check for primary_material_id and secondary_material_id (laminated structure)
-        if 'primary_material_id' in input_data and input_data['primary_material_id']:
-            return create_laminated_material_from_structure(input_data)
-
-    # For Sales laminated calculations, check the layers structure
-    if hasattr(calculation, 'section') and calculation.section == 'sales':
-        if hasattr(calculation, 'result_data') and calculation.result_data:
-            result_data = calculation.result_data
-            if 'layer_details' in result_data and result_data['layer_details']:
-                materials = []
-                for layer in result_data['layer_details']:
-                    if 'name' in layer:
-                        materials.append({'name': layer['name']})
-                if materials:
-                    return create_laminated_material_object(materials)
-
-    return None
-
-
-def create_laminated_material_object(materials):
-    """Create a special material object for laminated structures"""
-
-    class LaminatedMaterial:
-        def __init__(self, materials):
-            self.name = self._generate_laminated_name(materials)
-            self.density = self._calculate_average_density(materials)
-            self.is_laminated = True
-            self.layers = materials
-
-        def _generate_laminated_name(self, materials):
-            """Generate a descriptive name for laminated material"""
-            if len(materials) == 1:
-                material = materials[0]
-                name = material.get('name', 'Unknown')
-                return f"{name} (Single Layer)"
-
-            layer_names = []
-            for material in materials:
-                name = material.get('name', 'Unknown')
-                # Extract base material name (remove density info if present)
-                base_name = name.split('(')[0].strip()
-                layer_names.append(base_name)
-
-            # Remove duplicates while preserving order
-            unique_layers = []
-            for layer in layer_names:
-                if layer not in unique_layers:
-                    unique_layers.append(layer)
-
-            if len(unique_layers) == 1:
-                return f"{unique_layers[0]} ({len(materials)}-Layer)"
-            else:
-                return f"{' / '.join(unique_layers)} (Laminated)"
-
-        def _calculate_average_density(self, materials):
-            """Calculate average density for laminated material"""
-            densities = []
-            for material in materials:
-                if 'density' in material:
-                    try:
-                        densities.append(float(material['density']))
-                    except (ValueError, TypeError):
-                        pass
-                # Try to extract density from material name if available
-                elif 'name' in material:
-                    name = material['name']
-                    # Look for density in parentheses in name
-                    import re
-                    match = re.search(r'\(([\d.]+)\s*g/cm³\)', name)
-                    if match:
-                        try:
-                            densities.append(float(match.group(1)))
-                        except (ValueError, TypeError):
-                            pass
-
-            if densities:
-                return round(sum(densities) / len(densities), 3)
-            else:
-                return 0.0  # Default density if none found
-
-    return LaminatedMaterial(materials)
-
-
-def create_laminated_material_from_structure(input_data):
-    """Create laminated material from structured input data"""
-    materials = []
-
-    # Check primary material
-    if 'primary_material_id' in input_data and input_data['primary_material_id']:
-        try:
-            primary_material = PlasticMaterial.objects.get(id=input_data['primary_material_id'])
-            materials.append({
-                'name': primary_material.name,
-                'density': primary_material.density,
-                'type': 'primary'
-            })
-        except (PlasticMaterial.DoesNotExist, ValueError):
-            pass
-
-    # Check secondary material
-    if 'secondary_material_id' in input_data and input_data['secondary_material_id']:
-        try:
-            secondary_material = PlasticMaterial.objects.get(id=input_data['secondary_material_id'])
-            materials.append({
-                'name': secondary_material.name,
-                'density': secondary_material.density,
-                'type': 'secondary'
-            })
-        except (PlasticMaterial.DoesNotExist, ValueError):
-            pass
-
-    # Check third material
-    if 'third_material_id' in input_data and input_data['third_material_id']:
-        try:
-            third_material = PlasticMaterial.objects.get(id=input_data['third_material_id'])
-            materials.append({
-                'name': third_material.name,
-                'density': third_material.density,
-                'type': 'third'
-            })
-        except (PlasticMaterial.DoesNotExist, ValueError):
-            pass
-
-    # Check fourth material
-    if 'fourth_material_id' in input_data and input_data['fourth_material_id']:
-        try:
-            fourth_material = PlasticMaterial.objects.get(id=input_data['fourth_material_id'])
-            materials.append({
-                'name': fourth_material.name,
-                'density': fourth_material.density,
-                'type': 'fourth'
-            })
-        except (PlasticMaterial.DoesNotExist, ValueError):
-            pass
-
-    if materials:
-        return create_laminated_material_object(materials)
-
-    return None
+@login_required
+def calculation_history_api(request):
+    """Return the next page of history rows for infinite scroll, with the same filters as the page"""
+    try:
+        calculations = filter_history(
+            CalculationLedger.objects.filter(user=request.user), get_history_filters(request.GET)
+        )
+        page, next_cursor = get_history_page(calculations, request.GET.get('cursor'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'html': render_to_string('calculator/history_rows.html', {'calculations': page}, request=request),
+        'calculations': [serialize_history_row(calc) for calc in page],
+        'next_cursor': next_cursor,
+    })
+
+
+HISTORY_FILTERS = ['section', 'calculation_type', 'material', 'material_label', 'date', 'date_from', 'date_to',
+                   'recent']
+
+
+def get_history_filters(params):
+    """Validated history filters from query parameters; raises ValueError for malformed values"""
+    filters = {name: params[name].strip() for name in HISTORY_FILTERS if params.get(name, '').strip()}
+
+    if 'section' in filters and filters['section'] not in SECTION_MODELS:
+        raise ValueError(f"Unknown section: {filters['section']}")
+    if 'material' in filters and not filters['material'].isdigit():
+        raise ValueError(f"Invalid material: {filters['material']}")
+    for name in ('date', 'date_from', 'date_to'):
+        if name in filters and parse_date_param(filters[name]) is None:
+            raise ValueError(f"Invalid date for {name}: {filters[name]} (expected YYYY-MM-DD)")
+    if 'recent' in filters and filters['recent'] not in ('1', 'true'):
+        del filters['recent']
+
+    return filters
+
+
+def filter_history(queryset, filters):
+    """
+    Apply history filters to a ledger queryset. Every filter is an equality or
+    range on a column covered by one of the ledger's (user, ..., timestamp) indexes.
+    Dates are calendar days in the history's display timezone.
+    """
+    if 'section' in filters:
+        queryset = queryset.filter(section=filters['section'])
+    if 'calculation_type' in filters:
+        queryset = queryset.filter(calculation_type=filters['calculation_type'])
+    if 'material' in filters:
+        queryset = queryset.filter(material_id=int(filters['material']))
+    if 'material_label' in filters:
+        queryset = queryset.filter(material_label=filters['material_label'])
+
+    date_from = filters.get('date_from') or filters.get('date')
+    date_to = filters.get('date_to') or filters.get('date')
+    if date_from:
+        queryset = queryset.filter(timestamp__gte=start_of_day(parse_date_param(date_from)))
+    if date_to:
+        queryset = queryset.filter(timestamp__lt=start_of_day(parse_date_param(date_to) + timedelta(days=1)))
+    if 'recent' in filters:
+        queryset = queryset.filter(timestamp__gte=timezone.now() - timedelta(days=7))
+
+    return queryset
+
+
+def parse_date_param(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
 
 
-@login_required
-def download_calculation_history(request, format_type):
-    """Download calculation history in various formats"""
+def start_of_day(day):
+    return datetime.combine(day, time.min, tzinfo=ZoneInfo(HISTORY_TIMEZONE))
 
-    # Import all section models
-    from extrusion.models import ExtrusionCalculation
-    from printing.models import PrintingCalculation
-    from lamination.models import LaminationCalculation
-    from slitting.models import SlittingCalculation
-    from bag_making.models import BagMakingCalculation
-    from sales.models import SalesCalculation
 
-    all_calculations = []
+def get_calculation_type_choices():
+    """(code, label) pairs of every section's calculation types, for the type filter"""
+    choices = {}
+    for section in SECTION_MODELS:
+        for code, label in getattr(get_section_model(section), 'CALCULATION_TYPES', []):
+            choices.setdefault(code, label)
+    return sorted(choices.items(), key=lambda choice: choice[1])
 
-    # Get calculations from each section with proper handling
-    try:
-        extrusion_calculations = ExtrusionCalculation.objects.filter(user=request.user)
-        if hasattr(ExtrusionCalculation, 'material'):
-            extrusion_calculations = extrusion_calculations.select_related('material')
-        for calc in extrusion_calculations:
-            calc.section = 'extrusion'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading extrusion calculations for export: {e}")
 
-    try:
-        printing_calculations = PrintingCalculation.objects.filter(user=request.user)
-        if hasattr(PrintingCalculation, 'material'):
-            printing_calculations = printing_calculations.select_related('material')
-        for calc in printing_calculations:
-            calc.section = 'printing'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading printing calculations for export: {e}")
+def get_history_page(queryset, cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Keyset pagination over (timestamp, id), newest first.
+    Returns the rows of the page and the cursor for the next one (None on the last page).
+    """
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=last_id))
 
-    try:
-        lamination_calculations = LaminationCalculation.objects.filter(user=request.user)
-        if hasattr(LaminationCalculation, 'material'):
-            lamination_calculations = lamination_calculations.select_related('material')
-        for calc in lamination_calculations:
-            calc.section = 'lamination'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading lamination calculations for export: {e}")
+    rows = list(queryset.select_related('material').order_by('-timestamp', '-id')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
 
-    try:
-        slitting_calculations = SlittingCalculation.objects.filter(user=request.user)
-        if hasattr(SlittingCalculation, 'material'):
-            slitting_calculations = slitting_calculations.select_related('material')
-        for calc in slitting_calculations:
-            calc.section = 'slitting'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading slitting calculations for export: {e}")
+    resolve_display_materials(rows)
+    for calc in rows:
+        calc.is_recent = is_recent(calc.timestamp)
+
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    return rows, next_cursor
 
+
+def encode_cursor(calculation):
+    """Opaque cursor pointing just past a ledger row"""
+    raw = f"{calculation.timestamp.isoformat()}|{calculation.id}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
     try:
-        bag_making_calculations = BagMakingCalculation.objects.filter(user=request.user)
-        if hasattr(BagMakingCalculation, 'material'):
-            bag_making_calculations = bag_making_calculations.select_related('material')
-        for calc in bag_making_calculations:
-            calc.section = 'bag_making'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading bag making calculations for export: {e}")
+        timestamp, last_id = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(last_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def serialize_history_row(calc):
+    """JSON representation of a history row for API consumers"""
+    material = calc.display_material
+    return {
+        'id': calc.qualified_id,
+        'source_id': calc.source_id,
+        'section': calc.section,
+        'calculation_type': calc.calculation_type,
+        'calculation_type_display': calc.get_calculation_type_display(),
+        'material': material.name if material else None,
+        'material_density': material.density if material else None,
+        'timestamp': calc.timestamp.isoformat(),
+        'is_recent': calc.is_recent,
+        'input_data': calc.input_data,
+        'result_data': calc.result_data,
+    }
+
 
+@login_required
+def download_calculation_history(request, format_type):
+    """Download calculation history in various formats, honouring the history filters"""
     try:
-        sales_calculations = SalesCalculation.objects.filter(user=request.user)
-        for calc in sales_calculations:
-            calc.section = 'sales'
-            calc.display_material = get_display_material(calc)
-            all_calculations.append(calc)
-    except Exception as e:
-        print(f"Error loading sales calculations for export: {e}")
+        filters = get_history_filters(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    calculations = filter_history(CalculationLedger.objects.filter(user=request.user), filters)
+
+    compress = request.GET.get('gzip') in ('1', 'true')
 
     if format_type == 'json':
-        return download_json_history(all_calculations, request.user.username)
+        if filters:
+            total = calculations.count()
+        else:
+            total = sum(count for section, count in get_section_counts(request.user).items()
+                        if section in SECTION_MODELS)
+        return download_json_history(iter_history(calculations), request.user.username, total, compress)
+    elif format_type == 'ndjson':
+        return download_ndjson_history(iter_history(calculations), request.user.username, compress)
     elif format_type == 'csv':
-        return download_csv_history(all_calculations, request.user.username)
+        return download_csv_history(iter_history(calculations), request.user.username, compress)
     elif format_type == 'txt':
-        return download_text_history(all_calculations, request.user.username)
+        return download_text_history(list(iter_history(calculations)), request.user.username)
     else:
         return JsonResponse({'error': 'Invalid format'})
 
 
-def download_json_history(calculations, username):
-    """Download history as JSON"""
-    data = {
+def download_json_history(calculations, username, total, compress=False):
+    """Download history as a streamed JSON document, one record encoded at a time"""
+    header = json.dumps({
         'user': username,
         'export_date': datetime.now().isoformat(),
-        'total_calculations': len(calculations),
-        'calculations': []
+        'total_calculations': total,
+    })
+
+    def chunks():
+        # Re-open the header object so the calculations array can be streamed into it
+        yield header[:-1] + ', "calculations": ['
+        for i, calc in enumerate(calculations):
+            yield (',' if i else '') + json.dumps(history_record(calc))
+        yield ']}'
+
+    return stream_download(chunks(), 'application/json', history_filename(username, 'json'), compress)
+
+
+def download_ndjson_history(calculations, username, compress=False):
+    """Download history as newline-delimited JSON, one record per line"""
+
+    def chunks():
+        for calc in calculations:
+            yield json.dumps(history_record(calc)) + '\n'
+
+    return stream_download(chunks(), 'application/x-ndjson', history_filename(username, 'ndjson'), compress)
+
+
+def history_record(calc):
+    """Export representation of a calculation"""
+    # Use the display_material we set earlier
+    material_info = 'N/A'
+    if hasattr(calc, 'display_material') and calc.display_material:
+        material_info = calc.display_material.name
+
+    return {
+        'section': get_section_name(calc),
+        'calculation_type': get_calculation_type_display(calc),
+        'material': material_info,
+        'timestamp': calc.timestamp.isoformat(),
+        'input_data': calc.input_data,
+        'result_data': calc.result_data,
     }
 
-    for calc in calculations:
-        # Use the display_material we set earlier
-        material_info = 'N/A'
-        if hasattr(calc, 'display_material') and calc.display_material:
-            material_info = calc.display_material.name
 
-        calculation_data = {
-            'section': get_section_name(calc),
-            'calculation_type': get_calculation_type_display(calc),
-            'material': material_info,
-            'timestamp': calc.timestamp.isoformat(),
-            'input_data': calc.input_data,
-            'result_data': calc.result_data,
-        }
-        data['calculations'].append(calculation_data)
+def history_filename(username, extension):
+    return f'{username}_calculations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
 
-    response = HttpResponse(json.dumps(data, indent=2), content_type='application/json')
-    response[
-        'Content-Disposition'] = f'attachment; filename="{username}_calculations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json"'
-    return response
 
+def iter_history(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream ledger rows newest first without loading the whole history"""
+    rows = queryset.select_related('material').order_by('-timestamp', '-id').iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield from resolve_display_materials(chunk)
 
-def download_csv_history(calculations, username):
-    """Download history as CSV"""
-    response = HttpResponse(content_type='text/csv')
-    response[
-        'Content-Disposition'] = f'attachment; filename="{username}_calculations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
 
-    writer = csv.writer(response)
-    writer.writerow(['Section', 'Calculation Type', 'Material', 'Timestamp', 'Input Data', 'Result Data'])
+def download_csv_history(calculations, username, compress=False):
+    """Download history as CSV, streamed one row at a time"""
+    writer = csv.writer(Echo())
 
-    for calc in calculations:
-        # Use the display_material we set earlier
-        material_info = 'N/A'
-        if hasattr(calc, 'display_material') and calc.display_material:
-            material_info = calc.display_material.name
+    def rows():
+        yield writer.writerow(['Section', 'Calculation Type', 'Material', 'Timestamp', 'Input Data', 'Result Data'])
 
-        writer.writerow([
-            get_section_name(calc),
-            get_calculation_type_display(calc),
-            material_info,
-            calc.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            json.dumps(calc.input_data),
-            json.dumps(calc.result_data)
-        ])
+        for calc in calculations:
+            # Use the display_material we set earlier
+            material_info = 'N/A'
+            if hasattr(calc, 'display_material') and calc.display_material:
+                material_info = calc.display_material.name
 
-    return response
+            yield writer.writerow([
+                get_section_name(calc),
+                get_calculation_type_display(calc),
+                material_info,
+                calc.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                json.dumps(calc.input_data),
+                json.dumps(calc.result_data)
+            ])
+
+    return stream_download(rows(), 'text/csv', history_filename(username, 'csv'), compress)
 
 
 def download_text_history(calculations, username):
@@ -0,0 +1,254 @@
+"""
+Columnar (batch) versions of the core ExtrusionCalculator formulas.
+
+Every argument is a column: a sequence with one value per job, or a single
+number shared by all jobs. Density is a column too, so one batch can mix
+materials. With NumPy installed each formula runs once over whole arrays;
+without it the same formula runs job by job in plain Python. Either way the
+results are lists of floats that match ExtrusionCalculator job for job,
+including its zero guards.
+"""
+import math
+
+from calculator.columnar import np, batch_length, run_formula, scale_column, to_column
+from .extrusion_calculator import ExtrusionCalculator
+
+MAX_BATCH_JOBS = 50000
+
+
+# ---------------------------------------------------------------------
+# FORMULAS (ops, density_kg_m3, *columns) - mirror ExtrusionCalculator
+# ---------------------------------------------------------------------
+
+def _mass_per_piece(ops, density, thickness_m, piece_length_m, piece_width_m):
+    return thickness_m * piece_length_m * piece_width_m * density * 2
+
+
+def _number_of_pieces(ops, density, total_mass_kg, mass_per_piece_kg):
+    return ops.floor(ops.div(total_mass_kg, mass_per_piece_kg))
+
+
+def _weight_from_length(ops, density, length_m, width_m, thickness_m):
+    return length_m * width_m * thickness_m * density
+
+
+def _film_length_from_weight(ops, density, film_weight_kg, film_width_m, thickness_m):
+    return ops.div(film_weight_kg, density * film_width_m * thickness_m)
+
+
+def _roll_length_from_od(ops, density, od_m, id_m, thickness_m):
+    return ops.div(math.pi * (od_m ** 2 - id_m ** 2), 4 * thickness_m)
+
+
+def _roll_radius(ops, density, core_diameter_m, thickness_m, roll_length_m):
+    core_radius = core_diameter_m / 2
+    outer_radius = ops.sqrt(ops.maximum(roll_length_m * thickness_m, 0) / math.pi + core_radius ** 2)
+    return ops.where(thickness_m <= 0, core_radius, outer_radius)
+
+
+def _roll_radius_from_mass(ops, density, core_diameter_m, thickness_m, width_m, total_mass_kg, core_weight_kg):
+    film_mass_kg = total_mass_kg - core_weight_kg
+    roll_length_m = ops.div(ops.maximum(film_mass_kg, 0), density * width_m * thickness_m)
+    outer_radius = _roll_radius(ops, density, core_diameter_m, thickness_m, roll_length_m)
+    no_film = (thickness_m <= 0) | (width_m <= 0) | (film_mass_kg <= 0)
+    return ops.where(no_film, core_diameter_m / 2, outer_radius)
+
+
+def _roll_mass(ops, density, roll_length_m, film_width_m, thickness_m, core_weight_kg):
+    return roll_length_m * film_width_m * thickness_m * density + core_weight_kg
+
+
+def _extrusion_rate(ops, density, line_speed_m_min, lay_flat_width_m, thickness_m):
+    return thickness_m * lay_flat_width_m * line_speed_m_min * density * 60
+
+
+def _production_time_for_quantity(ops, density, quantity_required, rate_kghr):
+    return ops.div(quantity_required, rate_kghr, default=float('inf'))
+
+
+class BatchExtrusionCalculator:
+    """
+    ExtrusionCalculator over columns of jobs. `density_g_cm3` is a single
+    density or one per job. Pass use_numpy=False to force the plain-Python path.
+    """
+
+    def __init__(self, density_g_cm3=0.92, use_numpy=True):
+        self.use_numpy = use_numpy and np is not None
+        self.DENSITY_KG_M3 = scale_column(density_g_cm3, 1000.0)
+
+    @property
+    def backend(self):
+        return 'numpy' if self.use_numpy else 'python'
+
+    def _run(self, formula, *columns):
+        return run_formula(formula, self.DENSITY_KG_M3, *columns, use_numpy=self.use_numpy)
+
+    def calc_mass_per_piece(self, thickness_m, piece_length_m, piece_width_m):
+        return self._run(_mass_per_piece, thickness_m, piece_length_m, piece_width_m)
+
+    def calc_number_of_pieces(self, total_mass_kg, mass_per_piece_kg):
+        return self._run(_number_of_pieces, total_mass_kg, mass_per_piece_kg)
+
+    def calc_weight_from_length(self, length_m, width_m, thickness_m):
+        return self._run(_weight_from_length, length_m, width_m, thickness_m)
+
+    def calc_film_length_from_weight(self, film_weight_kg, film_width_m, thickness_m):
+        return self._run(_film_length_from_weight, film_weight_kg, film_width_m, thickness_m)
+
+    def calc_roll_length_from_od(self, od_m, id_m, thickness_m):
+        return self._run(_roll_length_from_od, od_m, id_m, thickness_m)
+
+    def calc_roll_radius(self, core_diameter_m, thickness_m, roll_length_m):
+        return self._run(_roll_radius, core_diameter_m, thickness_m, roll_length_m)
+
+    def calc_roll_radius_from_mass(self, core_diameter_m, thickness_m, width_m, total_mass_kg, core_weight_kg=0):
+        return self._run(_roll_radius_from_mass, core_diameter_m, thickness_m, width_m, total_mass_kg, core_weight_kg)
+
+    def calc_roll_mass(self, roll_length_m, film_width_m, thickness_m, core_weight_kg=0.0):
+        return self._run(_roll_mass, roll_length_m, film_width_m, thickness_m, core_weight_kg)
+
+    def calc_extrusion_rate(self, line_speed_m_min, lay_flat_width_m, thickness_m):
+        return self._run(_extrusion_rate, line_speed_m_min, lay_flat_width_m, thickness_m)
+
+    def calc_production_time_for_quantity(self, quantity_required, rate_kghr):
+        return self._run(_production_time_for_quantity, quantity_required, rate_kghr)
+
+
+# ---------------------------------------------------------------------
+# BATCH OPERATIONS (used by the /extrusion/batch/ endpoint)
+# ---------------------------------------------------------------------
+
+_converter = ExtrusionCalculator()
+
+# Unit kinds: base unit and the factor from a given unit to it
+UNIT_FACTORS = {
+    'thickness': lambda unit: _converter.convert_to_meters(1.0, unit),
+    'length': lambda unit: _converter.convert_length(1.0, unit, 'm'),
+    'mass': lambda unit: _converter.convert_mass(1.0, unit, 'kg'),
+    'speed': lambda unit: _converter.convert_speed(1.0, unit, 'm_min'),
+    'mass_flow': lambda unit: _converter.convert_mass_flow(1.0, unit, 'kg_hr'),
+    'count': lambda unit: 1.0,
+}
+
+# column name: (unit kind, default unit, default value or None if required)
+BATCH_COLUMNS = {
+    'thickness': ('thickness', 'micron', None),
+    'piece_length': ('length', 'm', None),
+    'piece_width': ('length', 'm', None),
+    'total_pieces': ('count', None, None),
+    'total_mass': ('mass', 'kg', None),
+    'film_weight': ('mass', 'kg', None),
+    'film_width': ('length', 'm', None),
+    'width': ('length', 'mm', None),
+    'core_diameter': ('length', 'mm', None),
+    'outer_diameter': ('length', 'mm', None),
+    'core_weight': ('mass', 'kg', 0.0),
+    'line_speed': ('speed', 'm_min', None),
+    'lay_flat_width': ('length', 'm', None),
+    'quantity': ('mass', 'kg', None),
+    'production_rate': ('mass_flow', 'kg_hr', None),
+}
+
+
+def _total_mass(ops, density, thickness_m, piece_length_m, piece_width_m, total_pieces):
+    return _mass_per_piece(ops, density, thickness_m, piece_length_m, piece_width_m) * total_pieces
+
+
+def _outer_diameter(ops, density, outer_radius_m):
+    return outer_radius_m * 2
+
+
+def _pieces_to_mass(calc, c):
+    mass_per_piece = calc.calc_mass_per_piece(c['thickness'], c['piece_length'], c['piece_width'])
+    return {
+        'mass_per_piece_kg': mass_per_piece,
+        'total_mass_kg': calc._run(_total_mass, c['thickness'], c['piece_length'], c['piece_width'],
+                                   c['total_pieces']),
+    }
+
+
+def _mass_to_pieces(calc, c):
+    mass_per_piece = calc.calc_mass_per_piece(c['thickness'], c['piece_length'], c['piece_width'])
+    return {
+        'mass_per_piece_kg': mass_per_piece,
+        'total_pieces': calc.calc_number_of_pieces(c['total_mass'], mass_per_piece),
+    }
+
+
+def _film_length(calc, c):
+    return {'film_length_m': calc.calc_film_length_from_weight(c['film_weight'], c['film_width'], c['thickness'])}
+
+
+def _roll_radius_from_mass_op(calc, c):
+    outer_radius = calc.calc_roll_radius_from_mass(
+        c['core_diameter'], c['thickness'], c['width'], c['total_mass'], c['core_weight']
+    )
+    outer_diameter = calc._run(_outer_diameter, outer_radius)
+    return {
+        'outer_radius_m': outer_radius,
+        'outer_diameter_m': outer_diameter,
+        'roll_length_m': calc.calc_roll_length_from_od(outer_diameter, c['core_diameter'], c['thickness']),
+    }
+
+
+def _roll_length_from_od_op(calc, c):
+    return {'roll_length_m': calc.calc_roll_length_from_od(c['outer_diameter'], c['core_diameter'], c['thickness'])}
+
+
+def _extrusion_rate_op(calc, c):
+    return {'extrusion_rate_kg_hr': calc.calc_extrusion_rate(c['line_speed'], c['lay_flat_width'], c['thickness'])}
+
+
+def _production_time_op(calc, c):
+    return {'production_time_hr': calc.calc_production_time_for_quantity(c['quantity'], c['production_rate'])}
+
+
+# operation: (input columns, function(calculator, converted columns) -> output columns)
+BATCH_OPERATIONS = {
+    'pieces_to_mass': (('thickness', 'piece_length', 'piece_width', 'total_pieces'), _pieces_to_mass),
+    'mass_to_pieces': (('thickness', 'piece_length', 'piece_width', 'total_mass'), _mass_to_pieces),
+    'film_length': (('film_weight', 'film_width', 'thickness'), _film_length),
+    'roll_radius_from_mass': (
+        ('core_diameter', 'thickness', 'width', 'total_mass', 'core_weight'), _roll_radius_from_mass_op
+    ),
+    'roll_length_from_od': (('outer_diameter', 'core_diameter', 'thickness'), _roll_length_from_od_op),
+    'extrusion_rate': (('line_speed', 'lay_flat_width', 'thickness'), _extrusion_rate_op),
+    'production_time': (('quantity', 'production_rate'), _production_time_op),
+}
+
+
+def convert_columns(names, columns, units):
+    """Named input columns converted to base units; raises ValueError for missing or bad columns"""
+    converted = {}
+    for name in names:
+        kind, default_unit, default_value = BATCH_COLUMNS[name]
+        column = columns.get(name, default_value)
+        if column is None:
+            raise ValueError(f"Missing column: {name}")
+        converted[name] = scale_column(to_column(column), UNIT_FACTORS[kind](units.get(name, default_unit)))
+    return converted
+
+
+def check_operations(operations):
+    unknown = [operation for operation in operations if operation not in BATCH_OPERATIONS]
+    if unknown:
+        raise ValueError(f"Unknown operation(s): {', '.join(unknown)}")
+
+
+def run_batch(operations, columns, units, density_g_cm3, use_numpy=True):
+    """
+    Run batch operations over columnar inputs.
+    Returns (number of jobs, {output column: values}, backend name).
+    """
+    check_operations(operations)
+    names = {name for operation in operations for name in BATCH_OPERATIONS[operation][0]}
+    converted = convert_columns(sorted(names), columns, units)
+    jobs = batch_length(density_g_cm3, *converted.values())
+    if jobs > MAX_BATCH_JOBS:
+        raise ValueError(f"At most {MAX_BATCH_JOBS} jobs per batch")
+
+    calculator = BatchExtrusionCalculator(density_g_cm3, use_numpy=use_numpy)
+    results = {}
+    for operation in operations:
+        results.update(BATCH_OPERATIONS[operation][1](calculator, converted))
+    return jobs, results, calculator.backend
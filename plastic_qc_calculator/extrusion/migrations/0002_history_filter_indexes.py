@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('extrusion', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='extrusioncalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='extrusion_e_calcula_7fba91_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='extrusioncalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='extrusion_e_user_id_66c0b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='extrusioncalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='extrusion_input_material_idx'),
+        ),
+    ]
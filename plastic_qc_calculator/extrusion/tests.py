@@ -1,3 +1,88 @@
+import json
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from calculator.material_registry import registry as material_registry
+from calculator.models import PlasticMaterial
+from .batch_calculator import BatchExtrusionCalculator, run_batch
+from .extrusion_calculator import ExtrusionCalculator
+
+THICKNESS_M = [25e-6, 0.0, 40e-6]
+WIDTH_M = [0.5, 0.6, 0.0]
+DENSITIES = [0.92, 0.95, 1.38]
+
+
+class BatchExtrusionCalculatorTests(TestCase):
+    def assertMatchesScalar(self, method, batch_args, job_args):
+        for use_numpy in (True, False):
+            batch = getattr(BatchExtrusionCalculator(DENSITIES, use_numpy=use_numpy), method)(*batch_args)
+            expected = [
+                getattr(ExtrusionCalculator(density), method)(*args) for density, args in zip(DENSITIES, job_args)
+            ]
+            for value, scalar in zip(batch, expected):
+                self.assertAlmostEqual(value, scalar)
+
+    def test_formulas_match_the_scalar_calculator(self):
+        masses = [12.0, 5.0, 3.0]
+        self.assertMatchesScalar('calc_film_length_from_weight', (masses, WIDTH_M, THICKNESS_M),
+                                 zip(masses, WIDTH_M, THICKNESS_M))
+        self.assertMatchesScalar('calc_roll_radius_from_mass', (0.076, THICKNESS_M, WIDTH_M, masses, 1.0),
+                                 [(0.076, t, w, m, 1.0) for t, w, m in zip(THICKNESS_M, WIDTH_M, masses)])
+        self.assertMatchesScalar('calc_roll_length_from_od', (0.3, 0.076, THICKNESS_M),
+                                 [(0.3, 0.076, t) for t in THICKNESS_M])
+        self.assertMatchesScalar('calc_number_of_pieces', (masses, [0.01, 0.0, 0.2]),
+                                 zip(masses, [0.01, 0.0, 0.2]))
+
+    def test_derived_columns_match_the_scalar_calculator(self):
+        columns = {'thickness': 25, 'piece_length': 0.4, 'piece_width': 0.3, 'total_pieces': [100, 250],
+                   'core_diameter': 76, 'width': 500, 'total_mass': [12, 0]}
+        for use_numpy in (True, False):
+            _, results, _ = run_batch(['pieces_to_mass', 'roll_radius_from_mass'], columns, {}, 0.92,
+                                      use_numpy=use_numpy)
+            scalar = ExtrusionCalculator(0.92)
+            for pieces, mass, total_mass, diameter in zip((100, 250), (12, 0), results['total_mass_kg'],
+                                                          results['outer_diameter_m']):
+                self.assertAlmostEqual(total_mass, scalar.calc_mass_per_piece(25e-6, 0.4, 0.3) * pieces)
+                self.assertAlmostEqual(diameter, scalar.calc_roll_radius_from_mass(0.076, 25e-6, 0.5, mass) * 2)
+
+    def test_zero_rate_means_infinite_time(self):
+        calculator = BatchExtrusionCalculator(use_numpy=False)
+        self.assertEqual(calculator.calc_production_time_for_quantity([100, 100], [50, 0]), [2.0, float('inf')])
+
+
+class BatchEndpointTests(TestCase):
+    url = '/extrusion/batch/'
+
+    def setUp(self):
+        self.ldpe = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.hdpe = PlasticMaterial.objects.create(name='HDPE', code='HDPE', material_type='FILM', density=0.95)
+        material_registry.invalidate()
+        self.client.force_login(get_user_model().objects.create_user('tester', password='pw', is_approved=True))
+
+    def post(self, body):
+        return self.client.post(self.url, json.dumps(body), content_type='application/json').json()
+
+    def test_columns_units_and_materials_per_job(self):
+        response = self.post({
+            'operations': ['film_length', 'production_time'],
+            'columns': {'film_weight': [10, 10], 'film_width': 500, 'thickness': 0.025,
+                        'quantity': 100, 'production_rate': [50, 0]},
+            'units': {'film_width': 'mm', 'thickness': 'mm'},
+            'material_id': [self.ldpe.pk, self.hdpe.pk],
+        })
+
+        self.assertTrue(response['success'])
+        columns = response['result']['columns']
+        self.assertEqual(response['result']['jobs'], 2)
+        for value, density in zip(columns['film_length_m'], (0.92, 0.95)):
+            self.assertAlmostEqual(value, ExtrusionCalculator(density).calc_film_length_from_weight(10, 0.5, 25e-6))
+        self.assertEqual(columns['production_time_hr'], [2.0, None])
+
+    def test_bad_payloads(self):
+        self.assertEqual(self.post({'operations': ['nope'], 'density': 0.92})['error'], 'Unknown operation(s): nope')
+        self.assertEqual(self.post({'operations': 'film_length', 'density': 0.92, 'columns': {}})['error'],
+                         'Missing column: film_weight')
+        self.assertEqual(self.post({'operations': 'extrusion_rate', 'material_id': [self.ldpe.pk, 999999],
+                                    'columns': {'line_speed': 1, 'lay_flat_width': 1, 'thickness': 25}})['error'],
+                         'Material not found: 999999')
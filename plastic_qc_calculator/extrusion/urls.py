@@ -24,6 +24,7 @@ urlpatterns = [
     path('calculate-composite-density/', views.calculate_composite_density, name='calculate_composite_density'),
     path('calculate-yield-basis-weight/', views.calculate_yield_basis_weight, name='calculate_yield_basis_weight'),
     path('calculate-roll-radius-from-mass/', views.calculate_roll_radius_from_mass, name='calculate_roll_radius_from_mass'),
+    path('batch/', views.calculate_batch, name='calculate_batch'),
 
     # History
     path('history/', views.extrusion_history, name='extrusion_history'),
@@ -3,8 +3,15 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
+from calculator.gauge_tables import get_gauge_table
+from sales.structures import get_complete_structure
 from .models import ExtrusionCalculation, ThicknessMeasurement
 from .extrusion_calculator import ExtrusionCalculator
+from .batch_calculator import check_operations, run_batch
 import json
 import statistics
 import math
@@ -32,6 +39,7 @@ def safe_int(value, default=0):
 
 
 @login_required
+@conditional_page('extrusion/home.html', *SECTION_TEMPLATES, materials=True)
 def extrusion_home(request):
     calculators = [
         {'id': 'pieces_weight', 'name': 'Pieces to Weight', 'icon': 'fas fa-cubes'},
@@ -53,6 +61,7 @@ def extrusion_home(request):
     materials = PlasticMaterial.objects.filter(material_type='FILM')
 
     return render(request, 'extrusion/home.html', {
+        **section_page_context(),
         'section_name': 'Extrusion',
         'calculators': calculators,
         'materials': materials
@@ -61,6 +70,7 @@ def extrusion_home(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_pieces_weight(request):
     if request.method == 'POST':
         try:
@@ -79,7 +89,7 @@ def calculate_pieces_weight(request):
             total_mass = safe_float(data.get('total_mass', 0))
             total_mass_unit = data.get('total_mass_unit', 'kg')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             # Convert to base units
@@ -143,6 +153,7 @@ def calculate_pieces_weight(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_roll_radius_from_mass(request):
     """Calculate roll outer radius/diameter from mass"""
     if request.method == 'POST':
@@ -160,7 +171,7 @@ def calculate_roll_radius_from_mass(request):
             core_weight = safe_float(data.get('core_weight', 0))
             core_weight_unit = data.get('core_weight_unit', 'kg')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             core_diameter_m = calculator.convert_length(core_diameter, core_diameter_unit, 'm')
@@ -207,6 +218,7 @@ def calculate_roll_radius_from_mass(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_thickness(request):
     if request.method == 'POST':
         try:
@@ -218,7 +230,7 @@ def calculate_thickness(request):
             if not material_id:
                 return JsonResponse({'success': False, 'error': 'Please select a material'})
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             if method == 'cut_weigh':
@@ -337,6 +349,7 @@ def calculate_thickness(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_takeup_speed(request):
     if request.method == 'POST':
         try:
@@ -364,7 +377,7 @@ def calculate_takeup_speed(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='TAKEUP_SPEED',
                     material=default_material,
@@ -383,6 +396,7 @@ def calculate_takeup_speed(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_roll_properties(request):
     if request.method == 'POST':
         try:
@@ -390,7 +404,7 @@ def calculate_roll_properties(request):
             material_id = data.get('material_id')
             calculation_type = data.get('calculation_type', 'length')  # 'length' or 'mass'
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             core_diameter = safe_float(data.get('core_diameter', 0))
@@ -452,6 +466,7 @@ def calculate_roll_properties(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_film_length(request):
     if request.method == 'POST':
         try:
@@ -464,7 +479,7 @@ def calculate_film_length(request):
             thickness = safe_float(data.get('thickness', 0))
             thickness_unit = data.get('thickness_unit', 'micron')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             film_weight_kg = calculator.convert_mass(film_weight, film_weight_unit, 'kg')
@@ -499,6 +514,7 @@ def calculate_film_length(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_time(request):
     if request.method == 'POST':
         try:
@@ -509,7 +525,7 @@ def calculate_production_time(request):
             production_rate = safe_float(data.get('production_rate', 0))
             production_rate_unit = data.get('production_rate_unit', 'kg_hr')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             quantity_kg = calculator.convert_mass(quantity, quantity_unit, 'kg')
@@ -548,13 +564,14 @@ def calculate_production_time(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_bur_ddr(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
             material_id = data.get('material_id')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             lay_flat_width = safe_float(data.get('lay_flat_width', 0))
@@ -609,6 +626,7 @@ def get_bur_recommendation(bur):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_tensile_strength(request):
     if request.method == 'POST':
         try:
@@ -636,7 +654,7 @@ def calculate_tensile_strength(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='TENSILE',
                     material=default_material,
@@ -665,6 +683,7 @@ def get_tensile_category(strength_mpa):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_elongation(request):
     if request.method == 'POST':
         try:
@@ -689,7 +708,7 @@ def calculate_elongation(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='ELONGATION',
                     material=default_material,
@@ -718,6 +737,7 @@ def get_elongation_category(elongation_percent):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_cof(request):
     if request.method == 'POST':
         try:
@@ -741,7 +761,7 @@ def calculate_cof(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='COF',
                     material=default_material,
@@ -780,6 +800,7 @@ def get_cof_interpretation(cof):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_dart_impact(request):
     if request.method == 'POST':
         try:
@@ -802,7 +823,7 @@ def calculate_dart_impact(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='DART_IMPACT',
                     material=default_material,
@@ -832,6 +853,7 @@ def get_dart_impact_category(m50_g):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_gauge_variation(request):
     if request.method == 'POST':
         try:
@@ -860,7 +882,7 @@ def calculate_gauge_variation(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='GAUGE_VARIATION',
                     material=default_material,
@@ -890,18 +912,28 @@ def get_uniformity_rating(cv_percent):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_composite_density(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            layer_densities = [safe_float(d) for d in data.get('layer_densities', [])]
-            layer_thicknesses = [safe_float(t) for t in data.get('layer_thicknesses', [])]
+            if data.get('structure_id'):
+                # Saved laminated structure: layer densities and thicknesses come from its stored properties
+                structure = get_complete_structure(data['structure_id'])
+                layer_densities = [layer['density'] for layer in structure.layer_properties]
+                layer_thicknesses = [layer['thickness_microns'] for layer in structure.layer_properties]
+            else:
+                layer_densities = [safe_float(d) for d in data.get('layer_densities', [])]
+                layer_thicknesses = [safe_float(t) for t in data.get('layer_thicknesses', [])]
 
             if len(layer_densities) != len(layer_thicknesses):
                 return JsonResponse({'success': False, 'error': 'Number of densities must match number of thicknesses'})
 
             calculator = ExtrusionCalculator()
-            composite_density = calculator.calc_composite_density(layer_densities, layer_thicknesses)
+            if data.get('structure_id'):
+                composite_density = structure.effective_density
+            else:
+                composite_density = calculator.calc_composite_density(layer_densities, layer_thicknesses)
 
             total_thickness = sum(layer_thicknesses)
             layer_data = []
@@ -921,7 +953,7 @@ def calculate_composite_density(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 ExtrusionCalculation.objects.create(
                     calculation_type='COMPOSITE_DENSITY',
                     material=default_material,
@@ -940,6 +972,7 @@ def calculate_composite_density(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_yield_basis_weight(request):
     if request.method == 'POST':
         try:
@@ -948,12 +981,13 @@ def calculate_yield_basis_weight(request):
             thickness = safe_float(data.get('thickness', 0))
             thickness_unit = data.get('thickness_unit', 'micron')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             thickness_m = calculator.convert_to_meters(thickness, thickness_unit)
-            yield_val = calculator.calc_yield(thickness_m)
-            basis_weight = calculator.calc_basis_weight(thickness_m)
+            gauge = get_gauge_table(material.id).lookup(thickness_m * 1_000_000)
+            yield_val = gauge['yield_m2_kg']
+            basis_weight = gauge['basis_weight_g_m2']
 
             result = {
                 'yield_m2_kg': round(yield_val, 2),
@@ -991,6 +1025,7 @@ def extrusion_history(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_weight_from_length(request):
     """Calculate weight from film length (reverse of film length calculation)"""
     if request.method == 'POST':
@@ -1004,7 +1039,7 @@ def calculate_weight_from_length(request):
             thickness = safe_float(data.get('thickness', 0))
             thickness_unit = data.get('thickness_unit', 'micron')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             film_length_m = calculator.convert_length(film_length, film_length_unit, 'm')
@@ -1038,6 +1073,7 @@ def calculate_weight_from_length(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_roll_radius(request):
     """Calculate roll outer radius/diameter from length"""
     if request.method == 'POST':
@@ -1051,7 +1087,7 @@ def calculate_roll_radius(request):
             roll_length = safe_float(data.get('roll_length', 0))
             roll_length_unit = data.get('roll_length_unit', 'm')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = ExtrusionCalculator(material.density)
 
             core_diameter_m = calculator.convert_length(core_diameter, core_diameter_unit, 'm')
@@ -1086,3 +1122,58 @@ def calculate_roll_radius(request):
             return JsonResponse({'success': False, 'error': str(e)})
 
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+def batch_densities(data):
+    """Density per job (or one for all jobs) from 'density' or 'material_id' in a batch payload"""
+    if data.get('density') is not None:
+        density = data['density']
+        return float(density) if not isinstance(density, list) else [safe_float(value) for value in density]
+
+    material_id = data.get('material_id')
+    if isinstance(material_id, list):
+        densities = {}
+        for value in set(material_id):
+            material = material_registry.get_or_none(value)
+            if material is None:
+                raise PlasticMaterial.DoesNotExist(f"Material not found: {value}")
+            densities[value] = material.density
+        return [densities[value] for value in material_id]
+    return material_registry.get(material_id).density
+
+
+@login_required
+@csrf_exempt
+def calculate_batch(request):
+    """
+    Columnar batch of extrusion jobs. The payload names the operations, gives
+    one list per input column (or a single value shared by every job), optional
+    units per column, and a density or material_id (single or per job).
+    Results come back as one list per output column; batches are not saved to
+    the calculation history.
+    """
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            operations = data.get('operations') or []
+            if isinstance(operations, str):
+                operations = [operations]
+            if not operations:
+                return JsonResponse({'success': False, 'error': 'At least one operation is required'})
+
+            check_operations(operations)
+            jobs, results, backend = run_batch(
+                operations, data.get('columns', {}), data.get('units', {}), batch_densities(data)
+            )
+
+            # Infinite times (zero production rate) are not valid JSON
+            for name, values in results.items():
+                if not math.isfinite(sum(values)):
+                    results[name] = [value if math.isfinite(value) else None for value in values]
+
+            return JsonResponse({'success': True, 'result': {'jobs': jobs, 'backend': backend, 'columns': results}})
+
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
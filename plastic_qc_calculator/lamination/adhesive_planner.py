@@ -0,0 +1,174 @@
+"""
+Adhesive planning for a lamination schedule.
+
+Each job gives its total mass, coat weight, the film GSM (or a saved
+laminated structure) and its adhesive system, with the same custom ratio and
+solids fields as the single adhesive-components calculation, and optionally a
+date. Jobs are grouped by adhesive system, so each system is resolved and its
+mix fractions worked out once; every job is then evaluated in one
+LaminationCalculator.calculate_adhesive_components_batch() pass and the
+results summed per system and per day and system (the daily mix list).
+"""
+from collections import Counter
+
+from calculator.columnar import np, group_totals
+from sales.models import LaminatedStructure
+from .lamination_calculator import LaminationCalculator
+
+MAX_SCHEDULE_JOBS = 50000
+
+TOTAL_COLUMNS = ['total_area_m2', 'dry_adhesive_mass_kg', 'resin_kg', 'hardener_kg', 'ethyl_acetate_kg',
+                 'total_wet_mix_kg']
+CUSTOM_FIELDS = ['custom_ratio_a', 'custom_ratio_b', 'custom_ratio_c', 'custom_adhesive_solids',
+                 'custom_hardener_solids', 'custom_adhesive_name', 'custom_hardener_name']
+
+
+def parse_number(value, name, job_label):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        raise ValueError(f"Job {job_label}: {name} must be a number")
+
+
+def system_key(job, job_label):
+    """Adhesive type plus the custom values a job applies to it, as a hashable key"""
+    adhesive_type = job.get('adhesive_type', 'SOLVENTLESS')
+    if not job.get('use_custom_ratio'):
+        return (adhesive_type,) + (None,) * len(CUSTOM_FIELDS)
+
+    ratio_a, ratio_b, ratio_c = (job.get(field) for field in CUSTOM_FIELDS[:3])
+    if not ratio_a or not ratio_b or not ratio_c:
+        raise ValueError(f"Job {job_label}: please provide all custom ratio values (A, B, and C)")
+    if float(ratio_a) <= 0 or float(ratio_b) <= 0 or float(ratio_c) < 0:
+        raise ValueError(f"Job {job_label}: custom ratios A and B must be greater than zero, "
+                         f"and C must be zero or positive")
+    numbers = [float(value) if value else None for value in (job.get(field) for field in CUSTOM_FIELDS[:5])]
+    names = [job.get(field) or None for field in CUSTOM_FIELDS[5:]]
+    return (adhesive_type, *numbers, *names)
+
+
+def describe_system(calculator, key):
+    """Resolved system for a key: labels plus the mix fractions shared by its jobs"""
+    adhesive_type = key[0]
+    system = calculator.get_adhesive_system(*key)
+    wet_a, wet_b, wet_c, solids_fraction = calculator.calculate_mix_fractions(system)
+    mix_ratio = system['mix_ratio']
+    return {
+        'adhesive_type': adhesive_type,
+        'adhesive_system': system['adhesive']['name'],
+        'hardener_system': system['hardener']['name'],
+        'mix_ratio': f"{mix_ratio['A']}:{mix_ratio['B']}:{mix_ratio['C']}",
+        'is_custom': key[1] is not None or key[4] is not None,
+        'solids_fraction': round(solids_fraction, 4),
+        'fractions': (wet_a, wet_b, wet_c if system['is_solvent_based'] else 0.0, solids_fraction),
+    }
+
+
+def load_film_gsms(jobs):
+    """{structure id: total GSM} for every structure the jobs name, in one query"""
+    ids = {int(job['structure_id']) for job in jobs if str(job.get('structure_id') or '').isdigit()}
+    return dict(LaminatedStructure.objects.filter(pk__in=ids).values_list('pk', 'total_gsm')) if ids else {}
+
+
+def job_columns(jobs, mass_to_kg=1.0):
+    """
+    (labels, dates, system keys, systems, columns for
+    calculate_adhesive_components_batch). Raises ValueError for a bad job.
+    """
+    if len(jobs) > MAX_SCHEDULE_JOBS:
+        raise ValueError(f"At most {MAX_SCHEDULE_JOBS} jobs per schedule")
+    calculator = LaminationCalculator()
+    film_gsms = load_film_gsms(jobs)
+    systems = {}
+    labels, dates, keys, masses, coat_weights, total_film_gsms = [], [], [], [], [], []
+    for number, job in enumerate(jobs, start=1):
+        label = job.get('job') or number
+        if job.get('structure_id'):
+            film_gsm = film_gsms.get(int(job['structure_id'])) if str(job['structure_id']).isdigit() else None
+            if film_gsm is None:
+                raise ValueError(f"Job {label}: structure not found: {job['structure_id']}")
+        else:
+            film_gsm = parse_number(job.get('total_film_gsm'), 'total_film_gsm', label)
+        total_mass_kg = parse_number(job.get('total_mass'), 'total_mass', label) * mass_to_kg
+        coat_weight_gsm = parse_number(job.get('coat_weight_gsm'), 'coat_weight_gsm', label)
+        if total_mass_kg <= 0:
+            raise ValueError(f"Job {label}: total mass must be greater than zero")
+        if coat_weight_gsm <= 0:
+            raise ValueError(f"Job {label}: coat weight must be greater than zero")
+        if film_gsm <= 0:
+            raise ValueError(f"Job {label}: total film GSM must be greater than zero")
+
+        key = system_key(job, label)
+        if key not in systems:
+            try:
+                systems[key] = describe_system(calculator, key)
+            except ValueError as e:
+                raise ValueError(f"Job {label}: {e}")
+        labels.append(label)
+        dates.append(str(job.get('date') or ''))
+        keys.append(key)
+        masses.append(total_mass_kg)
+        coat_weights.append(coat_weight_gsm)
+        total_film_gsms.append(film_gsm)
+
+    if not labels:
+        raise ValueError('At least one job is required')
+    fractions = [systems[key]['fractions'] for key in keys]
+    wet_a, wet_b, wet_c, solids = (list(column) for column in zip(*fractions))
+    columns = {
+        'total_masses_kg': masses,
+        'coat_weights_gsm': coat_weights,
+        'total_film_gsms': total_film_gsms,
+        'wet_A_ratios': wet_a,
+        'wet_B_ratios': wet_b,
+        'solvent_C_ratios': wet_c,
+        'solids_fractions': solids,
+    }
+    return labels, dates, keys, systems, columns
+
+
+def rounded_totals(totals, index):
+    return {name: round(totals[name][index], 3) for name in TOTAL_COLUMNS}
+
+
+def system_line(system, totals, index):
+    return {name: value for name, value in system.items() if name != 'fractions'} | rounded_totals(totals, index)
+
+
+def plan_adhesive_schedule(jobs, mass_to_kg=1.0):
+    """Resin A, Hardener B and ethyl acetate per job, per adhesive system, per day and in total"""
+    labels, dates, keys, systems, columns = job_columns(jobs, mass_to_kg)
+    results = LaminationCalculator.calculate_adhesive_components_batch(**columns)
+    results['total_wet_mix_kg'] = [
+        resin + hardener + solvent
+        for resin, hardener, solvent in zip(results['resin_kg'], results['hardener_kg'], results['ethyl_acetate_kg'])
+    ]
+
+    system_keys, system_totals = group_totals(keys, results)
+    job_counts = Counter(keys)
+    day_keys, day_totals = group_totals(list(zip(dates, keys)), results)
+
+    days = {}
+    for index, (date, key) in enumerate(day_keys):
+        day = days.setdefault(date, {'date': date, 'systems': [], 'totals': dict.fromkeys(TOTAL_COLUMNS, 0.0)})
+        day['systems'].append(system_line(systems[key], day_totals, index))
+        for name in TOTAL_COLUMNS:
+            day['totals'][name] += day_totals[name][index]
+    for day in days.values():
+        day['totals'] = {name: round(value, 3) for name, value in day['totals'].items()}
+
+    job_results = [
+        {'job': label, 'date': date, 'adhesive_type': key[0], **rounded_totals(results, index)}
+        for index, (label, date, key) in enumerate(zip(labels, dates, keys))
+    ]
+    return {
+        'jobs': len(labels),
+        'backend': 'numpy' if np is not None else 'python',
+        'systems': [
+            system_line(systems[key], system_totals, index) | {'job_count': job_counts[key]}
+            for index, key in enumerate(system_keys)
+        ],
+        'daily': list(days.values()),
+        'totals': {name: round(sum(results[name]), 3) for name in TOTAL_COLUMNS},
+        'job_results': job_results,
+    }
@@ -1,3 +1,22 @@
+from calculator.columnar import run_formula
+
+
+# --- COLUMN FORMULAS (ops, *columns) for the array API below ---
+
+def _total_area(ops, total_mass_kg, coat_weight_gsm, total_film_gsm):
+    total_laminate_gsm = total_film_gsm + coat_weight_gsm
+    return ops.where(total_laminate_gsm > 0, ops.div(total_mass_kg * 1000, total_laminate_gsm), 0.0)
+
+
+def _dry_adhesive_mass(ops, coat_weight_gsm, total_area_m2):
+    return coat_weight_gsm * total_area_m2 / 1000
+
+
+def _wet_component_mass(ops, dry_mass_kg, solids_fraction, wet_ratio):
+    # No solids in the mix: no components, like the single-job method
+    return ops.div(dry_mass_kg, solids_fraction) * wet_ratio
+
+
 class LaminationCalculator:
     """
     Comprehensive lamination calculator for plastic film manufacturing.
@@ -44,7 +63,10 @@ class LaminationCalculator:
         if adhesive_type not in self.DEFAULT_ADHESIVE_SYSTEMS:
             raise ValueError(f"Unknown adhesive type: {adhesive_type}")
 
-        system = self.DEFAULT_ADHESIVE_SYSTEMS[adhesive_type].copy()
+        # Copy the nested dicts too, so custom values never leak into the defaults
+        default = self.DEFAULT_ADHESIVE_SYSTEMS[adhesive_type]
+        system = {**default, 'hardener': dict(default['hardener']), 'adhesive': dict(default['adhesive']),
+                  'mix_ratio': dict(default['mix_ratio'])}
 
         # Apply custom values
         if custom_ratio_a is not None and custom_ratio_b is not None and custom_ratio_c is not None:
@@ -68,6 +90,23 @@ class LaminationCalculator:
 
         return system
 
+    @staticmethod
+    def calculate_mix_fractions(system):
+        """
+        Wet fractions of Resin A, Hardener B and solvent C in the mix, and the
+        solids fraction of the whole wet mix, for an adhesive system.
+        """
+        component_mix_ratio = system['mix_ratio']
+        ratio_sum = component_mix_ratio['A'] + component_mix_ratio['B'] + component_mix_ratio['C']
+        wet_A_ratio = component_mix_ratio['A'] / ratio_sum
+        wet_B_ratio = component_mix_ratio['B'] / ratio_sum
+        wet_C_ratio = component_mix_ratio['C'] / ratio_sum
+
+        # Solvent (Part C) has 0% solids
+        total_solids_fraction = (wet_A_ratio * system['adhesive']['solids'] +
+                                 wet_B_ratio * system['hardener']['solids'])
+        return wet_A_ratio, wet_B_ratio, wet_C_ratio, total_solids_fraction
+
     def calculate_adhesive_component_weights(self, adhesive_type, total_mass_kg, coat_weight_gsm,
                                              total_film_gsm, custom_ratio_a=None, custom_ratio_b=None,
                                              custom_ratio_c=None,
@@ -115,15 +154,7 @@ class LaminationCalculator:
         total_dry_mass_kg = total_dry_mass_g / 1000
 
         # Total Solids Content calculation
-        ratio_sum = component_mix_ratio['A'] + component_mix_ratio['B'] + component_mix_ratio['C']
-        wet_A_ratio = component_mix_ratio['A'] / ratio_sum
-        wet_B_ratio = component_mix_ratio['B'] / ratio_sum
-        wet_C_ratio = component_mix_ratio['C'] / ratio_sum
-
-        dry_A_ratio = wet_A_ratio * component_solids['A']
-        dry_B_ratio = wet_B_ratio * component_solids['B']
-        dry_C_ratio = wet_C_ratio * component_solids['C']
-        total_solids_fraction = dry_A_ratio + dry_B_ratio + dry_C_ratio
+        wet_A_ratio, wet_B_ratio, wet_C_ratio, total_solids_fraction = self.calculate_mix_fractions(system)
 
         if total_solids_fraction == 0:
             return {
@@ -170,6 +201,29 @@ class LaminationCalculator:
             }
         }
 
+    # --- ARRAY API: MANY JOBS AT ONCE ---
+
+    @staticmethod
+    def calculate_adhesive_components_batch(total_masses_kg, coat_weights_gsm, total_film_gsms, wet_A_ratios,
+                                            wet_B_ratios, solvent_C_ratios, solids_fractions):
+        """
+        Adhesive components for many jobs, as columns. Each argument is a column
+        (one value per job) or a single number for all jobs; the ratio and
+        solids columns come from calculate_mix_fractions(), worked out once per
+        adhesive system. solvent_C_ratios is the wet solvent fraction, or 0 for
+        solventless systems. Matches calculate_adhesive_component_weights
+        before rounding.
+        """
+        total_area_m2 = run_formula(_total_area, total_masses_kg, coat_weights_gsm, total_film_gsms)
+        dry_mass_kg = run_formula(_dry_adhesive_mass, coat_weights_gsm, total_area_m2)
+        return {
+            'total_area_m2': total_area_m2,
+            'dry_adhesive_mass_kg': dry_mass_kg,
+            'resin_kg': run_formula(_wet_component_mass, dry_mass_kg, solids_fractions, wet_A_ratios),
+            'hardener_kg': run_formula(_wet_component_mass, dry_mass_kg, solids_fractions, wet_B_ratios),
+            'ethyl_acetate_kg': run_formula(_wet_component_mass, dry_mass_kg, solids_fractions, solvent_C_ratios),
+        }
+
     @staticmethod
     def calculate_gsm_from_dimensions(thickness_um, density_g_cm3):
         """
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lamination', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='laminationcalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='lamination__calcula_8420e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laminationcalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='lamination__user_id_894f71_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laminationcalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='lamination_input_material_idx'),
+        ),
+    ]
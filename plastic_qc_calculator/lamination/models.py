@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.fields.json import KT
 from calculator.models import PlasticMaterial
 from qc_project import settings
 
@@ -21,6 +22,13 @@ class LaminationCalculation(models.Model):
         blank=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['calculation_type', 'timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(KT('input_data__material_id'), name='lamination_input_material_idx'),
+        ]
+
     def __str__(self):
         return f"{self.calculation_type} - {self.adhesive_type}"
 
@@ -1,3 +1,76 @@
+import copy
+import json
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from sales.models import LaminatedStructure
+from .adhesive_planner import plan_adhesive_schedule
+from .lamination_calculator import LaminationCalculator
+
+CUSTOM = {'use_custom_ratio': True, 'custom_ratio_a': 100, 'custom_ratio_b': 20, 'custom_ratio_c': 30,
+          'custom_hardener_solids': 0.75}
+
+
+class AdhesiveScheduleTests(TestCase):
+    def job(self, label, date, adhesive_type, total_mass=1000, **fields):
+        return {'job': label, 'date': date, 'adhesive_type': adhesive_type, 'total_mass': total_mass,
+                'coat_weight_gsm': 2.5, 'total_film_gsm': 60, **fields}
+
+    def test_jobs_match_the_single_calculation(self):
+        jobs = [
+            self.job('A', '2026-10-01', 'SOLVENTLESS'),
+            self.job('B', '2026-10-01', 'SOLVENT_BASE', total_mass=400),
+            self.job('C', '2026-10-02', 'CUSTOM_SOLVENT_BASE', total_mass=250, **CUSTOM),
+        ]
+        result = plan_adhesive_schedule(jobs)
+
+        calculator = LaminationCalculator()
+        for job, line in zip(jobs, result['job_results']):
+            custom = {field: job.get(field) for field in CUSTOM if field != 'use_custom_ratio'}
+            single = calculator.calculate_adhesive_component_weights(
+                job['adhesive_type'], job['total_mass'], 2.5, 60, **custom
+            )
+            self.assertAlmostEqual(line['resin_kg'], single['Resin_A_kg'], places=3)
+            self.assertAlmostEqual(line['hardener_kg'], single['Hardener_B_kg'], places=3)
+            self.assertAlmostEqual(line['ethyl_acetate_kg'], single['Ethyl_Acetate_kg'], places=3)
+        self.assertEqual(result['systems'][2]['mix_ratio'], '100.0:20.0:30.0')
+        self.assertTrue(result['systems'][2]['is_custom'])
+
+    def test_totals_per_system_and_day(self):
+        result = plan_adhesive_schedule([
+            self.job('A', '2026-10-01', 'SOLVENTLESS'),
+            self.job('B', '2026-10-02', 'SOLVENTLESS'),
+            self.job('C', '2026-10-02', 'SOLVENT_BASE'),
+        ])
+
+        self.assertEqual([(line['adhesive_type'], line['job_count']) for line in result['systems']],
+                         [('SOLVENTLESS', 2), ('SOLVENT_BASE', 1)])
+        self.assertEqual([len(day['systems']) for day in result['daily']], [1, 2])
+        resin = sum(line['resin_kg'] for line in result['job_results'])
+        self.assertAlmostEqual(result['totals']['resin_kg'], resin, places=2)
+        self.assertEqual(result['job_results'][0]['ethyl_acetate_kg'], 0)
+
+    def test_custom_ratios_leave_the_default_systems_alone(self):
+        defaults = copy.deepcopy(LaminationCalculator.DEFAULT_ADHESIVE_SYSTEMS)
+        plan_adhesive_schedule([self.job('A', '', 'SOLVENT_BASE', **CUSTOM, custom_adhesive_name='Mine')])
+        self.assertEqual(LaminationCalculator.DEFAULT_ADHESIVE_SYSTEMS, defaults)
+
+    def test_structure_supplies_the_film_gsm(self):
+        structure = LaminatedStructure.objects.create(name='PET/PE', layers=[
+            {'name': 'PET', 'density': 1.38, 'thickness_microns': 12},
+            {'name': 'PE', 'density': 0.92, 'thickness_microns': 50},
+        ])
+        by_structure = plan_adhesive_schedule([self.job('A', '', 'SOLVENTLESS', structure_id=structure.pk)])
+        by_gsm = plan_adhesive_schedule([self.job('A', '', 'SOLVENTLESS', total_film_gsm=structure.total_gsm)])
+        self.assertEqual(by_structure['totals'], by_gsm['totals'])
+
+        with self.assertRaisesMessage(ValueError, 'Job A: structure not found: 999999'):
+            plan_adhesive_schedule([self.job('A', '', 'SOLVENTLESS', structure_id=999999)])
+
+    def test_endpoint_reports_bad_jobs(self):
+        self.client.force_login(get_user_model().objects.create_user('tester', password='pw', is_approved=True))
+        body = {'jobs': [self.job('A', '', 'SOLVENTLESS'), self.job('B', '', 'SOLVENTLESS', coat_weight_gsm=0)]}
+        response = self.client.post('/lamination/adhesive-schedule/', json.dumps(body),
+                                    content_type='application/json').json()
+        self.assertEqual(response, {'success': False, 'error': 'Job B: coat weight must be greater than zero'})
@@ -11,6 +11,7 @@ urlpatterns = [
     path('calculate-multilayer-gsm/', views.calculate_multilayer_gsm, name='calculate_multilayer_gsm'),
     path('calculate-weight-breakdown/', views.calculate_weight_breakdown, name='calculate_weight_breakdown'),
     path('calculate-adhesive-components/', views.calculate_adhesive_components, name='calculate_adhesive_components'),
+    path('adhesive-schedule/', views.calculate_adhesive_schedule, name='calculate_adhesive_schedule'),
     path('calculate-lamination-time/', views.calculate_lamination_time, name='calculate_lamination_time'),
     path('calculate-production-efficiency/', views.calculate_production_efficiency,
          name='calculate_production_efficiency'),
@@ -3,12 +3,20 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
+from calculator.layer_stack import load_layer_stack, save_layers
+from sales.structures import get_complete_structure
 from .models import LaminationCalculation, LaminationLayer
 from .lamination_calculator import LaminationCalculator
+from .adhesive_planner import plan_adhesive_schedule
 import json
 
 
 @login_required
+@conditional_page('lamination/home.html', *SECTION_TEMPLATES, materials=True)
 def lamination_home(request):
     calculators = [
         {'id': 'gsm_calc', 'name': 'GSM Calculation', 'icon': 'fas fa-weight-scale'},
@@ -23,6 +31,7 @@ def lamination_home(request):
     adhesive_types = LaminationCalculation.ADHESIVE_TYPES
 
     return render(request, 'lamination/home.html', {
+        **section_page_context(),
         'section_name': 'Lamination',
         'calculators': calculators,
         'materials': materials,
@@ -32,6 +41,7 @@ def lamination_home(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_gsm(request):
     if request.method == 'POST':
         try:
@@ -40,7 +50,7 @@ def calculate_gsm(request):
             thickness = float(data.get('thickness', 0))
             thickness_unit = data.get('thickness_unit', 'micron')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = LaminationCalculator()
 
             # Convert thickness to microns
@@ -75,12 +85,14 @@ def calculate_gsm(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_multilayer_gsm(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            layers_data = data.get('layers', [])
             adhesive_gsm = float(data.get('adhesive_gsm', 0))
+            structure = get_complete_structure(data['structure_id']) if data.get('structure_id') else None
+            layers_data = structure.layer_properties if structure else data.get('layers', [])
 
             if len(layers_data) < 2:
                 return JsonResponse(
@@ -92,23 +104,30 @@ def calculate_multilayer_gsm(request):
             layer_details = []
             total_film_gsm = 0
 
-            for layer_data in layers_data:
-                material_id = layer_data.get('material_id')
-                thickness = float(layer_data.get('thickness', 0))
-                thickness_unit = layer_data.get('thickness_unit', 'micron')
-
-                material = PlasticMaterial.objects.get(id=material_id)
-                thickness_microns = calculator.convert_to_microns(thickness, thickness_unit)
-                layer_gsm = calculator.calculate_gsm_from_dimensions(thickness_microns, material.density)
+            if structure:
+                # Saved structure: per-layer GSM is stored with it
+                for layer in structure.layer_properties:
+                    layer_details.append({
+                        'material': layer['material'],
+                        'thickness_microns': round(layer['thickness_microns'], 2),
+                        'density': layer['density'],
+                        'gsm': round(layer['gsm'], 2)
+                    })
+                total_film_gsm = structure.total_gsm
+            else:
+                for layer in load_layer_stack(layers_data):
+                    material = layer.material
+                    thickness_microns = calculator.convert_to_microns(layer.thickness, layer.thickness_unit)
+                    layer_gsm = calculator.calculate_gsm_from_dimensions(thickness_microns, material.density)
 
-                layer_details.append({
-                    'material': material.name,
-                    'thickness_microns': round(thickness_microns, 2),
-                    'density': material.density,
-                    'gsm': round(layer_gsm, 2)
-                })
+                    layer_details.append({
+                        'material': material.name,
+                        'thickness_microns': round(thickness_microns, 2),
+                        'density': material.density,
+                        'gsm': round(layer_gsm, 2)
+                    })
 
-                total_film_gsm += layer_gsm
+                    total_film_gsm += layer_gsm
 
             # Calculate adhesive GSM (n-1 for n layers)
             number_of_adhesive_layers = len(layers_data) - 1
@@ -146,6 +165,7 @@ def calculate_multilayer_gsm(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_weight_breakdown(request):
     if request.method == 'POST':
         try:
@@ -153,7 +173,8 @@ def calculate_weight_breakdown(request):
             total_mass = float(data.get('total_mass', 0))
             total_mass_unit = data.get('total_mass_unit', 'kg')
             adhesive_gsm_per_layer = float(data.get('adhesive_gsm', 0))  # GSM per bonding layer
-            layers_data = data.get('layers', [])
+            structure = get_complete_structure(data['structure_id']) if data.get('structure_id') else None
+            layers_data = structure.layer_properties if structure else data.get('layers', [])
 
             if len(layers_data) < 2:
                 return JsonResponse({'success': False, 'error': 'At least 2 layers required for lamination'})
@@ -165,26 +186,39 @@ def calculate_weight_breakdown(request):
             layer_details = []
             layer_data_for_calc = []
 
-            for layer_data in layers_data:
-                material_id = layer_data.get('material_id')
-                thickness = float(layer_data.get('thickness', 0))
-                thickness_unit = layer_data.get('thickness_unit', 'micron')
-
-                material = PlasticMaterial.objects.get(id=material_id)
-                thickness_microns = calculator.convert_to_microns(thickness, thickness_unit)
-                layer_gsm = calculator.calculate_gsm_from_dimensions(thickness_microns, material.density)
-
-                layer_details.append({
-                    'material': material.name,
-                    'thickness_microns': round(thickness_microns, 2),
-                    'gsm': round(layer_gsm, 2)
-                })
-
-                layer_data_for_calc.append({
-                    'material_name': material.name,
-                    'thickness_microns': thickness_microns,
-                    'gsm': layer_gsm
-                })
+            if structure:
+                # Saved structure: layer thickness and GSM are stored with it
+                layers = []
+                for layer in structure.layer_properties:
+                    layer_details.append({
+                        'material': layer['material'],
+                        'thickness_microns': round(layer['thickness_microns'], 2),
+                        'gsm': round(layer['gsm'], 2)
+                    })
+
+                    layer_data_for_calc.append({
+                        'material_name': layer['material'],
+                        'thickness_microns': layer['thickness_microns'],
+                        'gsm': layer['gsm']
+                    })
+            else:
+                layers = load_layer_stack(layers_data)
+                for layer in layers:
+                    material = layer.material
+                    thickness_microns = calculator.convert_to_microns(layer.thickness, layer.thickness_unit)
+                    layer_gsm = calculator.calculate_gsm_from_dimensions(thickness_microns, material.density)
+
+                    layer_details.append({
+                        'material': material.name,
+                        'thickness_microns': round(thickness_microns, 2),
+                        'gsm': round(layer_gsm, 2)
+                    })
+
+                    layer_data_for_calc.append({
+                        'material_name': material.name,
+                        'thickness_microns': thickness_microns,
+                        'gsm': layer_gsm
+                    })
 
             # Calculate weight breakdown with individual layer masses and adhesive
             breakdown = calculator.calculate_laminate_weight_breakdown(
@@ -215,15 +249,9 @@ def calculate_weight_breakdown(request):
                     user=request.user
                 )
 
-                # Save layer details
-                for i, layer_data in enumerate(layers_data):
-                    LaminationLayer.objects.create(
-                        calculation=calculation,
-                        material_id=layer_data.get('material_id'),
-                        thickness=layer_data.get('thickness'),
-                        thickness_unit=layer_data.get('thickness_unit'),
-                        layer_order=i
-                    )
+                # Save layer details (a saved structure already keeps its own)
+                if layers:
+                    save_layers(LaminationLayer, calculation, layers)
 
             return JsonResponse({'success': True, 'result': result})
 
@@ -237,6 +265,7 @@ def calculate_weight_breakdown(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_adhesive_components(request):
     if request.method == 'POST':
         try:
@@ -332,6 +361,34 @@ def calculate_adhesive_components(request):
 
 @login_required
 @csrf_exempt
+def calculate_adhesive_schedule(request):
+    """
+    Adhesive plan for a lamination schedule. The payload lists the jobs, each
+    with the fields of the single adhesive-components calculation (or a
+    structure_id for the film GSM) and an optional date, plus an optional
+    total_mass_unit for the whole schedule. Returns components per job, per
+    adhesive system, per day and in total; plans are not saved to the
+    calculation history.
+    """
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            jobs = data.get('jobs') or []
+            if not jobs:
+                return JsonResponse({'success': False, 'error': 'At least one job is required'})
+
+            mass_to_kg = LaminationCalculator.convert_mass(1.0, data.get('total_mass_unit', 'kg'), 'kg')
+            return JsonResponse({'success': True, 'result': plan_adhesive_schedule(jobs, mass_to_kg)})
+
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+@login_required
+@csrf_exempt
+@memoize_result
 def calculate_lamination_time(request):
     if request.method == 'POST':
         try:
@@ -376,6 +433,7 @@ def calculate_lamination_time(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_efficiency(request):
     if request.method == 'POST':
         try:
@@ -428,6 +486,7 @@ def calculate_production_efficiency(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_yield(request):
     if request.method == 'POST':
         try:
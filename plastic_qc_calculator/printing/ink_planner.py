@@ -0,0 +1,138 @@
+"""
+Ink planning for a whole print queue.
+
+Each job gives its film width and length, an optional shift, and its colour
+stations: an InkFormula (id or name) with the station's coverage percent and,
+optionally, its own coverage GSM. Every station of every job is one row of a
+single PrintingCalculator.calculate_ink_requirements() pass; the rows are then
+summed per colour, per shift and colour (the ink-kitchen list), and overall.
+
+Formula names are not unique: a name shared by several formulas, like an
+unknown one, is reported in the plan's errors and its station left out.
+"""
+from calculator.columnar import np, group_totals
+from .models import InkFormula
+from .printing_calculator import PrintingCalculator
+
+MAX_PLAN_STATIONS = 50000
+
+TOTAL_COLUMNS = ['printed_area_m2', 'dry_ink_kg', 'wet_ink_kg', 'ink_volume_L', 'solvent_kg', 'pigment_kg']
+
+
+def parse_number(value, name, job_label):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        raise ValueError(f"Job {job_label}: {name} must be a number")
+
+
+def load_formulas(jobs):
+    """
+    {id or name: InkFormula} for every formula the stations name, in one query.
+    Names are not unique; a name shared by several formulas maps to None.
+    """
+    keys = {str(station.get('formula', '')).strip() for job in jobs for station in job.get('stations') or []}
+    keys.discard('')
+    ids = {int(key) for key in keys if key.isdigit()}
+    formulas = {}
+    by_name = {}
+    for formula in InkFormula.objects.filter(pk__in=ids) | InkFormula.objects.filter(name__in=keys):
+        formulas[str(formula.pk)] = formula
+        by_name.setdefault(formula.name, []).append(formula)
+    for name, matches in by_name.items():
+        formulas.setdefault(name, matches[0] if len(matches) == 1 else None)
+    return formulas
+
+
+def station_columns(jobs, width_to_m=1.0, length_to_m=1.0):
+    """
+    One row per job colour station: (formulas, shifts, columns for
+    calculate_ink_requirements, station errors). Stations whose formula cannot
+    be resolved are left out and reported; a bad job raises ValueError.
+    """
+    formulas = load_formulas(jobs)
+    rows = []
+    errors = []
+    for number, job in enumerate(jobs, start=1):
+        label = job.get('job') or number
+        width_m = parse_number(job.get('film_width'), 'film_width', label) * width_to_m
+        length_m = parse_number(job.get('film_length'), 'film_length', label) * length_to_m
+        if width_m <= 0 or length_m <= 0:
+            raise ValueError(f"Job {label}: film width and length must be greater than 0")
+        shift = str(job.get('shift') or '')
+        for station_number, station in enumerate(job.get('stations') or [], start=1):
+            key = str(station.get('formula', '')).strip()
+            formula = formulas.get(key)
+            if formula is None:
+                problem = 'matches several ink formulas, use its id' if key in formulas else 'not found'
+                errors.append({'job': label, 'station': station_number, 'error': f"Ink formula {problem}: {key}"})
+                continue
+            coverage_gsm = station.get('coverage_gsm')
+            rows.append((
+                formula, shift, width_m, length_m,
+                parse_number(station.get('coverage_percent'), 'coverage_percent', label),
+                formula.coverage_gsm if coverage_gsm in (None, '') else parse_number(coverage_gsm, 'coverage_gsm', label),
+            ))
+            if len(rows) > MAX_PLAN_STATIONS:
+                raise ValueError(f"At most {MAX_PLAN_STATIONS} colour stations per plan")
+
+    if not rows:
+        if errors:
+            raise ValueError(f"Job {errors[0]['job']}: {errors[0]['error']}")
+        raise ValueError('At least one job with a colour station is required')
+    station_formulas, shifts, widths, lengths, coverages, coverage_gsms = (list(column) for column in zip(*rows))
+    columns = {
+        'film_widths_m': widths,
+        'film_lengths_m': lengths,
+        'coverage_percents': coverages,
+        'ink_coverage_gsms': coverage_gsms,
+        'ink_densities_g_cm3': [formula.density_g_cm3 for formula in station_formulas],
+        'pigment_percents': [formula.pigment_percentage for formula in station_formulas],
+        'solids_percents': [formula.total_solids_percentage() for formula in station_formulas],
+        'solvent_percents': [formula.solvent_percentage for formula in station_formulas],
+    }
+    return station_formulas, shifts, columns, errors
+
+
+def rounded_totals(totals, index):
+    return {name: round(totals[name][index], 3) for name in TOTAL_COLUMNS}
+
+
+def colour_line(formula, totals, index):
+    return {
+        'formula_id': formula.pk,
+        'name': formula.name,
+        'ink_type': formula.ink_type,
+        **rounded_totals(totals, index),
+    }
+
+
+def plan_ink_queue(jobs, width_to_m=1.0, length_to_m=1.0):
+    """Ink, solvent and pigment needed by a print queue, per colour, per shift and in total"""
+    station_formulas, shifts, columns, errors = station_columns(jobs, width_to_m, length_to_m)
+    stations = PrintingCalculator.calculate_ink_requirements(**columns)
+
+    colours, colour_totals = group_totals([formula.pk for formula in station_formulas], stations)
+    by_pk = {formula.pk: formula for formula in station_formulas}
+    shift_colours, shift_totals = group_totals(
+        [(shift, formula.pk) for shift, formula in zip(shifts, station_formulas)], stations
+    )
+
+    shift_plans = {}
+    for index, (shift, formula_pk) in enumerate(shift_colours):
+        plan = shift_plans.setdefault(shift, {'shift': shift, 'colours': [], 'totals': dict.fromkeys(TOTAL_COLUMNS, 0.0)})
+        plan['colours'].append(colour_line(by_pk[formula_pk], shift_totals, index))
+        for name in TOTAL_COLUMNS:
+            plan['totals'][name] += shift_totals[name][index]
+    for plan in shift_plans.values():
+        plan['totals'] = {name: round(value, 3) for name, value in plan['totals'].items()}
+
+    return {
+        'jobs': len(jobs),
+        'stations': len(station_formulas),
+        'backend': 'numpy' if np is not None else 'python',
+        'colours': [colour_line(by_pk[formula_pk], colour_totals, index) for index, formula_pk in enumerate(colours)],
+        'shifts': list(shift_plans.values()),
+        'totals': {name: round(sum(stations[name]), 3) for name in TOTAL_COLUMNS},
+        'errors': errors,
+    }
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('printing', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='printingcalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='printing_pr_calcula_bf9eb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printingcalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='printing_pr_user_id_e6b188_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='printingcalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='printing_input_material_idx'),
+        ),
+    ]
@@ -1,5 +1,30 @@
 import math
 
+from calculator.columnar import run_formula
+
+
+# --- COLUMN FORMULAS (ops, *columns) for the array API below ---
+
+def _printed_area(ops, film_width_m, film_length_m, coverage_percent):
+    return film_width_m * film_length_m * (coverage_percent / 100)
+
+
+def _ink_mass_needed(ops, printed_area_m2, ink_coverage_gsm):
+    return printed_area_m2 * ink_coverage_gsm / 1000
+
+
+def _wet_ink_mass(ops, dry_ink_kg, solids_percentage):
+    # Inks without a solids figure are taken as applied (no solvent to flash off)
+    return ops.where(solids_percentage > 0, ops.div(dry_ink_kg * 100, solids_percentage), dry_ink_kg)
+
+
+def _component_mass(ops, total_mass_kg, percentage):
+    return total_mass_kg * (percentage / 100)
+
+
+def _ink_volume(ops, ink_mass_kg, ink_density_g_cm3):
+    return ops.div(ink_mass_kg * 1000, ink_density_g_cm3 * 1000)
+
 
 class PrintingCalculator:
     """
@@ -83,6 +108,36 @@ class PrintingCalculator:
 
         return ink_volume_L
 
+    # --- ARRAY API: MANY PRINT STATIONS AT ONCE ---
+    # Each argument is a column (one value per job colour station) or a single number
+    # for all of them; results are lists of floats.
+
+    @staticmethod
+    def calculate_ink_masses_needed(film_widths_m, film_lengths_m, coverage_percents, ink_coverage_gsms):
+        printed_area_m2 = run_formula(_printed_area, film_widths_m, film_lengths_m, coverage_percents)
+        return run_formula(_ink_mass_needed, printed_area_m2, ink_coverage_gsms)
+
+    @staticmethod
+    def calculate_ink_requirements(film_widths_m, film_lengths_m, coverage_percents, ink_coverage_gsms,
+                                   ink_densities_g_cm3, pigment_percents, solids_percents, solvent_percents):
+        """
+        Ink needed per station, as columns. The coverage GSM is the dry ink
+        laid down at 100% coverage; the wet (as-mixed) ink is the dry ink over
+        the formula's solids, and the solvent, pigment and volume follow from
+        the wet ink as in calculate_ink_mixing_batch and calculate_ink_volume.
+        """
+        printed_area_m2 = run_formula(_printed_area, film_widths_m, film_lengths_m, coverage_percents)
+        dry_ink_kg = run_formula(_ink_mass_needed, printed_area_m2, ink_coverage_gsms)
+        wet_ink_kg = run_formula(_wet_ink_mass, dry_ink_kg, solids_percents)
+        return {
+            'printed_area_m2': printed_area_m2,
+            'dry_ink_kg': dry_ink_kg,
+            'wet_ink_kg': wet_ink_kg,
+            'ink_volume_L': run_formula(_ink_volume, wet_ink_kg, ink_densities_g_cm3),
+            'solvent_kg': run_formula(_component_mass, wet_ink_kg, solvent_percents),
+            'pigment_kg': run_formula(_component_mass, wet_ink_kg, pigment_percents),
+        }
+
     # --- 3. PRINTING MACHINE SPEED CALCULATION ---
 
     @staticmethod
@@ -1,3 +1,79 @@
+import json
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from .ink_planner import plan_ink_queue
+from .models import InkFormula
+from .printing_calculator import PrintingCalculator
+
+
+class InkPlanTests(TestCase):
+    def setUp(self):
+        self.cyan = InkFormula.objects.create(
+            name='Cyan', ink_type='PRIMARY', pigment_percentage=15, binder_percentage=20,
+            additives_percentage=5, solvent_percentage=60, density_g_cm3=1.1, coverage_gsm=1.5,
+        )
+        self.white = InkFormula.objects.create(
+            name='White', ink_type='SPOT', pigment_percentage=30, binder_percentage=20,
+            solvent_percentage=50, density_g_cm3=1.4, coverage_gsm=3.0,
+        )
+
+    def job(self, label, shift, *stations):
+        return {'job': label, 'film_width': 1.2, 'film_length': 5000, 'shift': shift, 'stations': list(stations)}
+
+    def test_totals_match_single_station_calculation(self):
+        result = plan_ink_queue([
+            self.job('A', 'day', {'formula': 'Cyan', 'coverage_percent': 40},
+                     {'formula': self.white.pk, 'coverage_percent': 100}),
+            self.job('B', 'night', {'formula': str(self.cyan.pk), 'coverage_percent': 40, 'coverage_gsm': 2}),
+        ])
+
+        cyan_dry = (PrintingCalculator.calculate_ink_mass_needed(1.2, 5000, 40, 1.5)
+                    + PrintingCalculator.calculate_ink_mass_needed(1.2, 5000, 40, 2))
+        white_dry = PrintingCalculator.calculate_ink_mass_needed(1.2, 5000, 100, 3.0)
+        colours = {line['name']: line for line in result['colours']}
+        self.assertEqual(result['stations'], 3)
+        self.assertEqual(result['errors'], [])
+        self.assertAlmostEqual(colours['Cyan']['dry_ink_kg'], round(cyan_dry, 3))
+        self.assertAlmostEqual(colours['Cyan']['wet_ink_kg'], round(cyan_dry * 100 / 40, 3))
+        self.assertAlmostEqual(colours['White']['wet_ink_kg'], round(white_dry * 100 / 50, 3))
+        self.assertAlmostEqual(result['totals']['dry_ink_kg'], round(cyan_dry + white_dry, 3))
+        self.assertEqual([plan['shift'] for plan in result['shifts']], ['day', 'night'])
+        self.assertEqual(len(result['shifts'][0]['colours']), 2)
+
+    def test_ambiguous_formula_name_is_a_station_error(self):
+        duplicate = InkFormula.objects.create(name='Cyan', ink_type='PRIMARY', coverage_gsm=1.0)
+        result = plan_ink_queue([
+            self.job('A', 'day', {'formula': 'Cyan', 'coverage_percent': 40},
+                     {'formula': 'White', 'coverage_percent': 100}),
+            self.job('B', 'day', {'formula': duplicate.pk, 'coverage_percent': 40}),
+        ])
+
+        self.assertEqual(result['stations'], 2)
+        self.assertEqual({line['formula_id'] for line in result['colours']}, {self.white.pk, duplicate.pk})
+        self.assertEqual(result['errors'], [
+            {'job': 'A', 'station': 1, 'error': 'Ink formula matches several ink formulas, use its id: Cyan'},
+        ])
+
+    def test_missing_formula_is_a_station_error(self):
+        result = plan_ink_queue([
+            self.job('A', 'day', {'formula': 'Magenta', 'coverage_percent': 40},
+                     {'formula': 'White', 'coverage_percent': 100}),
+        ])
+
+        self.assertEqual(result['stations'], 1)
+        self.assertEqual(result['errors'], [{'job': 'A', 'station': 1, 'error': 'Ink formula not found: Magenta'}])
+
+    def test_view_reports_plan_without_resolvable_stations(self):
+        user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        self.client.force_login(user)
+        InkFormula.objects.create(name='White', ink_type='SPOT')
+        body = {'jobs': [self.job('A', 'day', {'formula': 'White', 'coverage_percent': 100})]}
+
+        response = self.client.post('/printing/ink-plan/', json.dumps(body), content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'success': False, 'error': 'Job A: Ink formula matches several ink formulas, use its id: White',
+        })
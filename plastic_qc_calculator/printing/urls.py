@@ -14,6 +14,7 @@ urlpatterns = [
     path('calculate-ink-mixing/', views.calculate_ink_mixing, name='calculate_ink_mixing'),
     path('calculate-production-time-order/', views.calculate_production_time_order,
          name='calculate_production_time_order'),
+    path('ink-plan/', views.calculate_ink_plan, name='calculate_ink_plan'),
 
     # History
     path('history/', views.printing_history, name='printing_history'),
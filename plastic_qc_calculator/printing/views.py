@@ -3,12 +3,18 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
 from .models import PrintingCalculation, InkFormula
 from .printing_calculator import PrintingCalculator
+from .ink_planner import plan_ink_queue
 import json
 
 
 @login_required
+@conditional_page('printing/home.html', *SECTION_TEMPLATES, materials=True)
 def printing_home(request):
     calculators = [
         {'id': 'film_mass_length', 'name': 'Film Mass & Length', 'icon': 'fas fa-weight-hanging'},
@@ -23,6 +29,7 @@ def printing_home(request):
     ink_formulas = InkFormula.objects.all()
 
     return render(request, 'printing/home.html', {
+        **section_page_context(),
         'section_name': 'Printing',
         'calculators': calculators,
         'materials': materials,
@@ -32,6 +39,7 @@ def printing_home(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_film_mass_length(request):
     if request.method == 'POST':
         try:
@@ -39,7 +47,7 @@ def calculate_film_mass_length(request):
             calculation_type = data.get('calculation_type', 'mass')  # 'mass' or 'length'
             material_id = data.get('material_id')
 
-            material = PlasticMaterial.objects.get(id=material_id)
+            material = material_registry.get(material_id)
             calculator = PrintingCalculator()
 
             if calculation_type == 'mass':
@@ -107,6 +115,7 @@ def calculate_film_mass_length(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_ink_mass_needed(request):
     if request.method == 'POST':
         try:
@@ -160,6 +169,7 @@ def calculate_ink_mass_needed(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_machine_speed_time(request):
     if request.method == 'POST':
         try:
@@ -223,6 +233,7 @@ def calculate_machine_speed_time(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_gsm(request):
     if request.method == 'POST':
         try:
@@ -298,6 +309,7 @@ def calculate_gsm(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_ink_mixing(request):
     if request.method == 'POST':
         try:
@@ -385,6 +397,7 @@ def calculate_ink_mixing(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_time_order(request):
     if request.method == 'POST':
         try:
@@ -439,6 +452,37 @@ def calculate_production_time_order(request):
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
 
+@login_required
+@csrf_exempt
+def calculate_ink_plan(request):
+    """
+    Ink plan for a print queue. The payload lists the jobs, each with its film
+    width and length, shift and colour stations (ink formula id or name and
+    coverage percent), plus optional film_width_unit/film_length_unit for the
+    whole queue. Returns wet/dry ink, solvent and pigment per colour, per shift
+    and in total, plus the stations left out because their formula was missing
+    or ambiguous; plans are not saved to the calculation history.
+    """
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            jobs = data.get('jobs') or []
+            if not jobs:
+                return JsonResponse({'success': False, 'error': 'At least one job is required'})
+
+            result = plan_ink_queue(
+                jobs,
+                width_to_m=convert_length(1.0, data.get('film_width_unit', 'm'), 'm'),
+                length_to_m=convert_length(1.0, data.get('film_length_unit', 'm'), 'm'),
+            )
+            return JsonResponse({'success': True, 'result': result})
+
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
 # Utility conversion functions
 def convert_length(value, from_unit, to_unit):
     conversions = {
@@ -74,6 +74,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.admin_badges',
             ],
         },
     },
@@ -109,6 +110,47 @@ else:
     }
 
 
+# Caches
+# Each subsystem has its own namespace so it can be sized and monitored on its
+# own (see calculator.cache_backends.cache_stats and /cache-stats/):
+#   materials - material registry version stamp
+#   results   - memoized calculator responses
+#   pages     - section home page fragments
+#   counters  - short-lived dashboard and badge counts
+# Development keeps everything in process memory. Production shares the small,
+# consistency-sensitive namespaces through database tables (created by
+# `manage.py createcachetable` in build.sh) and keeps version-keyed results and
+# page fragments on the instance's disk, shared by its gunicorn workers.
+CACHE_DIR = os.getenv('CACHE_DIR', BASE_DIR / '.cache')
+
+CACHE_NAMESPACES = {
+    # alias: (shared production backend, timeout in seconds, max entries)
+    'default': ('db', 300, 1000),
+    'materials': ('db', None, 100),
+    'results': ('file', 15 * 60, 5000),
+    'pages': ('file', 60 * 60, 200),
+    'counters': ('db', 60, 5000),
+}
+
+
+def cache_config(alias, backend, timeout, max_entries):
+    if IS_DEVELOPMENT:
+        backend_class, location = 'calculator.cache_backends.LocMemCache', f'qc-{alias}'
+    elif backend == 'db':
+        backend_class, location = 'calculator.cache_backends.DatabaseCache', f'qc_cache_{alias}'
+    else:
+        backend_class, location = 'calculator.cache_backends.FileBasedCache', os.path.join(CACHE_DIR, alias)
+    return {
+        'BACKEND': backend_class,
+        'LOCATION': location,
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': alias,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+CACHES = {alias: cache_config(alias, *config) for alias, config in CACHE_NAMESPACES.items()}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
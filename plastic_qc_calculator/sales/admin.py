@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import LaminatedStructure
 
-# Register your models here.
+
+@admin.register(LaminatedStructure)
+class LaminatedStructureAdmin(admin.ModelAdmin):
+    list_display = ['name', 'total_thickness_microns', 'total_gsm', 'effective_density', 'created_at']
+    search_fields = ['name']
+    readonly_fields = LaminatedStructure.PROPERTY_FIELDS
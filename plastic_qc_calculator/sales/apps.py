@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete, pre_delete
+        from calculator.models import PlasticMaterial
+        from calculator.result_cache import register_key_version
+        from .models import LaminatedStructure
+        from .structures import (
+            refresh_structures_after_material_delete, refresh_structures_for_material,
+            remember_structures_for_material, structure_changed, structures_version,
+        )
+
+        post_save.connect(refresh_structures_for_material, sender=PlasticMaterial,
+                          dispatch_uid='sales_refresh_structures')
+        pre_delete.connect(remember_structures_for_material, sender=PlasticMaterial,
+                           dispatch_uid='sales_remember_structures')
+        post_delete.connect(refresh_structures_after_material_delete, sender=PlasticMaterial,
+                            dispatch_uid='sales_refresh_structures_delete')
+        post_save.connect(structure_changed, sender=LaminatedStructure, dispatch_uid='sales_structure_save')
+        post_delete.connect(structure_changed, sender=LaminatedStructure, dispatch_uid='sales_structure_delete')
+        register_key_version(structures_version)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('sales', '0003_laminatedstructure_delete_laminatedfilm_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salescalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='sales_sales_calcula_1ea34a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salescalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='sales_sales_user_id_16c563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salescalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='sales_input_material_idx'),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:49
+
+from django.db import migrations, models
+
+PROPERTY_FIELDS = ['total_thickness_microns', 'total_gsm', 'effective_density', 'layer_properties']
+
+
+# Frozen copy of sales.structures as of this migration, so later changes there cannot alter it
+
+def to_material_id(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def layer_material_ids(layers):
+    return {to_material_id(layer.get('material_id')) for layer in layers} - {None}
+
+
+def structure_properties(layers, materials):
+    layer_properties = []
+    for order, layer in enumerate(layers):
+        material = materials.get(to_material_id(layer.get('material_id')))
+        thickness = float(layer.get('thickness_microns', layer.get('thickness', 0)) or 0)
+        if material is not None:
+            density = material.density
+            name = material.name
+        else:
+            density = float(layer.get('density', layer.get('density_g_cm3', 0)) or 0)
+            name = layer.get('material') or layer.get('name') or f'Layer {order + 1}'
+        if thickness <= 0 or density <= 0:
+            return None
+        layer_properties.append({
+            'material_id': material.id if material is not None else None,
+            'material': name,
+            'thickness_microns': thickness,
+            'density': density,
+            'gsm': thickness * density,
+        })
+
+    total_thickness = sum(layer['thickness_microns'] for layer in layer_properties)
+    total_gsm = sum(layer['gsm'] for layer in layer_properties)
+    for layer in layer_properties:
+        layer['thickness_fraction'] = layer['thickness_microns'] / total_thickness if total_thickness else 0.0
+        layer['mass_fraction'] = layer['gsm'] / total_gsm if total_gsm else 0.0
+
+    return {
+        'total_thickness_microns': total_thickness,
+        'total_gsm': total_gsm,
+        'effective_density': total_gsm / total_thickness if total_thickness else 0.0,
+        'layer_properties': layer_properties,
+    }
+
+
+def compute_structure_properties(apps, schema_editor):
+    LaminatedStructure = apps.get_model('sales', 'LaminatedStructure')
+    PlasticMaterial = apps.get_model('calculator', 'PlasticMaterial')
+
+    structures = list(LaminatedStructure.objects.all())
+    material_ids = set()
+    for structure in structures:
+        material_ids.update(layer_material_ids(structure.layers))
+    materials = PlasticMaterial.objects.in_bulk(material_ids)
+
+    updated = []
+    for structure in structures:
+        properties = structure_properties(structure.layers, materials)
+        if properties is None:
+            continue  # leave structures with incomplete layers at zero
+        for field in PROPERTY_FIELDS:
+            setattr(structure, field, properties[field])
+        updated.append(structure)
+    LaminatedStructure.objects.bulk_update(updated, PROPERTY_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('sales', '0004_history_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laminatedstructure',
+            name='effective_density',
+            field=models.FloatField(default=0, help_text='Density in g/cm³'),
+        ),
+        migrations.AddField(
+            model_name='laminatedstructure',
+            name='layer_properties',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='laminatedstructure',
+            name='total_gsm',
+            field=models.FloatField(default=0, help_text='GSM in g/m²'),
+        ),
+        migrations.AddField(
+            model_name='laminatedstructure',
+            name='total_thickness_microns',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(compute_structure_properties, migrations.RunPython.noop),
+    ]
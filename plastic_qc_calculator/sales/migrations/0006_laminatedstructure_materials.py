@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:11
+
+from django.db import migrations, models
+
+
+def to_material_id(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def link_structure_materials(apps, schema_editor):
+    LaminatedStructure = apps.get_model('sales', 'LaminatedStructure')
+    PlasticMaterial = apps.get_model('calculator', 'PlasticMaterial')
+
+    existing = set(PlasticMaterial.objects.values_list('pk', flat=True))
+    for structure in LaminatedStructure.objects.all():
+        material_ids = {to_material_id(layer.get('material_id')) for layer in structure.layers} & existing
+        structure.materials.set(material_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('sales', '0005_laminatedstructure_properties'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laminatedstructure',
+            name='materials',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='laminated_structures', to='calculator.plasticmaterial'),
+        ),
+        migrations.RunPython(link_structure_materials, migrations.RunPython.noop),
+    ]
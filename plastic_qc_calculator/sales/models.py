@@ -1,5 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.fields.json import KT
 from calculator.models import PlasticMaterial
+from .structures import empty_properties, layer_material_ids, load_layer_materials, structure_properties
 from qc_project import settings
 
 
@@ -27,15 +30,62 @@ class SalesCalculation(models.Model):
         blank=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['calculation_type', 'timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+            models.Index(KT('input_data__material_id'), name='sales_input_material_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_calculation_type_display()} - {self.timestamp}"
 
 
 class LaminatedStructure(models.Model):
+    PROPERTY_FIELDS = ['total_thickness_microns', 'total_gsm', 'effective_density', 'layer_properties']
+
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     layers = models.JSONField()  # Store layer materials and percentages
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Derived from layers on save (see sales.structures)
+    total_thickness_microns = models.FloatField(default=0)
+    total_gsm = models.FloatField(default=0, help_text="GSM in g/m²")
+    effective_density = models.FloatField(default=0, help_text="Density in g/cm³")
+    layer_properties = models.JSONField(default=list, blank=True)
+    # Materials the layers name, kept in step on save so material changes find their structures
+    materials = models.ManyToManyField(PlasticMaterial, blank=True, editable=False,
+                                       related_name='laminated_structures')
+
     def __str__(self):
         return self.name
+
+    def clean(self):
+        super().clean()
+        if not isinstance(self.layers, list) or not self.layers:
+            raise ValidationError({'layers': 'At least one layer is required'})
+        try:
+            structure_properties(self.layers, load_layer_materials(self.layers))
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ValidationError({'layers': str(e)})
+
+    def refresh_properties(self, materials=None):
+        """Recompute the derived columns from layers; zeros while the layers are incomplete"""
+        if materials is None:
+            materials = load_layer_materials(self.layers)
+        try:
+            properties = structure_properties(self.layers, materials)
+        except ValueError:
+            properties = empty_properties()
+        for field in self.PROPERTY_FIELDS:
+            setattr(self, field, properties[field])
+
+    def save(self, *args, **kwargs):
+        self.refresh_properties()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'layers' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.PROPERTY_FIELDS)
+        super().save(*args, **kwargs)
+        if update_fields is None or 'layers' in update_fields:
+            self.materials.set(PlasticMaterial.objects.filter(pk__in=layer_material_ids(self.layers)))
@@ -0,0 +1,171 @@
+"""
+Derived properties of laminated structures.
+
+A structure's layers are a JSON list; each layer gives a thickness
+('thickness_microns', or 'thickness' in microns) and either a 'material_id' or
+its own 'density' / 'density_g_cm3'. structure_properties() turns that into the
+totals that LaminatedStructure stores on save, so sections read them instead of
+recomputing the stack. Layers that lack a positive thickness or density make
+structure_properties() raise ValueError; LaminatedStructure.clean() reports
+that, and save() stores zeros instead. Calculations load structures through
+get_complete_structure(), which refuses such a structure.
+
+Each structure also links the materials its layers name, so a material save or
+delete refreshes only the structures that use it.
+"""
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import Signal
+
+from calculator.display_material import to_material_id
+from calculator.material_registry import registry as material_registry
+from calculator.models import PlasticMaterial
+
+VERSION_KEY = 'laminated_structures:version'
+
+INCOMPLETE_STRUCTURE_ERROR = 'Structure has incomplete layers'
+
+# Sent with `structure_ids` after a material change rewrites structures in bulk (no post_save)
+structures_refreshed = Signal()
+
+
+def layer_material_ids(layers):
+    return {to_material_id(layer.get('material_id')) for layer in layers} - {None}
+
+
+def load_layer_materials(layers):
+    """{id: material} for the materials a layer list names"""
+    material_ids = layer_material_ids(layers)
+    materials = material_registry.in_bulk(material_ids)
+    # The registry reloads after commit; fetch materials created in this transaction
+    missing = material_ids - materials.keys()
+    if missing:
+        materials.update(PlasticMaterial.objects.in_bulk(missing))
+    return materials
+
+
+def empty_properties():
+    """Derived columns for a structure whose layers are incomplete"""
+    return {'total_thickness_microns': 0.0, 'total_gsm': 0.0, 'effective_density': 0.0, 'layer_properties': []}
+
+
+def structure_properties(layers, materials):
+    """
+    Totals and per-layer fractions for a layer list. `materials` maps material
+    id -> object with name and density; a referenced material overrides the
+    density stored on the layer.
+    """
+    layer_properties = []
+    for order, layer in enumerate(layers):
+        material = materials.get(to_material_id(layer.get('material_id')))
+        thickness = float(layer.get('thickness_microns', layer.get('thickness', 0)) or 0)
+        if material is not None:
+            density = material.density
+            name = material.name
+        else:
+            density = float(layer.get('density', layer.get('density_g_cm3', 0)) or 0)
+            name = layer.get('material') or layer.get('name') or f'Layer {order + 1}'
+        if thickness <= 0 or density <= 0:
+            raise ValueError(f"Layer {order + 1} needs a positive thickness and density")
+        layer_properties.append({
+            'material_id': material.id if material is not None else None,
+            'material': name,
+            'thickness_microns': thickness,
+            'density': density,
+            'gsm': thickness * density,
+        })
+
+    total_thickness = sum(layer['thickness_microns'] for layer in layer_properties)
+    total_gsm = sum(layer['gsm'] for layer in layer_properties)
+    for layer in layer_properties:
+        layer['thickness_fraction'] = layer['thickness_microns'] / total_thickness if total_thickness else 0.0
+        layer['mass_fraction'] = layer['gsm'] / total_gsm if total_gsm else 0.0
+
+    return {
+        'total_thickness_microns': total_thickness,
+        'total_gsm': total_gsm,
+        'effective_density': total_gsm / total_thickness if total_thickness else 0.0,
+        'layer_properties': layer_properties,
+    }
+
+
+def get_structure(structure_id):
+    """Saved structure by id; raises LaminatedStructure.DoesNotExist like objects.get()"""
+    from .models import LaminatedStructure
+
+    try:
+        structure_id = int(structure_id)
+    except (TypeError, ValueError):
+        raise LaminatedStructure.DoesNotExist('LaminatedStructure matching query does not exist.')
+    return LaminatedStructure.objects.get(pk=structure_id)
+
+
+def structure_is_complete(structure):
+    """False for a structure saved with zeros because its layers are incomplete"""
+    return (structure.total_thickness_microns > 0 and structure.effective_density > 0
+            and bool(structure.layer_properties))
+
+
+def get_complete_structure(structure_id):
+    """get_structure() for calculations; raises ValueError if the structure's layers are incomplete"""
+    structure = get_structure(structure_id)
+    if not structure_is_complete(structure):
+        raise ValueError(INCOMPLETE_STRUCTURE_ERROR)
+    return structure
+
+
+def refresh_structures(structures, saved=None, deleted_id=None):
+    """
+    Recompute and store the derived columns of structures after a material
+    change. `saved` is the material just saved (newer than the registry's copy);
+    `deleted_id` a material just deleted.
+    """
+    from .models import LaminatedStructure
+
+    structures = list(structures)
+    for structure in structures:
+        materials = load_layer_materials(structure.layers)
+        if saved is not None:
+            materials[saved.pk] = saved
+        materials.pop(deleted_id, None)
+        structure.refresh_properties(materials)
+    LaminatedStructure.objects.bulk_update(structures, LaminatedStructure.PROPERTY_FIELDS)
+    if structures:
+        structures_refreshed.send(sender=LaminatedStructure, structure_ids=[structure.pk for structure in structures])
+
+
+def refresh_structures_for_material(sender, instance, raw=False, **kwargs):
+    """post_save on PlasticMaterial: recompute the structures whose layers use it"""
+    if not raw:
+        refresh_structures(instance.laminated_structures.all(), saved=instance)
+
+
+def remember_structures_for_material(sender, instance, **kwargs):
+    """pre_delete on PlasticMaterial: note its structures before the links are deleted with it"""
+    instance._laminated_structure_ids = list(instance.laminated_structures.values_list('pk', flat=True))
+
+
+def refresh_structures_after_material_delete(sender, instance, **kwargs):
+    """post_delete on PlasticMaterial: recompute its structures without it"""
+    from .models import LaminatedStructure
+
+    structure_ids = getattr(instance, '_laminated_structure_ids', None)
+    if structure_ids:
+        refresh_structures(LaminatedStructure.objects.filter(pk__in=structure_ids), deleted_id=instance.pk)
+
+
+def structures_version(data=None):
+    """
+    Version stamp of the saved structures, for memoized results of requests
+    that name a structure_id; '' for requests that do not.
+    """
+    if data is not None and not (isinstance(data, dict) and data.get('structure_id')):
+        return ''
+    return caches['materials'].get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def structure_changed(sender, **kwargs):
+    """post_save/post_delete on LaminatedStructure: move the shared version once committed"""
+    transaction.on_commit(lambda: caches['materials'].set(VERSION_KEY, uuid.uuid4().hex, None))
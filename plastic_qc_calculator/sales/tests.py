@@ -1,3 +1,95 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-# Create your tests here.
+from calculator.material_registry import registry as material_registry
+from calculator.models import PlasticMaterial
+from .models import LaminatedStructure
+from .structures import INCOMPLETE_STRUCTURE_ERROR
+
+
+class LaminatedStructureTests(TestCase):
+    def setUp(self):
+        self.pet = PlasticMaterial.objects.create(name='PET', code='PET', material_type='FILM', density=1.4)
+        self.pe = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        self.other = PlasticMaterial.objects.create(name='BOPP', code='BOPP', material_type='FILM', density=0.91)
+        material_registry.invalidate()
+
+    def create(self, layers, name='PET/PE'):
+        return LaminatedStructure.objects.create(name=name, layers=layers)
+
+    def test_derived_properties(self):
+        structure = self.create([{'material_id': self.pet.pk, 'thickness_microns': 12},
+                                 {'material_id': self.pe.pk, 'thickness_microns': 50}])
+        self.assertAlmostEqual(structure.total_thickness_microns, 62)
+        self.assertAlmostEqual(structure.total_gsm, 12 * 1.4 + 50 * 0.92)
+        self.assertAlmostEqual(structure.effective_density, (12 * 1.4 + 50 * 0.92) / 62)
+        self.assertAlmostEqual(sum(layer['mass_fraction'] for layer in structure.layer_properties), 1)
+        self.assertEqual(set(structure.materials.all()), {self.pet, self.pe})
+
+    def test_layer_without_material_uses_its_density(self):
+        structure = self.create([{'material': 'Foil', 'density': 2.7, 'thickness': 9}])
+        self.assertAlmostEqual(structure.total_gsm, 24.3)
+        self.assertFalse(structure.materials.exists())
+
+    def test_incomplete_layers_save_as_zero(self):
+        structure = self.create([{'material_id': self.pet.pk, 'thickness_microns': 0}])
+        self.assertEqual((structure.total_gsm, structure.effective_density, structure.layer_properties), (0, 0, []))
+
+    def test_clean_rejects_incomplete_layers(self):
+        with self.assertRaises(ValidationError):
+            LaminatedStructure(name='Bad', layers=[{'material_id': 999999, 'thickness_microns': 20}]).full_clean()
+        with self.assertRaises(ValidationError):
+            LaminatedStructure(name='Empty', layers=[]).full_clean()
+        LaminatedStructure(name='Good', layers=[{'material_id': self.pe.pk, 'thickness_microns': 20}]).full_clean()
+
+    def test_material_save_refreshes_its_structures(self):
+        structure = self.create([{'material_id': self.pe.pk, 'thickness_microns': 50}])
+        incomplete = self.create([{'material_id': self.pe.pk, 'thickness_microns': 0}], name='Incomplete')
+        self.create([{'material_id': self.other.pk, 'thickness_microns': 20}], name='BOPP')
+        self.assertEqual(set(self.pe.laminated_structures.all()), {structure, incomplete})
+
+        # An incomplete structure using the material must not block the save
+        self.pe.density = 0.95
+        self.pe.save()
+        structure.refresh_from_db()
+        self.assertAlmostEqual(structure.total_gsm, 47.5)
+
+    def test_material_delete_refreshes_its_structures(self):
+        structure = self.create([{'material_id': self.pe.pk, 'thickness_microns': 50},
+                                 {'material': 'Foil', 'density': 2.7, 'thickness': 9}])
+        self.pe.delete()
+        structure.refresh_from_db()
+        self.assertEqual(structure.total_gsm, 0)
+
+        structure = self.create([{'material_id': self.pet.pk, 'density': 1.3, 'thickness_microns': 10}], name='PET')
+        self.pet.delete()
+        structure.refresh_from_db()
+        self.assertAlmostEqual(structure.total_gsm, 13)
+
+
+class IncompleteStructureViewTests(TestCase):
+    def setUp(self):
+        self.structure = LaminatedStructure.objects.create(name='Draft', layers=[{'material': 'PET', 'thickness': 12}])
+        self.client.force_login(get_user_model().objects.create_user('tester', password='pw', is_approved=True))
+
+    def test_calculations_refuse_incomplete_structures(self):
+        structure_id = self.structure.pk
+        bag = {'bag_type': 'LAMINATED_FLAT', 'width': 20, 'height': 30, 'structure_id': structure_id}
+        requests = {
+            '/slitting/calculate-roll-mass/': {'outer_diameter': 0.5, 'core_diameter': 0.076, 'width': 1},
+            '/slitting/calculate-roll-diameter/': {'roll_mass': 50, 'core_diameter': 0.076, 'width': 1},
+            '/slitting/calculate-film-length/': {'mass': 50, 'width': 1},
+            '/extrusion/calculate-composite-density/': {},
+            '/lamination/calculate-multilayer-gsm/': {},
+            '/lamination/calculate-weight-breakdown/': {'total_mass': 100},
+            '/bag-making/calculate-pieces-weight/': {**bag, 'pieces': 100},
+            '/bag-making/calculate-packet-weight/': {**bag, 'input_method': 'dimensions', 'pieces_per_packet': 10},
+        }
+        for url, body in requests.items():
+            with self.subTest(url=url):
+                response = self.client.post(url, json.dumps({'structure_id': structure_id, **body}),
+                                            content_type='application/json')
+                self.assertEqual(response.json(), {'success': False, 'error': INCOMPLETE_STRUCTURE_ERROR})
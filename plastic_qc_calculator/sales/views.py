@@ -3,11 +3,16 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
 from .models import SalesCalculation
 from .sales_calculator import SalesCalculator
 import json
 
 
+@conditional_page('sales/home.html', *SECTION_TEMPLATES, materials=True)
 def sales_home(request):
     calculators = [
         {'id': 'material_cost_kg', 'name': 'Material Cost per kg', 'icon': 'fas fa-weight-hanging'},
@@ -23,6 +28,7 @@ def sales_home(request):
     materials = PlasticMaterial.objects.all()
 
     return render(request, 'sales/home.html', {
+        **section_page_context(),
         'section_name': 'Sales & Pricing',
         'calculators': calculators,
         'materials': materials,
@@ -31,6 +37,7 @@ def sales_home(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_material_cost_kg(request):
     if request.method == 'POST':
         try:
@@ -43,7 +50,7 @@ def calculate_material_cost_kg(request):
             calculator = SalesCalculator(currency)
             cost_per_kg = calculator.calculate_material_cost_per_kg(total_material_cost, output_mass_kg)
 
-            material = PlasticMaterial.objects.get(id=material_id) if material_id else None
+            material = material_registry.get(material_id) if material_id else None
 
             result = {
                 'cost_per_kg': round(cost_per_kg, 2),
@@ -70,6 +77,7 @@ def calculate_material_cost_kg(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_material_cost_meter(request):
     if request.method == 'POST':
         try:
@@ -82,7 +90,7 @@ def calculate_material_cost_meter(request):
             calculator = SalesCalculator(currency)
             cost_per_meter = calculator.calculate_material_cost_per_meter(total_material_cost, output_length_m)
 
-            material = PlasticMaterial.objects.get(id=material_id) if material_id else None
+            material = material_registry.get(material_id) if material_id else None
 
             result = {
                 'cost_per_meter': round(cost_per_meter, 2),
@@ -109,6 +117,7 @@ def calculate_material_cost_meter(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_material_cost_piece(request):
     if request.method == 'POST':
         try:
@@ -121,7 +130,7 @@ def calculate_material_cost_piece(request):
             calculator = SalesCalculator(currency)
             cost_per_piece = calculator.calculate_material_cost_per_piece(total_material_cost, output_pieces)
 
-            material = PlasticMaterial.objects.get(id=material_id) if material_id else None
+            material = material_registry.get(material_id) if material_id else None
 
             result = {
                 'cost_per_piece': round(cost_per_piece, 2),
@@ -148,6 +157,7 @@ def calculate_material_cost_piece(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_order_quantity_kg(request):
     if request.method == 'POST':
         try:
@@ -199,6 +209,7 @@ def calculate_order_quantity_kg(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_order_quantity_meter(request):
     if request.method == 'POST':
         try:
@@ -250,6 +261,7 @@ def calculate_order_quantity_meter(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_order_quantity_piece(request):
     if request.method == 'POST':
         try:
@@ -301,6 +313,7 @@ def calculate_order_quantity_piece(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_roll_cost(request):
     if request.method == 'POST':
         try:
@@ -352,6 +365,7 @@ def calculate_roll_cost(request):
 
 
 @csrf_exempt
+@memoize_result
 def calculate_laminated_cost(request):
     if request.method == 'POST':
         try:
@@ -367,7 +381,7 @@ def calculate_laminated_cost(request):
                 material_id = data.get(f'material_{i}_id')
                 if material_id:
                     try:
-                        material = PlasticMaterial.objects.get(id=material_id)
+                        material = material_registry.get(material_id)
                         material_details.append({
                             'id': material.id,
                             'name': material.name,
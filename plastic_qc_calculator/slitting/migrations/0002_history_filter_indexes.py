@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:39
+
+import django.db.models.fields.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calculator', '0008_history_filter_indexes'),
+        ('slitting', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slittingcalculation',
+            index=models.Index(fields=['calculation_type', 'timestamp'], name='slitting_sl_calcula_0f902a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slittingcalculation',
+            index=models.Index(fields=['user', 'timestamp'], name='slitting_sl_user_id_3380f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slittingcalculation',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('material_id', 'input_data'), name='slitting_input_material_idx'),
+        ),
+    ]
@@ -0,0 +1,225 @@
+"""
+Stock-take valuation of measured rolls from a CSV upload.
+
+Each CSV row is one roll: its outer diameter, core diameter and width in mm,
+and either a material (id or code) with a film thickness in microns, or a
+saved laminated structure (id or name), which brings its own thickness and
+density. All rolls are valued in one pass of SlittingCalculator's array API
+and saved as ROLL_MASS calculations with a single bulk insert.
+"""
+import csv
+import io
+
+from calculator.material_registry import registry as material_registry
+from calculator.models import PlasticMaterial
+from calculator.streaming import Echo
+from sales.models import LaminatedStructure
+from sales.structures import INCOMPLETE_STRUCTURE_ERROR, structure_is_complete
+from .models import SlittingCalculation
+from .slitting_calculator import SlittingCalculator
+
+MAX_INVENTORY_ROLLS = 20000
+
+MEASUREMENT_COLUMNS = ['outer_diameter_mm', 'core_diameter_mm', 'width_mm']
+INPUT_COLUMNS = ['roll', 'material', 'structure', 'thickness_um'] + MEASUREMENT_COLUMNS
+RESULT_COLUMNS = ['material_label', 'layer_count', 'effective_density_g_cm3', 'gsm', 'roll_mass_kg',
+                  'film_length_m', 'error']
+
+
+class RollSpec:
+    """One CSV row with its material or structure resolved"""
+
+    def __init__(self, row, number):
+        self.row = row
+        self.label = (row.get('roll') or '').strip() or str(number)
+        self.measurements = [parse_number(row.get(column)) for column in MEASUREMENT_COLUMNS]
+        self.material = None
+        self.structure = None
+        self.record_material = None  # material the saved calculation is filed under
+        self.thickness_um = 0.0
+        self.density = 0.0
+        self.layer_count = 0
+        self.error = ''
+
+    @property
+    def material_label(self):
+        if self.structure is not None:
+            return self.structure.name
+        return self.material.name if self.material is not None else ''
+
+
+def parse_number(value):
+    try:
+        return float(value) if value not in (None, '') else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def read_roll_csv(text):
+    """
+    Rows of an uploaded roll CSV, with any non-blank cells beyond the header
+    under the key None; raises ValueError for a missing column or too many rolls
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    fields = {name.strip() for name in reader.fieldnames or []}
+    missing = [column for column in MEASUREMENT_COLUMNS if column not in fields]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    if 'material' not in fields and 'structure' not in fields:
+        raise ValueError("A material or structure column is required")
+
+    rows = []
+    for row in reader:
+        # DictReader files cells beyond the header under None; blank ones are only trailing commas
+        extra = [cell for cell in row.pop(None, None) or [] if cell.strip()]
+        row = {key.strip(): (value or '').strip() for key, value in row.items()}
+        if extra:
+            row[None] = extra
+        rows.append(row)
+        if len(rows) > MAX_INVENTORY_ROLLS:
+            raise ValueError(f"At most {MAX_INVENTORY_ROLLS} rolls per upload")
+    return rows
+
+
+def load_structures(rows):
+    """{id or name: LaminatedStructure} for every structure the rows name, in one query"""
+    keys = {row['structure'] for row in rows if row.get('structure')}
+    if not keys:
+        return {}
+    ids = {int(key) for key in keys if key.isdigit()}
+    structures = {}
+    for structure in LaminatedStructure.objects.filter(pk__in=ids) | LaminatedStructure.objects.filter(name__in=keys):
+        structures[str(structure.pk)] = structure
+        structures[structure.name] = structure
+    return structures
+
+
+def resolve_material(key):
+    """Material by id or code, or None"""
+    material = material_registry.get_or_none(key) if key.isdigit() else None
+    if material is None:
+        try:
+            material = material_registry.get_by_code(key)
+        except PlasticMaterial.DoesNotExist:
+            pass
+    return material
+
+
+def resolve_rolls(rows):
+    """RollSpec per row with thickness and density filled in, or an error"""
+    structures = load_structures(rows)
+    # Structure rolls are filed under the first material, like the single-roll view
+    default_material = material_registry.first()
+    specs = []
+    for number, row in enumerate(rows, start=1):
+        spec = RollSpec(row, number)
+        if row.get(None):
+            spec.error = f"Row {number} has extra columns"
+        elif row.get('structure'):
+            spec.structure = structures.get(row['structure'])
+            if spec.structure is None:
+                spec.error = f"Structure not found: {row['structure']}"
+            elif not structure_is_complete(spec.structure):
+                spec.error = INCOMPLETE_STRUCTURE_ERROR
+            elif default_material is None:
+                spec.error = 'No materials defined to record structure rolls under'
+            else:
+                spec.record_material = default_material
+                spec.thickness_um = spec.structure.total_thickness_microns
+                spec.density = spec.structure.effective_density
+                spec.layer_count = len(spec.structure.layer_properties)
+        elif row.get('material'):
+            spec.material = resolve_material(row['material'])
+            spec.thickness_um = parse_number(row.get('thickness_um'))
+            if spec.material is None:
+                spec.error = f"Material not found: {row['material']}"
+            elif spec.thickness_um <= 0:
+                spec.error = 'Thickness must be greater than 0'
+            else:
+                spec.record_material = spec.material
+                spec.density = spec.material.density
+                spec.layer_count = 1
+        else:
+            spec.error = 'Material or structure required'
+
+        if not spec.error and not all(value > 0 for value in spec.measurements):
+            spec.error = 'Diameters and width must be greater than 0'
+        elif not spec.error and spec.measurements[0] <= spec.measurements[1]:
+            spec.error = 'Outer diameter must be larger than the core diameter'
+        if spec.error:
+            spec.thickness_um = spec.density = 0.0
+        specs.append(spec)
+    return specs
+
+
+def value_rolls(specs):
+    """Mass, film length, GSM and effective density of every roll, as columns"""
+    outer_diameters, core_diameters, widths = (
+        [spec.measurements[index] / 1000 for spec in specs] for index in range(len(MEASUREMENT_COLUMNS))
+    )
+    return SlittingCalculator().calculate_roll_inventory(
+        outer_diameters, core_diameters, widths,
+        [spec.thickness_um for spec in specs], [spec.density for spec in specs],
+    )
+
+
+def roll_result(spec, results, index):
+    """Result data for one roll, shaped like the single roll-mass calculation's"""
+    roll_mass_kg = results['roll_mass_kg'][index]
+    return {
+        'roll_mass_kg': round(roll_mass_kg, 2),
+        'roll_mass_lb': round(SlittingCalculator.convert_mass(roll_mass_kg, 'kg', 'lb'), 2),
+        'effective_density_g_cm3': round(results['effective_density_g_cm3'][index], 4),
+        'total_thickness_um': round(spec.thickness_um, 1),
+        'gsm': round(results['gsm'][index], 1),
+        'film_length_m': round(results['film_length_m'][index], 1),
+        'layer_count': spec.layer_count,
+    }
+
+
+def roll_input(spec):
+    outer_diameter, core_diameter, width = spec.measurements
+    return {
+        'roll': spec.label,
+        'source': 'roll_inventory',
+        'material_id': spec.material.id if spec.material is not None else None,
+        'structure_id': spec.structure.pk if spec.structure is not None else None,
+        'thickness': spec.thickness_um,
+        'thickness_unit': 'micron',
+        'outer_diameter': outer_diameter,
+        'outer_diameter_unit': 'mm',
+        'core_diameter': core_diameter,
+        'core_diameter_unit': 'mm',
+        'width': width,
+        'width_unit': 'mm',
+    }
+
+
+def inventory_calculations(specs, results, user):
+    """Unsaved SlittingCalculation rows for every roll that could be valued"""
+    return [
+        SlittingCalculation(
+            calculation_type='ROLL_MASS',
+            material=spec.record_material,
+            input_data=roll_input(spec),
+            result_data=roll_result(spec, results, index),
+            user=user,
+        )
+        for index, spec in enumerate(specs) if not spec.error
+    ]
+
+
+def inventory_csv_rows(specs, results):
+    """Result CSV lines: the uploaded columns followed by the valuation"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(INPUT_COLUMNS + RESULT_COLUMNS)
+    for index, spec in enumerate(specs):
+        row = [spec.label] + [spec.row.get(column, '') for column in INPUT_COLUMNS[1:]]
+        if spec.error:
+            row += [spec.material_label, '', '', '', '', '', spec.error]
+        else:
+            result = roll_result(spec, results, index)
+            row += [spec.material_label, spec.layer_count, result['effective_density_g_cm3'], result['gsm'],
+                    result['roll_mass_kg'], result['film_length_m'], '']
+        yield writer.writerow(row)
+
@@ -1,5 +1,34 @@
 import math
 
+from calculator.columnar import column_values, run_formula
+
+
+# --- COLUMN FORMULAS (ops, *columns) for the array API below ---
+
+def _roll_mass_from_diameter(ops, outer_diameter_m, core_diameter_m, width_m, thickness_um, density_g_cm3):
+    valid = ((outer_diameter_m > 0) & (core_diameter_m > 0) & (width_m > 0) & (thickness_um > 0) &
+             (density_g_cm3 > 0) & (outer_diameter_m > core_diameter_m))
+    annulus_m2 = math.pi * ((outer_diameter_m / 2) ** 2 - (core_diameter_m / 2) ** 2)
+    return ops.where(valid, annulus_m2 * width_m * density_g_cm3 * 1000, 0.0)
+
+
+def _outer_diameter_from_mass(ops, roll_mass_kg, core_diameter_m, width_m, thickness_um, density_g_cm3):
+    valid = ((roll_mass_kg > 0) & (core_diameter_m > 0) & (width_m > 0) & (thickness_um > 0) &
+             (density_g_cm3 > 0))
+    film_area_m2 = ops.div(roll_mass_kg, density_g_cm3 * 1000 * width_m)
+    outer_diameter_m = 2 * ops.sqrt(ops.maximum(film_area_m2, 0) / math.pi + (core_diameter_m / 2) ** 2)
+    return ops.where(valid, outer_diameter_m, 0.0)
+
+
+def _film_length_from_mass(ops, mass_kg, width_m, thickness_um, density_g_cm3):
+    valid = (mass_kg > 0) & (width_m > 0) & (thickness_um > 0) & (density_g_cm3 > 0)
+    length_m = ops.div(ops.div(mass_kg, density_g_cm3 * 1000), width_m * thickness_um / 1_000_000)
+    return ops.where(valid, length_m, 0.0)
+
+
+def _gsm(ops, thickness_um, density_g_cm3):
+    return thickness_um * density_g_cm3
+
 
 class SlittingCalculator:
     """
@@ -120,6 +149,44 @@ class SlittingCalculator:
 
         return roll_mass_kg
 
+    # --- ARRAY API: MANY ROLLS AT ONCE ---
+    # Each argument is a column (one value per roll) or a single number for all rolls;
+    # results are lists of floats matching the single-roll methods roll for roll.
+
+    @staticmethod
+    def calculate_roll_masses_from_diameters(outer_diameters_m, core_diameters_m, widths_m, thicknesses_um,
+                                             densities_g_cm3):
+        return run_formula(_roll_mass_from_diameter, outer_diameters_m, core_diameters_m, widths_m,
+                           thicknesses_um, densities_g_cm3)
+
+    @staticmethod
+    def calculate_outer_diameters_from_masses(roll_masses_kg, core_diameters_m, widths_m, thicknesses_um,
+                                              densities_g_cm3):
+        return run_formula(_outer_diameter_from_mass, roll_masses_kg, core_diameters_m, widths_m,
+                           thicknesses_um, densities_g_cm3)
+
+    @staticmethod
+    def calculate_film_lengths_from_masses(masses_kg, widths_m, thicknesses_um, densities_g_cm3):
+        return run_formula(_film_length_from_mass, masses_kg, widths_m, thicknesses_um, densities_g_cm3)
+
+    def calculate_roll_inventory(self, outer_diameters_m, core_diameters_m, widths_m, thicknesses_um,
+                                 densities_g_cm3):
+        """
+        Stock-take valuation of measured rolls: mass, film length, GSM and
+        effective density per roll, as columns.
+        """
+        roll_mass_kg = self.calculate_roll_masses_from_diameters(
+            outer_diameters_m, core_diameters_m, widths_m, thicknesses_um, densities_g_cm3
+        )
+        return {
+            'roll_mass_kg': roll_mass_kg,
+            'film_length_m': self.calculate_film_lengths_from_masses(
+                roll_mass_kg, widths_m, thicknesses_um, densities_g_cm3
+            ),
+            'gsm': run_formula(_gsm, thicknesses_um, densities_g_cm3),
+            'effective_density_g_cm3': column_values(densities_g_cm3, len(roll_mass_kg)),
+        }
+
     # --- 3. SLITTING TIME, PRODUCTION TIME, AND EFFICIENCY ---
 
     @staticmethod
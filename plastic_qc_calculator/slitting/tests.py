@@ -1,3 +1,97 @@
+import csv
+import io
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from calculator.material_registry import registry as material_registry
+from calculator.models import CalculationLedger, PlasticMaterial
+from sales.models import LaminatedStructure
+from .models import SlittingCalculation
+from .roll_inventory import resolve_rolls, value_rolls
+from .slitting_calculator import SlittingCalculator
+
+HEADER = 'roll,material,structure,thickness_um,outer_diameter_mm,core_diameter_mm,width_mm\n'
+
+
+class RollArrayTests(TestCase):
+    def test_array_api_matches_single_roll_methods(self):
+        calculator = SlittingCalculator()
+        rolls = [(0.5, 0.076, 1.0, 20, 0.92), (0.3, 0.152, 0.6, 50, 1.4), (0.2, 0.3, 0.5, 30, 0.92)]
+        masses = calculator.calculate_roll_masses_from_diameters(*zip(*rolls))
+        lengths = calculator.calculate_film_lengths_from_masses(masses, *list(zip(*rolls))[2:])
+        for roll, mass, length in zip(rolls, masses, lengths):
+            self.assertAlmostEqual(mass, calculator.calculate_roll_mass_from_diameter(*roll))
+            self.assertAlmostEqual(length, calculator.calculate_film_length_from_mass(mass, *roll[2:]))
+
+
+class RollInventoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('tester', password='pw', is_approved=True)
+        self.client.force_login(self.user)
+
+    def upload(self, rows):
+        response = self.client.post('/slitting/roll-inventory/', HEADER + rows, content_type='text/csv')
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_values_rolls_and_records_history(self):
+        material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        structure = LaminatedStructure.objects.create(
+            name='PET/PE', layers=[{'material_id': material.pk, 'thickness_microns': 50},
+                                   {'material': 'PET', 'density': 1.4, 'thickness': 12}])
+
+        rows = self.upload('R1,LDPE,,20,500,76,1000\n'
+                           f'R2,,{structure.pk},,400,76,800\n'
+                           'R3,NOPE,,20,500,76,1000\n'
+                           'R4,LDPE,,20,50,76,1000\n')
+        self.assertEqual([row['error'] for row in rows], ['', '', 'Material not found: NOPE',
+                                                          'Outer diameter must be larger than the core diameter'])
+        expected = SlittingCalculator().calculate_roll_mass_from_diameter(0.5, 0.076, 1.0, 20, 0.92)
+        self.assertAlmostEqual(float(rows[0]['roll_mass_kg']), round(expected, 2))
+        self.assertAlmostEqual(float(rows[1]['gsm']), round(structure.total_gsm, 1))
+
+        self.assertEqual(SlittingCalculation.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(CalculationLedger.objects.filter(user=self.user, section='slitting').count(), 2)
+
+    def test_structure_roll_without_any_material_is_a_row_error(self):
+        structure = LaminatedStructure.objects.create(name='Foil', layers=[{'density': 2.7, 'thickness': 9}])
+        material_registry.invalidate()
+        specs = resolve_rolls([{'roll': 'R1', 'structure': str(structure.pk), 'outer_diameter_mm': '400',
+                                'core_diameter_mm': '76', 'width_mm': '800'}])
+        self.assertEqual(specs[0].error, 'No materials defined to record structure rolls under')
+
+        rows = self.upload(f'R1,,{structure.pk},,400,76,800\n')
+        self.assertEqual(rows[0]['error'], 'No materials defined to record structure rolls under')
+        self.assertFalse(SlittingCalculation.objects.exists())
+
+    def test_value_rolls_returns_columns(self):
+        material = PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        specs = resolve_rolls([{'material': str(material.pk), 'thickness_um': '20', 'outer_diameter_mm': '500',
+                                'core_diameter_mm': '76', 'width_mm': '1000'}])
+        results = value_rolls(specs)
+        self.assertEqual(set(results), {'roll_mass_kg', 'film_length_m', 'gsm', 'effective_density_g_cm3'})
+        self.assertAlmostEqual(results['gsm'][0], 18.4)
+
+    def test_incomplete_structure_is_a_row_error(self):
+        PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+        structure = LaminatedStructure.objects.create(name='Draft', layers=[{'material': 'PET', 'thickness': 12}])
+
+        rows = self.upload(f'R1,,{structure.pk},,400,76,800\n')
+
+        self.assertEqual(rows[0]['error'], 'Structure has incomplete layers')
+        self.assertFalse(SlittingCalculation.objects.exists())
+
+    def test_extra_cells_are_a_row_error(self):
+        PlasticMaterial.objects.create(name='LDPE', code='LDPE', material_type='FILM', density=0.92)
+        material_registry.invalidate()
+
+        rows = self.upload('R1,LDPE,,20,500,76,1000,oops\n'
+                           'R2,LDPE,,20,500,76,1000,\n'
+                           'R3,LDPE,,20,500\n')
+
+        self.assertEqual([row['error'] for row in rows], ['Row 1 has extra columns', '',
+                                                          'Diameters and width must be greater than 0'])
+        self.assertEqual(SlittingCalculation.objects.count(), 1)
@@ -15,6 +15,7 @@ urlpatterns = [
     path('calculate-production-rate/', views.calculate_production_rate, name='calculate_production_rate'),
     path('calculate-yield/', views.calculate_yield, name='calculate_yield'),
     path('calculate-film-length/', views.calculate_film_length, name='calculate_film_length'),
+    path('roll-inventory/', views.roll_inventory, name='roll_inventory'),
 
     # History
     path('history/', views.slitting_history, name='slitting_history'),
@@ -3,12 +3,23 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from calculator.models import PlasticMaterial
-from .models import SlittingCalculation
+from calculator.material_registry import registry as material_registry
+from calculator.result_cache import memoize_result
+from calculator.page_cache import section_page_context
+from calculator.conditional import conditional_page, SECTION_TEMPLATES
+from calculator.layer_stack import load_layer_stack, save_layers
+from calculator.ledger import bulk_create_calculations
+from calculator.streaming import stream_download
+from sales.structures import get_complete_structure
+from .models import SlittingCalculation, SlittingLayer
 from .slitting_calculator import SlittingCalculator
+from .roll_inventory import inventory_calculations, inventory_csv_rows, read_roll_csv, resolve_rolls, value_rolls
+from datetime import datetime
 import json
 
 
 @login_required
+@conditional_page('slitting/home.html', *SECTION_TEMPLATES, materials=True)
 def slitting_home(request):
     calculators = [
         {'id': 'roll_mass', 'name': 'Roll Mass from Diameter', 'icon': 'fas fa-weight-hanging'},
@@ -23,6 +34,7 @@ def slitting_home(request):
     materials = PlasticMaterial.objects.all().order_by('material_type', 'name')
 
     return render(request, 'slitting/home.html', {
+        **section_page_context(),
         'section_name': 'Slitting',
         'calculators': calculators,
         'materials': materials
@@ -31,6 +43,7 @@ def slitting_home(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_roll_mass(request):
     if request.method == 'POST':
         try:
@@ -52,21 +65,21 @@ def calculate_roll_mass(request):
 
             # Handle layers
             layers_data = data.get('layers', [])
-            if layers_data:
+            structure_id = data.get('structure_id')
+            if structure_id:
+                # Saved laminated structure: totals were computed when it was saved
+                structure = get_complete_structure(structure_id)
+                total_thickness_um = structure.total_thickness_microns
+                effective_density = structure.effective_density
+                layer_count = len(structure.layer_properties)
+            elif layers_data:
                 # Multi-layer calculation
-                layer_thicknesses_um = []
-                layer_densities_g_cm3 = []
-
-                for layer in layers_data:
-                    material_id = layer.get('material_id')
-                    thickness = float(layer.get('thickness', 0))
-                    thickness_unit = layer.get('thickness_unit', 'micron')
-
-                    material = PlasticMaterial.objects.get(id=material_id)
-                    thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
-
-                    layer_thicknesses_um.append(thickness_um)
-                    layer_densities_g_cm3.append(material.density)
+                layers = load_layer_stack(layers_data)
+                layer_thicknesses_um = [
+                    calculator.convert_thickness(layer.thickness, layer.thickness_unit, 'micron') for layer in layers
+                ]
+                layer_densities_g_cm3 = [layer.density for layer in layers]
+                layer_count = len(layers)
 
                 total_thickness_um = calculator.calculate_material_thickness_total(layer_thicknesses_um)
                 effective_density = calculator.calculate_material_density_effective(layer_thicknesses_um,
@@ -78,9 +91,10 @@ def calculate_roll_mass(request):
                 thickness = float(data.get('thickness', 0))
                 thickness_unit = data.get('thickness_unit', 'micron')
 
-                material = PlasticMaterial.objects.get(id=material_id)
+                material = material_registry.get(material_id)
                 total_thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
                 effective_density = material.density
+                layer_count = 1
 
             # Calculate roll mass
             roll_mass_kg = calculator.calculate_roll_mass_from_diameter(
@@ -96,20 +110,21 @@ def calculate_roll_mass(request):
                 'effective_density_g_cm3': round(effective_density, 4),
                 'total_thickness_um': round(total_thickness_um, 1),
                 'gsm': round(gsm, 1),
-                'layer_count': len(layers_data) if layers_data else 1
+                'layer_count': layer_count
             }
 
             # Save calculation if user is authenticated
             if request.user.is_authenticated:
-                material = PlasticMaterial.objects.get(
-                    id=material_id) if not layers_data else PlasticMaterial.objects.first()
-                SlittingCalculation.objects.create(
+                material = material_registry.first() if structure_id or layers_data else material
+                calculation = SlittingCalculation.objects.create(
                     calculation_type='ROLL_MASS',
                     material=material,
                     input_data=data,
                     result_data=result,
                     user=request.user
                 )
+                if layers_data and not structure_id:
+                    save_layers(SlittingLayer, calculation, layers)
 
             return JsonResponse({'success': True, 'result': result})
 
@@ -121,6 +136,7 @@ def calculate_roll_mass(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_roll_diameter(request):
     if request.method == 'POST':
         try:
@@ -142,21 +158,21 @@ def calculate_roll_diameter(request):
 
             # Handle layers
             layers_data = data.get('layers', [])
-            if layers_data:
+            structure_id = data.get('structure_id')
+            if structure_id:
+                # Saved laminated structure: totals were computed when it was saved
+                structure = get_complete_structure(structure_id)
+                total_thickness_um = structure.total_thickness_microns
+                effective_density = structure.effective_density
+                layer_count = len(structure.layer_properties)
+            elif layers_data:
                 # Multi-layer calculation
-                layer_thicknesses_um = []
-                layer_densities_g_cm3 = []
-
-                for layer in layers_data:
-                    material_id = layer.get('material_id')
-                    thickness = float(layer.get('thickness', 0))
-                    thickness_unit = layer.get('thickness_unit', 'micron')
-
-                    material = PlasticMaterial.objects.get(id=material_id)
-                    thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
-
-                    layer_thicknesses_um.append(thickness_um)
-                    layer_densities_g_cm3.append(material.density)
+                layers = load_layer_stack(layers_data)
+                layer_thicknesses_um = [
+                    calculator.convert_thickness(layer.thickness, layer.thickness_unit, 'micron') for layer in layers
+                ]
+                layer_densities_g_cm3 = [layer.density for layer in layers]
+                layer_count = len(layers)
 
                 total_thickness_um = calculator.calculate_material_thickness_total(layer_thicknesses_um)
                 effective_density = calculator.calculate_material_density_effective(layer_thicknesses_um,
@@ -168,9 +184,10 @@ def calculate_roll_diameter(request):
                 thickness = float(data.get('thickness', 0))
                 thickness_unit = data.get('thickness_unit', 'micron')
 
-                material = PlasticMaterial.objects.get(id=material_id)
+                material = material_registry.get(material_id)
                 total_thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
                 effective_density = material.density
+                layer_count = 1
 
             # Calculate outer diameter
             outer_diameter_m = calculator.calculate_outer_diameter_from_mass(
@@ -187,20 +204,21 @@ def calculate_roll_diameter(request):
                 'effective_density_g_cm3': round(effective_density, 4),
                 'total_thickness_um': round(total_thickness_um, 1),
                 'gsm': round(gsm, 1),
-                'layer_count': len(layers_data) if layers_data else 1
+                'layer_count': layer_count
             }
 
             # Save calculation if user is authenticated
             if request.user.is_authenticated:
-                material = PlasticMaterial.objects.get(
-                    id=material_id) if not layers_data else PlasticMaterial.objects.first()
-                SlittingCalculation.objects.create(
+                material = material_registry.first() if structure_id or layers_data else material
+                calculation = SlittingCalculation.objects.create(
                     calculation_type='ROLL_DIAMETER',
                     material=material,
                     input_data=data,
                     result_data=result,
                     user=request.user
                 )
+                if layers_data and not structure_id:
+                    save_layers(SlittingLayer, calculation, layers)
 
             return JsonResponse({'success': True, 'result': result})
 
@@ -212,6 +230,7 @@ def calculate_roll_diameter(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_slitting_time(request):
     if request.method == 'POST':
         try:
@@ -237,7 +256,7 @@ def calculate_slitting_time(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 SlittingCalculation.objects.create(
                     calculation_type='SLITTING_TIME',
                     material=default_material,
@@ -256,6 +275,7 @@ def calculate_slitting_time(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_efficiency(request):
     if request.method == 'POST':
         try:
@@ -288,7 +308,7 @@ def calculate_production_efficiency(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 SlittingCalculation.objects.create(
                     calculation_type='PRODUCTION_EFFICIENCY',
                     material=default_material,
@@ -307,6 +327,7 @@ def calculate_production_efficiency(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_production_rate(request):
     if request.method == 'POST':
         try:
@@ -337,7 +358,7 @@ def calculate_production_rate(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 SlittingCalculation.objects.create(
                     calculation_type='PRODUCTION_RATE',
                     material=default_material,
@@ -356,6 +377,7 @@ def calculate_production_rate(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_yield(request):
     if request.method == 'POST':
         try:
@@ -383,7 +405,7 @@ def calculate_yield(request):
             }
 
             if request.user.is_authenticated:
-                default_material = PlasticMaterial.objects.first()
+                default_material = material_registry.first()
                 SlittingCalculation.objects.create(
                     calculation_type='YIELD_CALCULATION',
                     material=default_material,
@@ -402,6 +424,7 @@ def calculate_yield(request):
 
 @login_required
 @csrf_exempt
+@memoize_result
 def calculate_film_length(request):
     if request.method == 'POST':
         try:
@@ -415,21 +438,21 @@ def calculate_film_length(request):
 
             # Handle layers
             layers_data = data.get('layers', [])
-            if layers_data:
+            structure_id = data.get('structure_id')
+            if structure_id:
+                # Saved laminated structure: totals were computed when it was saved
+                structure = get_complete_structure(structure_id)
+                total_thickness_um = structure.total_thickness_microns
+                effective_density = structure.effective_density
+                layer_count = len(structure.layer_properties)
+            elif layers_data:
                 # Multi-layer calculation
-                layer_thicknesses_um = []
-                layer_densities_g_cm3 = []
-
-                for layer in layers_data:
-                    material_id = layer.get('material_id')
-                    thickness = float(layer.get('thickness', 0))
-                    thickness_unit = layer.get('thickness_unit', 'micron')
-
-                    material = PlasticMaterial.objects.get(id=material_id)
-                    thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
-
-                    layer_thicknesses_um.append(thickness_um)
-                    layer_densities_g_cm3.append(material.density)
+                layers = load_layer_stack(layers_data)
+                layer_thicknesses_um = [
+                    calculator.convert_thickness(layer.thickness, layer.thickness_unit, 'micron') for layer in layers
+                ]
+                layer_densities_g_cm3 = [layer.density for layer in layers]
+                layer_count = len(layers)
 
                 total_thickness_um = calculator.calculate_material_thickness_total(layer_thicknesses_um)
                 effective_density = calculator.calculate_material_density_effective(layer_thicknesses_um,
@@ -441,9 +464,10 @@ def calculate_film_length(request):
                 thickness = float(data.get('thickness', 0))
                 thickness_unit = data.get('thickness_unit', 'micron')
 
-                material = PlasticMaterial.objects.get(id=material_id)
+                material = material_registry.get(material_id)
                 total_thickness_um = calculator.convert_thickness(thickness, thickness_unit, 'micron')
                 effective_density = material.density
+                layer_count = 1
 
             # Convert to base units
             mass_kg = calculator.convert_mass(mass, mass_unit, 'kg')
@@ -458,19 +482,20 @@ def calculate_film_length(request):
                 'film_length_yd': round(film_length_m / 0.9144, 2),
                 'effective_density_g_cm3': round(effective_density, 4),
                 'total_thickness_um': round(total_thickness_um, 1),
-                'layer_count': len(layers_data) if layers_data else 1
+                'layer_count': layer_count
             }
 
             if request.user.is_authenticated:
-                material = PlasticMaterial.objects.get(
-                    id=material_id) if not layers_data else PlasticMaterial.objects.first()
-                SlittingCalculation.objects.create(
+                material = material_registry.first() if structure_id or layers_data else material
+                calculation = SlittingCalculation.objects.create(
                     calculation_type='FILM_LENGTH',
                     material=material,
                     input_data=data,
                     result_data=result,
                     user=request.user
                 )
+                if layers_data and not structure_id:
+                    save_layers(SlittingLayer, calculation, layers)
 
             return JsonResponse({'success': True, 'result': result})
 
@@ -531,3 +556,37 @@ def slitting_history(request):
     calculations = SlittingCalculation.objects.filter(user=request.user).select_related('material').order_by(
         '-timestamp')
     return render(request, 'slitting/history.html', {'calculations': calculations})
+
+
+@login_required
+@csrf_exempt
+def roll_inventory(request):
+    """
+    Stock-take upload: a CSV of measured rolls (as a 'file' upload or the raw
+    request body) comes back as CSV with mass, film length, GSM and effective
+    density per roll. Valued rolls are saved to the history in one bulk insert.
+    """
+    if request.method == 'POST':
+        try:
+            if request.content_type == 'multipart/form-data':
+                upload = request.FILES.get('file')
+                if upload is None:
+                    return JsonResponse({'success': False, 'error': 'No CSV file uploaded'})
+                text = upload.read().decode('utf-8-sig')
+            else:
+                text = request.body.decode('utf-8-sig')
+
+            specs = resolve_rolls(read_roll_csv(text))
+            if not specs:
+                return JsonResponse({'success': False, 'error': 'The CSV has no rolls'})
+
+            results = value_rolls(specs)
+            bulk_create_calculations(SlittingCalculation, inventory_calculations(specs, results, request.user))
+
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+        filename = f'roll_inventory_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        return stream_download(inventory_csv_rows(specs, results), 'text/csv', filename)
+
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})